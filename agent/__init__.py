@@ -6,6 +6,7 @@ from agent.planner import Planner
 from agent.search import ProductSearcher
 from agent.optimizer import PriceOptimizer
 from agent.purchaser import Purchaser
+from agent.cache import SearchCache
 
-__all__ = ["Planner", "ProductSearcher", "PriceOptimizer", "Purchaser"]
+__all__ = ["Planner", "ProductSearcher", "PriceOptimizer", "Purchaser", "SearchCache"]
 
@@ -0,0 +1,358 @@
+"""
+Budget-constrained whole-basket optimization.
+"""
+
+import heapq
+import math
+import time
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+from agent.schemas import OptimizationResult, Product, SearchResult
+from agent.units import packs_needed
+from policies.preferences import PreferencesPolicy
+
+
+class BasketOptimizer:
+    """
+    Chooses one product per item to maximize total score within a budget.
+    
+    A product's score is its rating, stock and preference value less a
+    penalty per dollar of its cost, so spare budget is only spent where the
+    quality gained is worth the price; equally scored options keep the
+    cheaper one.
+    
+    This is a multiple-choice knapsack. The solver starts from the cheapest
+    basket, spends the remaining budget on the upgrades with the best score
+    gain per dollar, then improves the basket with single-item swaps until
+    nothing improves or ``time_limit`` runs out. That keeps it fast at
+    hundreds of line items. The result is not guaranteed optimal, but it
+    never exceeds the budget when the cheapest basket fits.
+    """
+    
+    def __init__(
+        self,
+        preferences: Optional[PreferencesPolicy] = None,
+        rating_weight: float = 1.0,
+        stock_weight: float = 2.0,
+        preference_weight: float = 0.5,
+        price_weight: float = 0.1,
+        time_limit: float = 0.2,
+    ):
+        """
+        Initialize the basket optimizer.
+        
+        Args:
+            preferences: Vendor and brand preferences to score against
+            rating_weight: Score for a 5-star rating (scaled linearly)
+            stock_weight: Score for being in stock
+            preference_weight: Score for the most preferred vendor or a preferred brand
+            price_weight: Score lost per dollar an option costs
+            time_limit: Seconds the solver may spend improving the basket
+        """
+        self.preferences = preferences
+        self.rating_weight = rating_weight
+        self.stock_weight = stock_weight
+        self.preference_weight = preference_weight
+        self.price_weight = price_weight
+        self.time_limit = time_limit
+    
+    def score(self, product: Product, quantity: int = 1) -> float:
+        """
+        Score a product; higher is better.
+        
+        Args:
+            product: Product to score
+            quantity: Units the item needs, which sets how many listings are paid for
+            
+        Returns:
+            Weighted sum of rating, stock and preference components, less the
+            price penalty on the cost of covering ``quantity``
+        """
+        score = self.rating_weight * (product.rating or 0) / 5
+        score -= self.price_weight * product.price * packs_needed(product, quantity)
+        if product.in_stock:
+            score += self.stock_weight
+        
+        if self.preferences:
+            preferred = self.preferences.preferred_vendors
+            if product.vendor in preferred:
+                rank = preferred.index(product.vendor)
+                score += self.preference_weight * (1 - rank / len(preferred))
+            if self.preferences.is_brand_preferred(product.brand):
+                score += self.preference_weight
+        
+        return score
+    
+    def optimize(
+        self, search_results: List[SearchResult], budget: Optional[float]
+    ) -> OptimizationResult:
+        """
+        Select one product per search result under a budget.
+        
+        Items whose search found nothing are skipped, as in ``PriceOptimizer.optimize``.
+        Each option is priced at the number of listings needed to cover the
+        item's quantity.
+        With no budget the best-scoring product of each item is chosen. If even
+        the cheapest basket is over budget, the cheapest basket is returned.
+        
+        Args:
+            search_results: Candidate sets, one per line item
+            budget: Maximum total cost, or None for no limit
+            
+        Returns:
+            OptimizationResult with the selected basket
+        """
+        frontiers, item_quantities = self.frontiers(search_results)
+        choice = self.solve(
+            [self.compact(frontier) for frontier in frontiers], budget, self.time_limit
+        )
+        return self.result(frontiers, item_quantities, choice, search_results)
+    
+    def frontiers(
+        self, search_results: List[SearchResult]
+    ) -> Tuple[List[List[Tuple[int, float, Product]]], List[int]]:
+        """
+        Build the option frontier of every item with products.
+        
+        Args:
+            search_results: Candidate sets, one per line item
+            
+        Returns:
+            Tuple of (frontier per non-empty item, that item's quantity)
+        """
+        frontiers = []
+        item_quantities = []
+        for result in search_results:
+            if not result.products:
+                continue
+            item_quantities.append(result.quantity)
+            frontiers.append(self._frontier(self._allowed(result.products), result.quantity))
+        return frontiers, item_quantities
+    
+    @staticmethod
+    def compact(frontier: List[Tuple[int, float, Product]]) -> List[Tuple[int, float]]:
+        """Strip the products from a frontier, leaving what ``solve`` needs."""
+        return [(price, score) for price, score, _ in frontier]
+    
+    @staticmethod
+    def solve(
+        frontiers: List[List[Tuple[int, float]]], budget: Optional[float], time_limit: float
+    ) -> List[int]:
+        """
+        Choose one frontier entry per item.
+        
+        Works on plain (cost in cents, score) pairs, so it can run in another
+        process (see ``agent.offload.OptimizationPool``).
+        
+        Args:
+            frontiers: Compacted frontiers, one per item
+            budget: Maximum total cost, or None for no limit
+            time_limit: Seconds the local search may spend improving the basket
+            
+        Returns:
+            Index of the chosen entry in each frontier
+        """
+        deadline = time.monotonic() + time_limit
+        
+        # Start from the cheapest option of every item; prices are in whole
+        # cents so budget checks are exact
+        choice = [0] * len(frontiers)
+        total = sum(frontier[0][0] for frontier in frontiers)
+        
+        if budget is None:
+            choice = [len(frontier) - 1 for frontier in frontiers]
+        elif total <= math.floor(round(budget * 100, 6)):
+            budget_cents = math.floor(round(budget * 100, 6))
+            total = BasketOptimizer._greedy_upgrade(frontiers, choice, total, budget_cents)
+            BasketOptimizer._local_search(frontiers, choice, total, budget_cents, deadline)
+        return choice
+    
+    @staticmethod
+    def result(
+        frontiers: List[List[Tuple[int, float, Product]]],
+        item_quantities: List[int],
+        choice: List[int],
+        search_results: List[SearchResult],
+    ) -> OptimizationResult:
+        """
+        Turn a solved choice back into products.
+        
+        Args:
+            frontiers: Frontiers from ``frontiers``
+            item_quantities: Item quantities from ``frontiers``
+            choice: Chosen entry per frontier, from ``solve``
+            search_results: The search results the frontiers were built from
+            
+        Returns:
+            OptimizationResult with the selected basket
+        """
+        selected_products = [frontier[i][2] for frontier, i in zip(frontiers, choice)]
+        quantities = [
+            packs_needed(product, quantity)
+            for product, quantity in zip(selected_products, item_quantities)
+        ]
+        
+        return OptimizationResult(
+            selected_products=selected_products,
+            quantities=quantities,
+            total_cost=sum(p.price * n for p, n in zip(selected_products, quantities)),
+            alternatives_considered=sum(len(result.products) for result in search_results),
+        )
+    
+    def _allowed(self, products: List[Product]) -> List[Product]:
+        """Drop excluded vendors and brands unless that would leave nothing."""
+        if not self.preferences:
+            return products
+        allowed = [
+            p for p in products
+            if not self.preferences.is_vendor_excluded(p.vendor)
+            and not self.preferences.is_brand_excluded(p.brand)
+        ]
+        return allowed or products
+    
+    def _frontier(
+        self, products: List[Product], quantity: int = 1
+    ) -> List[Tuple[int, float, Product]]:
+        """
+        Pareto frontier of (cost in cents, score, product), cheapest first.
+        
+        Every later entry costs more and scores strictly higher; dominated
+        products can never be part of a better basket. Ties keep the earliest.
+        """
+        options = sorted(
+            (
+                (
+                    round(p.price * packs_needed(p, quantity) * 100),
+                    -self.score(p, quantity),
+                    index,
+                    p,
+                )
+                for index, p in enumerate(products)
+            ),
+            key=lambda option: option[:3],
+        )
+        frontier: List[Tuple[int, float, Product]] = []
+        for price, neg_score, _, product in options:
+            if not frontier or -neg_score > frontier[-1][1]:
+                frontier.append((price, -neg_score, product))
+        return frontier
+    
+    @staticmethod
+    def _greedy_upgrade(
+        frontiers: List[List[Tuple[int, float]]],
+        choice: List[int],
+        total: int,
+        budget: int,
+    ) -> int:
+        """
+        Spend the budget on upgrades with the best score gain per dollar.
+        
+        Upgrades follow each item's upper convex hull so gains per dollar
+        only decrease along an item. Returns the new basket total.
+        """
+        hulls = [BasketOptimizer._hull(frontier) for frontier in frontiers]
+        heap = []
+        for item, hull in enumerate(hulls):
+            if len(hull) > 1:
+                efficiency = BasketOptimizer._efficiency(frontiers[item], hull[0], hull[1])
+                heapq.heappush(heap, (-efficiency, item, 1))
+        
+        while heap:
+            _, item, step = heapq.heappop(heap)
+            frontier, hull = frontiers[item], hulls[item]
+            extra = frontier[hull[step]][0] - frontier[choice[item]][0]
+            if total + extra > budget:
+                # Later steps for this item cost even more
+                continue
+            total += extra
+            choice[item] = hull[step]
+            if step + 1 < len(hull):
+                efficiency = BasketOptimizer._efficiency(frontier, hull[step], hull[step + 1])
+                heapq.heappush(heap, (-efficiency, item, step + 1))
+        
+        return total
+    
+    @staticmethod
+    def _local_search(
+        frontiers: List[List[Tuple[int, float]]],
+        choice: List[int],
+        total: int,
+        budget: int,
+        deadline: float,
+    ):
+        """
+        Improve the basket with swaps until none help or the deadline passes.
+        
+        Single-item upgrades that fit the slack are tried first; then pairs
+        that downgrade one item to pay for a larger gain on another.
+        """
+        prices = [[option[0] for option in frontier] for frontier in frontiers]
+        
+        while time.monotonic() < deadline:
+            improved = False
+            for item, frontier in enumerate(frontiers):
+                # Most expensive affordable option is the best-scoring one
+                current_price = frontier[choice[item]][0]
+                index = bisect_right(prices[item], budget - total + current_price) - 1
+                if index > choice[item]:
+                    total += frontier[index][0] - current_price
+                    choice[item] = index
+                    improved = True
+            
+            if not improved:
+                total, improved = BasketOptimizer._pair_swap(
+                    frontiers, prices, choice, total, budget, deadline
+                )
+            if not improved:
+                return
+    
+    @staticmethod
+    def _pair_swap(
+        frontiers: List[List[Tuple[int, float]]],
+        prices: List[List[int]],
+        choice: List[int],
+        total: int,
+        budget: int,
+        deadline: float,
+    ) -> Tuple[int, bool]:
+        """Apply the first downgrade-plus-upgrade pair that raises the score."""
+        for down, frontier in enumerate(frontiers):
+            current_price, current_score = frontier[choice[down]]
+            for lower in range(choice[down] - 1, -1, -1):
+                freed = current_price - frontier[lower][0]
+                loss = current_score - frontier[lower][1]
+                for up, other in enumerate(frontiers):
+                    if up == down:
+                        continue
+                    up_price, up_score = other[choice[up]]
+                    index = bisect_right(prices[up], budget - total + freed + up_price) - 1
+                    if other[index][1] - up_score > loss + 1e-12:
+                        choice[down] = lower
+                        choice[up] = index
+                        return total - freed + other[index][0] - up_price, True
+            if time.monotonic() >= deadline:
+                break
+        return total, False
+    
+    @staticmethod
+    def _hull(frontier: List[Tuple[int, float]]) -> List[int]:
+        """Indexes of the frontier's upper convex hull in price order."""
+        hull: List[int] = []
+        for index, (price, score) in enumerate(frontier):
+            while len(hull) >= 2:
+                p1, s1 = frontier[hull[-2]]
+                p2, s2 = frontier[hull[-1]]
+                # Drop the middle point if it lies on or below the chord
+                if (s2 - s1) * (price - p1) <= (score - s1) * (p2 - p1):
+                    hull.pop()
+                else:
+                    break
+            hull.append(index)
+        return hull
+    
+    @staticmethod
+    def _efficiency(frontier, lower: int, upper: int) -> float:
+        """Score gained per extra cent when moving between two frontier entries."""
+        price_gap = frontier[upper][0] - frontier[lower][0]
+        score_gap = frontier[upper][1] - frontier[lower][1]
+        return score_gap / price_gap if price_gap > 0 else float("inf")
@@ -0,0 +1,228 @@
+"""
+Search result caching in front of vendor searches.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Set, Tuple
+from agent.schemas import Product, Vendor
+
+CacheKey = Tuple[Vendor, str, int, Hashable]
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize query text so trivially different spellings share a cache entry.
+
+    Args:
+        query: Raw query string
+
+    Returns:
+        Lower-cased query with runs of whitespace collapsed
+    """
+    return " ".join(query.lower().split())
+
+
+class _CacheEntry:
+    """Cached products for one key plus their expiry time."""
+
+    __slots__ = ("products", "expires_at")
+
+    def __init__(self, products: List[Product], expires_at: float):
+        self.products = products
+        self.expires_at = expires_at
+
+
+class SearchCache:
+    """TTL + LRU cache of vendor search results."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        default_ttl: float = 300.0,
+        vendor_ttls: Optional[Dict[Vendor, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries before least-recently-used ones are evicted
+            default_ttl: Seconds an entry stays fresh unless the vendor has its own TTL
+            vendor_ttls: Per-vendor TTL overrides in seconds
+            clock: Time source, mainly for tests
+        """
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.vendor_ttls = vendor_ttls or {}
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, _CacheEntry]" = OrderedDict()
+        self._keys_by_product: Dict[Tuple[Vendor, str], Set[CacheKey]] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(
+        vendor: Vendor, query: str, max_results: int, source: Hashable = None
+    ) -> CacheKey:
+        """
+        Build the cache key for a vendor search.
+
+        Args:
+            vendor: Vendor the search is sent to
+            query: Raw query string
+            max_results: Result limit passed to the vendor
+            source: The vendor instance searched, so that two vendors of the
+                same type keep separate entries
+
+        Returns:
+            Cache key
+        """
+        return (vendor, normalize_query(query), max_results, source)
+
+    def get_ttl(self, vendor: Vendor) -> float:
+        """Get the TTL in seconds used for a vendor's entries."""
+        return self.vendor_ttls.get(vendor, self.default_ttl)
+
+    def get(
+        self, vendor: Vendor, query: str, max_results: int, source: Hashable = None
+    ) -> Optional[List[Product]]:
+        """
+        Look up cached search results.
+
+        Args:
+            vendor: Vendor the search is sent to
+            query: Raw query string
+            max_results: Result limit passed to the vendor
+            source: The vendor instance searched (see ``make_key``)
+
+        Returns:
+            Cached products, or None on a miss or expired entry
+        """
+        key = self.make_key(vendor, query, max_results, source)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= self._clock():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(entry.products)
+
+    def put(
+        self,
+        vendor: Vendor,
+        query: str,
+        max_results: int,
+        products: List[Product],
+        source: Hashable = None,
+    ):
+        """
+        Store search results, evicting the least recently used entries if full.
+
+        Args:
+            vendor: Vendor the search was sent to
+            query: Raw query string
+            max_results: Result limit passed to the vendor
+            products: Products returned by the vendor
+            source: The vendor instance searched (see ``make_key``)
+        """
+        if self.max_entries <= 0:
+            return
+        key = self.make_key(vendor, query, max_results, source)
+        expires_at = self._clock() + self.get_ttl(vendor)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _CacheEntry(list(products), expires_at)
+            for product in products:
+                self._keys_by_product.setdefault((vendor, product.id), set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_product(self, vendor: Vendor, product_id: str) -> int:
+        """
+        Drop every cached search that contains a product, e.g. after a price change.
+
+        Args:
+            vendor: Vendor reporting the change
+            product_id: The vendor's product ID
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            keys = list(self._keys_by_product.get((vendor, product_id), ()))
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def invalidate_vendor(self, vendor: Vendor) -> int:
+        """
+        Drop every cached search for a vendor.
+
+        Args:
+            vendor: Vendor whose entries should be removed
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == vendor]
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        """Remove all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_product.clear()
+
+    def stats(self) -> dict:
+        """
+        Get cache counters.
+
+        Returns:
+            Dictionary with size, hits, misses, evictions, expirations and invalidations
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: CacheKey):
+        """Remove an entry and its product back-references. Caller holds the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        vendor = key[0]
+        for product in entry.products:
+            keys = self._keys_by_product.get((vendor, product.id))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_product[(vendor, product.id)]
@@ -0,0 +1,138 @@
+"""
+Columnar (NumPy) representation of search result candidates.
+"""
+
+from operator import attrgetter
+from typing import List, Tuple
+import numpy as np
+from agent.schemas import Product, SearchResult, Vendor
+
+# Stable integer codes for vendors in candidate arrays
+VENDOR_CODES = {vendor: code for code, vendor in enumerate(Vendor)}
+
+
+class CandidateArrays:
+    """
+    Candidate products from many search results packed into flat arrays.
+    
+    Row ``i`` describes one product; ``group[i]`` is the index of the search
+    result it came from. Rows are stored contiguously by group and in their
+    original order within each group, so the row index doubles as the
+    original position.
+    """
+    
+    def __init__(
+        self,
+        price: np.ndarray,
+        rating: np.ndarray,
+        in_stock: np.ndarray,
+        vendor: np.ndarray,
+        group: np.ndarray,
+        group_count: int,
+    ):
+        """
+        Initialize candidate arrays.
+        
+        Args:
+            price: float64 prices
+            rating: float64 ratings, with missing ratings stored as 0
+            in_stock: bool stock flags
+            vendor: int16 vendor codes (see ``VENDOR_CODES``)
+            group: int32 search result index of each row
+            group_count: Number of search results packed
+        """
+        self.price = price
+        self.rating = rating
+        self.in_stock = in_stock
+        self.vendor = vendor
+        self.group = group
+        self.group_count = group_count
+    
+    def __len__(self) -> int:
+        return len(self.price)
+    
+    @classmethod
+    def from_search_results(
+        cls, search_results: List[SearchResult]
+    ) -> Tuple["CandidateArrays", List[Product]]:
+        """
+        Pack every product of every search result into arrays.
+        
+        Args:
+            search_results: Search results to pack
+            
+        Returns:
+            Tuple of (candidate arrays, flat product list aligned with the rows)
+        """
+        products: List[Product] = []
+        for result in search_results:
+            products.extend(result.products)
+        
+        count = len(products)
+        sizes = np.fromiter(
+            (len(result.products) for result in search_results),
+            dtype=np.int64,
+            count=len(search_results),
+        )
+        # Missing ratings become NaN here and are then treated as 0
+        rating = np.array(list(map(attrgetter("rating"), products)), dtype=np.float64)
+        np.nan_to_num(rating, copy=False, nan=0.0)
+        
+        arrays = cls(
+            price=np.fromiter(map(attrgetter("price"), products), dtype=np.float64, count=count),
+            rating=rating.reshape(count),
+            in_stock=np.fromiter(
+                map(attrgetter("in_stock"), products), dtype=np.bool_, count=count
+            ),
+            vendor=np.fromiter(
+                map(VENDOR_CODES.__getitem__, map(attrgetter("vendor"), products)),
+                dtype=np.int16,
+                count=count,
+            ),
+            group=np.repeat(np.arange(len(search_results), dtype=np.int32), sizes),
+            group_count=len(search_results),
+        )
+        return arrays, products
+
+
+def select_best(candidates: CandidateArrays) -> np.ndarray:
+    """
+    Pick the best row of each group.
+    
+    Matches ``PriceOptimizer.optimize``: in-stock rows win if a group has any,
+    then lowest price, then highest rating, then original order.
+    
+    Args:
+        candidates: Packed candidates
+        
+    Returns:
+        int64 array of length ``group_count`` holding the chosen row per group,
+        or -1 for groups without candidates
+    """
+    best = np.full(candidates.group_count, -1, dtype=np.int64)
+    count = len(candidates)
+    if count == 0:
+        return best
+    
+    # Groups are contiguous, so per-group reductions are reduceat over offsets
+    sizes = np.bincount(candidates.group, minlength=candidates.group_count)
+    groups = np.flatnonzero(sizes)
+    sizes = sizes[groups]
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    
+    # Out-of-stock rows only compete in groups where nothing is in stock
+    has_stock = np.logical_or.reduceat(candidates.in_stock, starts)
+    eligible = candidates.in_stock | ~np.repeat(has_stock, sizes)
+    
+    # Lowest price among eligible rows
+    price = np.where(eligible, candidates.price, np.inf)
+    tied = eligible & (price == np.repeat(np.minimum.reduceat(price, starts), sizes))
+    
+    # Then highest rating among the cheapest
+    rating = np.where(tied, candidates.rating, -np.inf)
+    tied &= rating == np.repeat(np.maximum.reduceat(rating, starts), sizes)
+    
+    # Then the earliest remaining row
+    position = np.where(tied, np.arange(count), count)
+    best[groups] = np.minimum.reduceat(position, starts)
+    return best
@@ -0,0 +1,167 @@
+"""
+Hedged vendor requests for tail latency.
+
+When a vendor call is slower than the vendor's recent p95, a second identical
+call is issued and whichever answers first wins. Only about one call in
+twenty is hedged, so the extra load stays small while the slow tail shrinks.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, FIRST_COMPLETED, wait
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class Hedger:
+    """
+    Tracks one vendor's recent latencies and hedges calls slower than a percentile.
+    
+    Attempts are callables taking ``first``: True for the original call and
+    False for the hedge, so callers can treat the two differently (e.g. only
+    the original resets a timeout clock).
+    """
+    
+    def __init__(self, percentile: float = 95.0, window: int = 256, min_samples: int = 20):
+        """
+        Initialize the hedger.
+        
+        Args:
+            percentile: Latency percentile after which a call is hedged
+            window: Number of recent successful calls kept
+            min_samples: Calls needed before hedging starts
+        """
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self._samples: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+    
+    def record(self, seconds: float):
+        """Record the latency of a successful call."""
+        with self._lock:
+            self._samples.append(seconds)
+    
+    def delay(self) -> Optional[float]:
+        """
+        Get the hedging delay.
+        
+        Returns:
+            The configured latency percentile, or None while there are too
+            few samples to hedge
+        """
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return ordered[index]
+    
+    def timed(self, fn: Callable[[], Any]) -> Any:
+        """Call ``fn()`` and record its latency if it succeeds."""
+        started = time.monotonic()
+        result = fn()
+        self.record(time.monotonic() - started)
+        return result
+    
+    async def atimed(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await ``fn()`` and record its latency if it succeeds."""
+        started = time.monotonic()
+        result = await fn()
+        self.record(time.monotonic() - started)
+        return result
+    
+    def call(self, executor: Executor, attempt: Callable[[bool], Any]) -> Any:
+        """
+        Run ``attempt`` on the executor, hedging it once it outlives the delay.
+        
+        Args:
+            executor: Pool for the attempts; must not be the pool the caller
+                runs on, or a full pool would deadlock
+            attempt: Vendor call, given True for the original and False for the hedge
+            
+        Returns:
+            The first successful result; if both attempts fail, the last error is raised
+        """
+        self.calls += 1
+        delay = self.delay()
+        if delay is None:
+            return attempt(True)
+        
+        primary = executor.submit(attempt, True)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+        
+        self.hedged += 1
+        backup = executor.submit(attempt, False)
+        pending = {primary, backup}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    # The loser keeps running in the background; only its result is dropped
+                    self.hedge_wins += future is backup
+                    return future.result()
+        raise error
+    
+    async def acall(self, attempt: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await ``attempt``, hedging it once it outlives the delay.
+        
+        Args:
+            attempt: Vendor coroutine factory, called for the original and
+                again for the hedge
+                
+        Returns:
+            The first successful result; if both attempts fail, the last error is raised
+        """
+        self.calls += 1
+        delay = self.delay()
+        if delay is None:
+            return await attempt()
+        
+        primary = asyncio.ensure_future(attempt())
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return primary.result()
+            
+            self.hedged += 1
+            backup = asyncio.ensure_future(attempt())
+            tasks.append(backup)
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        self.hedge_wins += task is backup
+                        return task.result()
+            raise error
+        finally:
+            # Unlike threads, the losing coroutine can actually be stopped
+            for task in tasks:
+                task.cancel()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hedging metrics.
+        
+        Returns:
+            Dictionary with the current delay, calls, hedges issued and hedges
+            that answered first
+        """
+        return {
+            "delay": self.delay(),
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+        }
@@ -0,0 +1,90 @@
+"""
+Process-pool execution for CPU-heavy optimization steps.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class OptimizationPool:
+    """
+    Runs optimization steps in worker processes once they are large enough.
+    
+    Work on at least ``min_candidates`` candidates is sent to a process pool,
+    so it neither holds the GIL nor blocks the event loop; smaller work runs
+    in-process, where it is cheaper than the pickling round trip. Callers
+    ship plain data (NumPy arrays, tuples of numbers) rather than pydantic
+    models, and map the returned selection back onto their own products.
+    """
+    
+    def __init__(self, max_workers: Optional[int] = None, min_candidates: int = 20000):
+        """
+        Initialize the pool; worker processes start on first use.
+        
+        Args:
+            max_workers: Worker processes (defaults to the CPU count)
+            min_candidates: Candidates a step needs before it is sent to a worker
+        """
+        self.max_workers = max_workers
+        self.min_candidates = min_candidates
+        self.offloaded = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+    
+    def should_offload(self, size: int) -> bool:
+        """Whether work on ``size`` candidates goes to a worker process."""
+        return size >= self.min_candidates
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the process pool on first use."""
+        with self._lock:
+            if self._executor is None:
+                # Spawned rather than forked: the API process runs threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+    
+    def run(self, size: int, fn: Callable[..., Any], *args) -> Any:
+        """
+        Run ``fn(*args)``, in a worker process if ``size`` reaches the threshold.
+        
+        Args:
+            size: Number of candidates the step works on
+            fn: Module-level function (it must be picklable)
+            *args: Picklable arguments
+            
+        Returns:
+            What ``fn`` returns
+        """
+        if not self.should_offload(size):
+            return fn(*args)
+        self.offloaded += 1
+        return self._get_executor().submit(fn, *args).result()
+    
+    async def arun(self, size: int, fn: Callable[..., Any], *args) -> Any:
+        """Async version of ``run`` that awaits the worker without blocking the loop."""
+        if not self.should_offload(size):
+            return fn(*args)
+        self.offloaded += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), fn, *args)
+    
+    def shutdown(self):
+        """Stop the worker processes."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """Steps run in worker processes and the offload threshold."""
+        return {
+            "offloaded": self.offloaded,
+            "min_candidates": self.min_candidates,
+            "started": self._executor is not None,
+        }
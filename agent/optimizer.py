@@ -2,16 +2,55 @@
 Price optimization and product substitution logic.
 """
 
-from typing import List, Optional
-from agent.schemas import SearchResult, Product, OptimizationResult
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+from agent.basket import BasketOptimizer
+from agent.units import cheapest_cover, packs_needed
+from agent.candidates import CandidateArrays, select_best
+from agent.offload import OptimizationPool
+from agent.price_history import PriceHistory
+from agent.schemas import (
+    ConsolidationReport,
+    OptimizationResult,
+    Product,
+    SearchResult,
+    Vendor,
+)
+from policies.preferences import PreferencesPolicy
 
 
 class PriceOptimizer:
     """Optimizes product selection based on price and other factors."""
     
-    def __init__(self):
-        """Initialize the optimizer."""
-        pass
+    def __init__(
+        self,
+        vectorized: bool = False,
+        vendor_fixed_costs: Optional[Dict[Vendor, float]] = None,
+        vendor_minimum_orders: Optional[Dict[Vendor, float]] = None,
+        price_history: Optional[PriceHistory] = None,
+        savings_window_days: float = 30,
+        pool: Optional[OptimizationPool] = None,
+    ):
+        """
+        Initialize the optimizer.
+        
+        Args:
+            vectorized: If True, ``optimize`` uses the columnar NumPy path
+            vendor_fixed_costs: Fixed cost per vendor ordered from (shipping, handling,
+                the purchase call itself), used by ``optimize_consolidated``
+            vendor_minimum_orders: Minimum order subtotal per vendor; a shortfall is
+                charged as if the order were topped up to the minimum
+            price_history: Optional price history used to fill ``OptimizationResult.savings``
+            savings_window_days: Days of history the savings are measured against
+            pool: Optional process pool that selection and basket solving run in
+                once a request has enough candidates
+        """
+        self.vectorized = vectorized
+        self.vendor_fixed_costs = vendor_fixed_costs or {}
+        self.vendor_minimum_orders = vendor_minimum_orders or {}
+        self.price_history = price_history
+        self.savings_window_days = savings_window_days
+        self.pool = pool
     
     def optimize(self, search_results: List[SearchResult]) -> OptimizationResult:
         """
@@ -22,13 +61,29 @@ class PriceOptimizer:
         - Availability (in stock)
         - Rating (if available)
         
+        When a result asks for more than one unit, pack sizes are parsed from
+        the listings and the cheapest combination of listings covering the
+        quantity is selected instead (see ``agent.units.cheapest_cover``).
+        
+        With a ``pool``, selections over at least its threshold of candidates
+        are packed and run in a worker process (see ``aoptimize``).
+        
         Args:
             search_results: List of search results to optimize
             
         Returns:
-            OptimizationResult with selected products
+            OptimizationResult with selected products and listing quantities
         """
+        if all(result.quantity == 1 for result in search_results):
+            if self._offloads(search_results):
+                candidates, products = CandidateArrays.from_search_results(search_results)
+                best = self.pool.run(len(candidates), select_best, candidates)
+                return self._selection_result(best, products)
+            if self.vectorized:
+                return self.optimize_vectorized(search_results)
+        
         selected_products = []
+        quantities = []
         alternatives_considered = 0
         
         for result in search_results:
@@ -44,6 +99,12 @@ class PriceOptimizer:
                 # If nothing in stock, use all products
                 available_products = result.products
             
+            if result.quantity > 1:
+                for product, count in cheapest_cover(available_products, result.quantity):
+                    selected_products.append(product)
+                    quantities.append(count)
+                continue
+            
             # Sort by price (lowest first), then by rating (highest first)
             sorted_products = sorted(
                 available_products,
@@ -53,15 +114,338 @@ class PriceOptimizer:
             # Select the best product
             best_product = sorted_products[0]
             selected_products.append(best_product)
+            quantities.append(1)
         
-        total_cost = sum(p.price for p in selected_products)
+        total_cost = sum(p.price * n for p, n in zip(selected_products, quantities))
         
         return OptimizationResult(
             selected_products=selected_products,
+            quantities=quantities,
             total_cost=total_cost,
+            savings=self.savings(selected_products, quantities),
             alternatives_considered=alternatives_considered,
         )
     
+    def optimize_vectorized(self, search_results: List[SearchResult]) -> OptimizationResult:
+        """
+        Optimize product selection using packed NumPy arrays.
+        
+        Packs price, rating, stock and vendor for all search results once and
+        selects the best product per query with per-query ``reduceat``
+        reductions over the packed rows (see ``select_best``). Produces the
+        same selection, tie-breaking included, as the loop in ``optimize``.
+        
+        Args:
+            search_results: List of search results to optimize
+            
+        Returns:
+            OptimizationResult with selected products
+        """
+        candidates, products = CandidateArrays.from_search_results(search_results)
+        return self.optimize_packed(candidates, products)
+    
+    def optimize_packed(
+        self, candidates: CandidateArrays, products: List[Product]
+    ) -> OptimizationResult:
+        """
+        Optimize product selection from already packed candidates.
+        
+        Lets callers that pack once reuse the arrays across optimization passes.
+        
+        Args:
+            candidates: Candidate arrays from ``CandidateArrays.from_search_results``
+            products: Product list aligned with the candidate rows
+            
+        Returns:
+            OptimizationResult with selected products
+        """
+        return self._selection_result(select_best(candidates), products)
+    
+    async def aoptimize(self, search_results: List[SearchResult]) -> OptimizationResult:
+        """
+        Async version of ``optimize``.
+        
+        Large selections are awaited from the ``pool`` as packed arrays, so the
+        event loop keeps serving vendor I/O; everything else runs as ``optimize``.
+        
+        Args:
+            search_results: List of search results to optimize
+            
+        Returns:
+            OptimizationResult with selected products and listing quantities
+        """
+        single_units = all(result.quantity == 1 for result in search_results)
+        if single_units and self._offloads(search_results):
+            candidates, products = CandidateArrays.from_search_results(search_results)
+            best = await self.pool.arun(len(candidates), select_best, candidates)
+            return self._selection_result(best, products)
+        return self.optimize(search_results)
+    
+    def _offloads(self, search_results: List[SearchResult]) -> bool:
+        """Whether the pool takes a step over these search results."""
+        return self.pool is not None and self.pool.should_offload(
+            _candidate_count(search_results)
+        )
+    
+    def _selection_result(self, best, products: List[Product]) -> OptimizationResult:
+        """Build the result of a ``select_best`` selection over ``products``."""
+        selected_products = [products[row] for row in best.tolist() if row >= 0]
+        total_cost = sum(p.price for p in selected_products)
+        
+        return OptimizationResult(
+            selected_products=selected_products,
+            quantities=[1] * len(selected_products),
+            total_cost=total_cost,
+            savings=self.savings(selected_products),
+            alternatives_considered=len(products),
+        )
+    
+    def optimize_basket(
+        self,
+        search_results: List[SearchResult],
+        budget: Optional[float],
+        preferences: Optional[PreferencesPolicy] = None,
+        time_limit: float = 0.2,
+    ) -> OptimizationResult:
+        """
+        Optimize the whole basket under a budget instead of item by item.
+        
+        Chooses one product per search result to maximize rating, stock and
+        preference score, net of a price penalty, while keeping the total
+        within ``budget``. See
+        ``BasketOptimizer`` for the solver.
+        
+        Args:
+            search_results: List of search results to optimize
+            budget: Maximum total cost, or None for no limit
+            preferences: Optional preferences used for scoring and exclusions
+            time_limit: Seconds the solver may spend improving the basket
+            
+        Returns:
+            OptimizationResult with selected products
+        """
+        if not self._offloads(search_results):
+            basket = BasketOptimizer(preferences=preferences, time_limit=time_limit)
+            result = basket.optimize(search_results, budget)
+            result.savings = self.savings(result.selected_products, result.quantities)
+            return result
+        
+        frontiers, item_quantities, compact = self._basket_problem(
+            search_results, preferences, time_limit
+        )
+        choice = self.pool.run(
+            _candidate_count(search_results), BasketOptimizer.solve, compact, budget, time_limit
+        )
+        return self._basket_result(frontiers, item_quantities, choice, search_results)
+    
+    async def aoptimize_basket(
+        self,
+        search_results: List[SearchResult],
+        budget: Optional[float],
+        preferences: Optional[PreferencesPolicy] = None,
+        time_limit: float = 0.2,
+    ) -> OptimizationResult:
+        """
+        Async version of ``optimize_basket``.
+        
+        Frontiers are built in-process; with a ``pool`` and enough candidates
+        only their (cents, score) pairs are shipped to a worker to solve, and
+        the chosen indexes come back.
+        
+        Args:
+            search_results: List of search results to optimize
+            budget: Maximum total cost, or None for no limit
+            preferences: Optional preferences used for scoring and exclusions
+            time_limit: Seconds the solver may spend improving the basket
+            
+        Returns:
+            OptimizationResult with selected products
+        """
+        if not self._offloads(search_results):
+            return self.optimize_basket(search_results, budget, preferences, time_limit)
+        
+        frontiers, item_quantities, compact = self._basket_problem(
+            search_results, preferences, time_limit
+        )
+        choice = await self.pool.arun(
+            _candidate_count(search_results), BasketOptimizer.solve, compact, budget, time_limit
+        )
+        return self._basket_result(frontiers, item_quantities, choice, search_results)
+    
+    def _basket_problem(self, search_results, preferences, time_limit):
+        """Build a basket's frontiers and their compacted form for ``BasketOptimizer.solve``."""
+        basket = BasketOptimizer(preferences=preferences, time_limit=time_limit)
+        frontiers, item_quantities = basket.frontiers(search_results)
+        return frontiers, item_quantities, [basket.compact(f) for f in frontiers]
+    
+    def _basket_result(self, frontiers, item_quantities, choice, search_results):
+        """Map a solved basket back onto products and add savings."""
+        result = BasketOptimizer.result(frontiers, item_quantities, choice, search_results)
+        result.savings = self.savings(result.selected_products, result.quantities)
+        return result
+    
+    def optimize_consolidated(self, search_results: List[SearchResult]) -> OptimizationResult:
+        """
+        Optimize product selection, then consolidate onto fewer vendors.
+        
+        Starts from the per-item selection of ``optimize`` and applies
+        ``consolidate``.
+        
+        Args:
+            search_results: List of search results to optimize
+            
+        Returns:
+            OptimizationResult with selected products and a consolidation report
+        """
+        return self.consolidate(self.optimize(search_results), search_results)
+    
+    def consolidate(
+        self, optimization_result: OptimizationResult, search_results: List[SearchResult]
+    ) -> OptimizationResult:
+        """
+        Move items off vendors whenever that lowers the landed cost.
+        
+        Repeatedly tries to close one vendor, smallest first, by moving each of
+        its items to the cheapest alternative (from ``find_alternatives`` on that
+        item's own search result) at a vendor that is already in the basket. A
+        move is kept only if the landed cost (see ``landed_cost``) drops. In-stock
+        items are only replaced by in-stock alternatives, bought in enough packs
+        to cover the item's quantity. Items split across several listings stay
+        where they are, so a vendor holding one of them is never closed; the
+        other items are still consolidated.
+        
+        Args:
+            optimization_result: Per-item selection, in search result order
+            search_results: The search results the selection was made from
+            
+        Returns:
+            OptimizationResult with the consolidated selection and a report of
+            vendor calls and landed cost saved
+        """
+        item_results = [result for result in search_results if result.products]
+        selected = list(optimization_result.selected_products)
+        quantities = list(optimization_result.quantities) or [1] * len(selected)
+        landed_cost_before = self.landed_cost(selected, quantities)
+        vendors_before = len({p.vendor for p in selected})
+        
+        items = _item_indexes(selected, item_results)
+        improved = items is not None
+        while improved:
+            improved = False
+            current_cost = self.landed_cost(selected, quantities)
+            counts = Counter(p.vendor for p in selected)
+            for vendor in sorted(counts, key=lambda v: (counts[v], v.value)):
+                candidate = self._close_vendor(
+                    vendor, selected, quantities, item_results, items, set(counts)
+                )
+                if candidate and self.landed_cost(*candidate) < current_cost - 1e-9:
+                    selected, quantities = candidate
+                    improved = True
+                    break
+        
+        landed_cost_after = self.landed_cost(selected, quantities)
+        vendors_after = len({p.vendor for p in selected})
+        
+        return OptimizationResult(
+            selected_products=selected,
+            quantities=quantities,
+            total_cost=sum(p.price * n for p, n in zip(selected, quantities)),
+            savings=self.savings(selected, quantities),
+            alternatives_considered=optimization_result.alternatives_considered,
+            consolidation=ConsolidationReport(
+                vendors_before=vendors_before,
+                vendors_after=vendors_after,
+                vendor_calls_saved=vendors_before - vendors_after,
+                landed_cost_before=round(landed_cost_before, 2),
+                landed_cost_after=round(landed_cost_after, 2),
+                cost_saved=round(landed_cost_before - landed_cost_after, 2),
+            ),
+        )
+    
+    def savings(
+        self, products: List[Product], quantities: Optional[List[int]] = None
+    ) -> Optional[float]:
+        """
+        Amount saved against each product's recent average price.
+        
+        Looks up the time-weighted average over ``savings_window_days`` in the
+        price history; products without history are left out. A negative
+        figure means the basket costs more than it has recently.
+        
+        Args:
+            products: Selected products
+            quantities: Listings bought of each product (defaults to one each)
+            
+        Returns:
+            Savings in USD, or None without price history for any product
+        """
+        if self.price_history is None:
+            return None
+        quantities = quantities or [1] * len(products)
+        savings = None
+        for product, count in zip(products, quantities):
+            average = self.price_history.average_price(
+                product.vendor, product.id, days=self.savings_window_days
+            )
+            if average is not None:
+                savings = (savings or 0.0) + (average - product.price) * count
+        return None if savings is None else round(savings, 2)
+    
+    def landed_cost(
+        self, products: List[Product], quantities: Optional[List[int]] = None
+    ) -> float:
+        """
+        Total cost of a basket including per-vendor costs.
+        
+        Each vendor in the basket adds its fixed cost, plus any shortfall
+        below its minimum order.
+        
+        Args:
+            products: Products in the basket
+            quantities: Listings bought of each product; one each if omitted
+            
+        Returns:
+            Landed cost in USD
+        """
+        subtotals: Dict[Vendor, float] = defaultdict(float)
+        for product, quantity in zip(products, quantities or [1] * len(products)):
+            subtotals[product.vendor] += product.price * quantity
+        
+        cost = 0.0
+        for vendor, subtotal in subtotals.items():
+            minimum = self.vendor_minimum_orders.get(vendor, 0.0)
+            cost += max(subtotal, minimum) + self.vendor_fixed_costs.get(vendor, 0.0)
+        return cost
+    
+    def _close_vendor(
+        self,
+        vendor: Vendor,
+        selected: List[Product],
+        quantities: List[int],
+        item_results: List[SearchResult],
+        items: List[int],
+        open_vendors: set,
+    ) -> Optional[Tuple[List[Product], List[int]]]:
+        """Selection with every item moved off ``vendor``, or None if one cannot move."""
+        products, counts = list(selected), list(quantities)
+        listings = Counter(items)
+        for i, product in enumerate(selected):
+            if product.vendor != vendor:
+                continue
+            if listings[items[i]] > 1:
+                return None
+            item = item_results[items[i]]
+            alternatives = [
+                (p.price * packs_needed(p, item.quantity), p)
+                for p in self.find_alternatives(product, [item])
+                if p.vendor in open_vendors and (p.in_stock or not product.in_stock)
+            ]
+            if not alternatives:
+                return None
+            _, products[i] = min(alternatives, key=lambda alternative: alternative[0])
+            counts[i] = packs_needed(products[i], item.quantity)
+        return products, counts
+    
     def find_alternatives(self, product: Product, search_results: List[SearchResult]) -> List[Product]:
         """
         Find alternative products for a given product.
@@ -85,3 +469,42 @@ class PriceOptimizer:
         
         return alternatives
 
+
+def _item_indexes(
+    selected: List[Product], item_results: List[SearchResult]
+) -> Optional[List[int]]:
+    """
+    Index of the search result each selected product was chosen from.
+    
+    Selections list each non-empty result's listings together, in result
+    order, so products are matched to results by walking both lists once.
+    
+    Returns:
+        One index into ``item_results`` per selected product, or None if the
+        selection does not line up with the results
+    """
+    items: List[int] = []
+    item = -1
+    for position, product in enumerate(selected):
+        # Move to the next result when this one does not offer the product,
+        # or when every remaining product is needed for the results left
+        if (
+            item < 0
+            or not _offers(item_results[item], product)
+            or len(selected) - position == len(item_results) - item - 1
+        ):
+            item += 1
+        if item >= len(item_results) or not _offers(item_results[item], product):
+            return None
+        items.append(item)
+    return items if item == len(item_results) - 1 else None
+
+
+def _offers(result: SearchResult, product: Product) -> bool:
+    """Whether a search result lists a product."""
+    return any(p.id == product.id and p.vendor == product.vendor for p in result.products)
+
+
+def _candidate_count(search_results: List[SearchResult]) -> int:
+    """Products across all search results."""
+    return sum(len(result.products) for result in search_results)
@@ -23,10 +23,12 @@ class Planner:
         Returns:
             List of search queries to execute
         """
+        quantities = request.quantity_per_item or {}
         queries = []
         for item in request.items:
             query = SearchQuery(
                 query=item,
+                quantity=quantities.get(item, 1),
                 preferred_vendors=request.preferred_vendors,
             )
             queries.append(query)
@@ -48,6 +50,7 @@ class Planner:
         plan = {
             "items_to_procure": request.items,
             "search_queries": [q.query for q in search_queries],
+            "quantities": [q.quantity for q in search_queries],
             "budget_limit": request.budget_limit,
             "requires_approval": request.require_approval,
         }
@@ -0,0 +1,260 @@
+"""
+Compact per-product price history backed by memory-mapped arrays.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple, Union
+from urllib.parse import quote
+import numpy as np
+from agent.schemas import PriceStats, Vendor
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends from one process at a time only
+    fcntl = None
+
+# One fixed-size record per price change: epoch seconds and price in cents
+RECORD_DTYPE = np.dtype([("ts", "<i8"), ("cents", "<i4")])
+
+_EMPTY = np.zeros(0, dtype=RECORD_DTYPE)
+
+SeriesKey = Tuple[Vendor, str]
+
+
+class PriceHistory:
+    """
+    Append-only price series per ``(vendor, product_id)``.
+    
+    Each series is a flat binary file of ``RECORD_DTYPE`` records, appended
+    only when the price changes, so a listing whose price never moves costs
+    12 bytes. Reads memory-map the file, and range queries binary-search the
+    timestamp column instead of scanning. Prices are treated as a step
+    function: each recorded price holds until the next change, and averages
+    are weighted by how long each price held.
+    
+    Several processes (the API and its workers) may record into the same
+    directory: appends hold an exclusive lock on the series file and compare
+    against the record actually at its end.
+    """
+    
+    def __init__(
+        self, directory: Union[str, Path], max_open: int = 256, max_tracked: int = 65536
+    ):
+        """
+        Initialize the history.
+        
+        Args:
+            directory: Directory holding one sub-directory of series per vendor
+            max_open: Most recently used series kept mapped; each holds a file descriptor
+            max_tracked: Most recently recorded series whose last record is
+                remembered, so unchanged prices are skipped without opening the file
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_open = max_open
+        self.max_tracked = max_tracked
+        self._maps: OrderedDict[SeriesKey, np.ndarray] = OrderedDict()
+        # File size and last (ts, cents) per series, valid while the size is unchanged
+        self._last: OrderedDict[SeriesKey, Tuple[int, Tuple[int, int]]] = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _path(self, vendor: Vendor, product_id: str) -> Path:
+        """File holding a series; product IDs are percent-encoded into safe file names."""
+        return self.directory / vendor.value / f"{quote(product_id, safe='')}.bin"
+    
+    def record(
+        self, vendor: Vendor, product_id: str, price: float, ts: Optional[float] = None
+    ) -> bool:
+        """
+        Record an observed price.
+        
+        Observations older than the series' last record are stored at the last
+        record's time, keeping each series sorted.
+        
+        Args:
+            vendor: Vendor selling the product
+            product_id: The vendor's product ID
+            price: Observed price in USD
+            ts: Observation time in epoch seconds (defaults to now)
+            
+        Returns:
+            True if a record was appended, False if the price was unchanged
+        """
+        key = (vendor, product_id)
+        cents = int(round(price * 100))
+        path = self._path(vendor, product_id)
+        with self._lock:
+            # Unchanged price, and no other process has appended since
+            tracked = self._last.get(key)
+            if tracked is not None and tracked[1][1] == cents and tracked[0] == _size(path):
+                self._last.move_to_end(key)
+                return False
+            
+            path.parent.mkdir(exist_ok=True)
+            with path.open("a+b") as f:
+                if fcntl is not None:
+                    # Released when the file is closed, after the write is flushed
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                last, size = _read_last(f)
+                if last is not None and last[1] == cents:
+                    self._track(key, size, last)
+                    return False
+                
+                when = int(time.time() if ts is None else ts)
+                if last is not None:
+                    when = max(when, last[0])
+                f.write(np.array([(when, cents)], dtype=RECORD_DTYPE).tobytes())
+            self._track(key, size + RECORD_DTYPE.itemsize, (when, cents))
+            # The mapping covers the old file length; remap on next read
+            self._maps.pop(key, None)
+            return True
+    
+    def _track(self, key: SeriesKey, size: int, last: Tuple[int, int]):
+        """Remember a series' size and last record, assuming the lock is held."""
+        self._last[key] = (size, last)
+        self._last.move_to_end(key)
+        if len(self._last) > self.max_tracked:
+            self._last.popitem(last=False)
+    
+    def series(self, vendor: Vendor, product_id: str) -> np.ndarray:
+        """
+        Get a product's full series.
+        
+        Args:
+            vendor: Vendor selling the product
+            product_id: The vendor's product ID
+            
+        Returns:
+            Read-only structured array with ``ts`` and ``cents`` columns, oldest first
+        """
+        with self._lock:
+            return self._load((vendor, product_id))
+    
+    def _load(self, key: SeriesKey) -> np.ndarray:
+        """Map a series file, assuming the lock is held."""
+        series = self._maps.get(key)
+        if series is not None:
+            self._maps.move_to_end(key)
+        else:
+            path = self._path(*key)
+            size = path.stat().st_size if path.exists() else 0
+            # A torn trailing record from an interrupted write is ignored
+            count = size // RECORD_DTYPE.itemsize
+            if count == 0:
+                series = _EMPTY
+            else:
+                series = np.memmap(path, dtype=RECORD_DTYPE, mode="r", shape=(count,))
+            self._maps[key] = series
+            if len(self._maps) > self.max_open:
+                self._maps.popitem(last=False)
+        return series
+    
+    def price_at(self, vendor: Vendor, product_id: str, ts: float) -> Optional[float]:
+        """
+        Get the price in effect at a point in time.
+        
+        Args:
+            vendor: Vendor selling the product
+            product_id: The vendor's product ID
+            ts: Epoch seconds
+            
+        Returns:
+            Price in USD, or None if nothing was recorded by then
+        """
+        series = self.series(vendor, product_id)
+        index = int(np.searchsorted(series["ts"], ts, side="right")) - 1
+        if index < 0:
+            return None
+        return int(series["cents"][index]) / 100
+    
+    def stats(
+        self, vendor: Vendor, product_id: str, start: float, end: Optional[float] = None
+    ) -> Optional[PriceStats]:
+        """
+        Aggregate prices over a time range.
+        
+        The price in effect at ``start`` counts from ``start``; a series that
+        begins later counts from its first record.
+        
+        Args:
+            vendor: Vendor selling the product
+            product_id: The vendor's product ID
+            start: Range start in epoch seconds
+            end: Range end in epoch seconds (defaults to now)
+            
+        Returns:
+            PriceStats for the range, or None if nothing was recorded by ``end``
+        """
+        end = time.time() if end is None else end
+        series = self.series(vendor, product_id)
+        ts = series["ts"]
+        lo = max(int(np.searchsorted(ts, start, side="right")) - 1, 0)
+        hi = int(np.searchsorted(ts, end, side="right"))
+        if hi <= lo:
+            return None
+        
+        cents = np.asarray(series["cents"][lo:hi], dtype=np.int64)
+        starts = np.maximum(np.asarray(ts[lo:hi], dtype=np.float64), start)
+        held = np.diff(np.append(starts, end))
+        total = held.sum()
+        average = (cents * held).sum() / total if total > 0 else cents[-1]
+        return PriceStats(
+            observations=len(cents),
+            min_price=int(cents.min()) / 100,
+            max_price=int(cents.max()) / 100,
+            avg_price=round(float(average) / 100, 4),
+            first_price=int(cents[0]) / 100,
+            last_price=int(cents[-1]) / 100,
+        )
+    
+    def average_price(
+        self, vendor: Vendor, product_id: str, days: float = 30, now: Optional[float] = None
+    ) -> Optional[float]:
+        """
+        Time-weighted average price over the last ``days``.
+        
+        Args:
+            vendor: Vendor selling the product
+            product_id: The vendor's product ID
+            days: Window length in days
+            now: Window end in epoch seconds (defaults to now)
+            
+        Returns:
+            Average price in USD, or None if there is no history
+        """
+        now = time.time() if now is None else now
+        stats = self.stats(vendor, product_id, now - days * 86400, now)
+        return None if stats is None else stats.avg_price
+
+
+def _size(path: Path) -> int:
+    """Size of a series file in bytes, 0 if it does not exist yet."""
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _read_last(f) -> Tuple[Optional[Tuple[int, int]], int]:
+    """
+    Read the last whole record of a series file opened for appending.
+    
+    A torn trailing record from an interrupted write is cut off first, so the
+    next append lines up with the records before it.
+    
+    Returns:
+        The last (ts, cents), or None if the file is empty, and the file size
+    """
+    size = f.seek(0, os.SEEK_END)
+    aligned = size - size % RECORD_DTYPE.itemsize
+    if aligned != size:
+        f.truncate(aligned)
+    if aligned == 0:
+        return None, 0
+    f.seek(aligned - RECORD_DTYPE.itemsize)
+    record = np.frombuffer(f.read(RECORD_DTYPE.itemsize), dtype=RECORD_DTYPE)[0]
+    return (int(record["ts"]), int(record["cents"])), aligned
@@ -45,10 +45,31 @@ class Purchaser:
         
         return PurchaseRequest(
             products=optimization_result.selected_products,
+            quantities=optimization_result.quantities,
             total_amount=optimization_result.total_cost,
             requires_approval=requires_approval,
         )
     
+    def get_spending_limit(self) -> Optional[float]:
+        """
+        Get the largest total that passes both budget and approval checks.
+        
+        Returns:
+            Spending limit, or None if neither policy limits spending
+        """
+        limits = []
+        
+        if self.budget_policy:
+            remaining = self.budget_policy.get_remaining_budget()
+            if remaining is not None:
+                limits.append(remaining)
+        
+        if self.approval_policy and not self.approval_policy.auto_approve:
+            if self.approval_policy.approval_threshold is not None:
+                limits.append(self.approval_policy.approval_threshold)
+        
+        return min(limits) if limits else None
+    
     def can_purchase(self, purchase_request: PurchaseRequest) -> tuple[bool, Optional[str]]:
         """
         Check if purchase can proceed.
@@ -73,6 +94,31 @@ class Purchaser:
         
         return True, None
     
+    def check_item(self, amount: float, committed: float = 0.0) -> tuple[bool, Optional[str]]:
+        """
+        Check one more line item of an order that is purchased item by item.
+        
+        Budget and approval apply to the order's running total, so items are
+        admitted until the next one would cross a limit.
+        
+        Args:
+            amount: Cost of the item
+            committed: Cost of the order's items already admitted
+            
+        Returns:
+            Tuple of (can_purchase, error_message)
+        """
+        total = committed + amount
+        if self.budget_policy:
+            can_afford, message = self.budget_policy.check_budget(total)
+            if not can_afford:
+                return False, message
+        
+        if self.approval_policy and not self.approval_policy.is_approved(total):
+            return False, "Purchase requires approval"
+        
+        return True, None
+    
     def execute_purchase(self, purchase_request: PurchaseRequest) -> PurchaseResult:
         """
         Execute a purchase (placeholder - actual implementation would call vendor APIs).
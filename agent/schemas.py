@@ -3,11 +3,15 @@ Data models and schemas for the office essentials procurement agent.
 """
 
 from typing import Optional, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, conint
 from datetime import datetime
 from enum import Enum
 
 
+# Largest number of units that may be requested for one item
+MAX_QUANTITY = 10000
+
+
 class Vendor(str, Enum):
     """Supported vendors."""
     AMAZON = "amazon"
@@ -37,36 +41,99 @@ class SearchQuery(BaseModel):
     query: str = Field(..., description="Search query string")
     category: Optional[str] = None
     max_results: int = Field(default=10, ge=1, le=50)
+    quantity: int = Field(
+        default=1, ge=1, le=MAX_QUANTITY, description="Units of the item required"
+    )
     min_price: Optional[float] = Field(None, ge=0)
     max_price: Optional[float] = Field(None, ge=0)
     preferred_vendors: Optional[List[Vendor]] = None
 
 
+class VendorError(BaseModel):
+    """A vendor that failed or timed out while serving a search."""
+    vendor: str
+    error: str
+    timed_out: bool = False
+    circuit_open: bool = False
+
+
+class PriceStats(BaseModel):
+    """Aggregated price history of one product over a time range."""
+    observations: int
+    min_price: float
+    max_price: float
+    avg_price: float = Field(description="Average weighted by how long each price held")
+    first_price: float
+    last_price: float
+
+
 class SearchResult(BaseModel):
     """Search result containing multiple products."""
     query: str
     products: List[Product]
     total_found: int
+    quantity: int = 1
+    errors: List[VendorError] = Field(default_factory=list)
     search_time: datetime = Field(default_factory=datetime.now)
 
 
+class ConsolidationReport(BaseModel):
+    """Effect of consolidating a basket onto fewer vendors."""
+    vendors_before: int
+    vendors_after: int
+    vendor_calls_saved: int
+    landed_cost_before: float
+    landed_cost_after: float
+    cost_saved: float
+
+
 class OptimizationResult(BaseModel):
     """Result of price optimization."""
     selected_products: List[Product]
+    quantities: List[int] = Field(
+        default_factory=list,
+        description="Listings to buy of each selected product; empty means one each",
+    )
     total_cost: float
     savings: Optional[float] = None
     alternatives_considered: int
+    consolidation: Optional[ConsolidationReport] = None
     optimization_time: datetime = Field(default_factory=datetime.now)
 
 
 class PurchaseRequest(BaseModel):
     """Purchase request."""
     products: List[Product]
+    quantities: List[int] = Field(default_factory=list)
     total_amount: float
     requires_approval: bool = False
     notes: Optional[str] = None
 
 
+class ItemStatus(str, Enum):
+    """Stage of one line item in the streaming procurement pipeline."""
+    PENDING = "pending"
+    SEARCHING = "searching"
+    OPTIMIZING = "optimizing"
+    CHECKING = "checking"
+    PURCHASING = "purchasing"
+    PURCHASED = "purchased"
+    NOT_FOUND = "not_found"
+    REJECTED = "rejected"
+    FAILED = "failed"
+
+
+class ItemUpdate(BaseModel):
+    """Progress of one line item through the streaming procurement pipeline."""
+    index: int = Field(..., description="Position of the item in the request")
+    item: str
+    status: ItemStatus
+    products: List[Product] = Field(default_factory=list)
+    quantities: List[int] = Field(default_factory=list)
+    cost: Optional[float] = None
+    error: Optional[str] = None
+
+
 class PurchaseResult(BaseModel):
     """Result of a purchase attempt."""
     success: bool
@@ -81,7 +148,7 @@ class ProcurementRequest(BaseModel):
     """High-level procurement request."""
     items: List[str] = Field(..., description="List of items to procure (e.g., 'pens', 'paper')")
     budget_limit: Optional[float] = Field(None, ge=0)
-    quantity_per_item: Optional[dict[str, int]] = None
+    quantity_per_item: Optional[dict[str, conint(ge=1, le=MAX_QUANTITY)]] = None
     preferred_vendors: Optional[List[Vendor]] = None
     require_approval: bool = True
 
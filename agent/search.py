@@ -2,48 +2,929 @@
 Product search logic and coordination across vendors.
 """
 
-from typing import List, Optional
-from agent.schemas import SearchQuery, SearchResult, Product, Vendor
-from integrations.base import VendorInterface
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from agent.cache import SearchCache
+from agent.hedging import Hedger
+from agent.schemas import SearchQuery, SearchResult, Product, Vendor, VendorError
+from agent.singleflight import SingleFlight
+from integrations.base import (
+    AsyncVendorInterface,
+    SyncVendorAdapter,
+    VendorInterface,
+    as_async_vendor,
+)
+from integrations.circuit import CircuitBreaker, CircuitBreakerRegistry, CircuitOpenError
+from integrations.ratelimit import RateLimiterRegistry, VendorRateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Default number of vendor calls allowed in flight at once
+DEFAULT_MAX_IN_FLIGHT = 16
+
+# How often to re-check queued calls for a start time while timeouts apply
+_START_POLL_INTERVAL = 0.01
+
+# Guards which of a call's worker and its deadline reports it to the breaker
+_OUTCOME_LOCK = threading.Lock()
+
+
+def _check_batch_results(texts: List[str], results: List[Any]):
+    """
+    Check that a batch search answered every query it was sent.
+    
+    Raises:
+        ValueError: If the vendor returned a different number of result lists
+    """
+    if len(results) != len(texts):
+        raise ValueError(
+            f"Batch search returned {len(results)} results for {len(texts)} queries"
+        )
+
+
+def _source(vendor: Union[VendorInterface, AsyncVendorInterface]) -> Any:
+    """The vendor instance behind a search, seen through any ``SyncVendorAdapter``."""
+    if isinstance(vendor, SyncVendorAdapter):
+        return vendor.vendor
+    return vendor
+
+
+def _batch_chunks(
+    entries: List[Tuple[SearchQuery, Any]], max_batch_size: int
+) -> List[Tuple[int, Dict[str, List[Any]]]]:
+    """
+    Split one vendor's queries into batch requests.
+    
+    Entries are grouped by ``max_results`` and then by query text, and each
+    group is cut into chunks of up to ``max_batch_size`` distinct texts.
+    
+    Args:
+        entries: (query, item) pairs; the items come back under their query text
+        max_batch_size: Most distinct queries the vendor accepts per batch
+        
+    Returns:
+        Per chunk, its ``max_results`` and the items of each query text, in
+        first-seen order; chunks with a single text are included
+    """
+    groups: Dict[int, Dict[str, List[Any]]] = {}
+    for query, item in entries:
+        by_text = groups.setdefault(query.max_results, {})
+        by_text.setdefault(query.query, []).append(item)
+    
+    size = max(max_batch_size, 1)
+    chunks: List[Tuple[int, Dict[str, List[Any]]]] = []
+    for max_results, by_text in groups.items():
+        texts = list(by_text)
+        for start in range(0, len(texts), size):
+            chunks.append(
+                (max_results, {text: by_text[text] for text in texts[start:start + size]})
+            )
+    return chunks
+
+
+class _GuardedCall:
+    """A vendor request sent through the searcher's guards, timed from when it gets a slot."""
+    
+    __slots__ = ("vendor", "guard", "started", "_reported")
+    
+    def __init__(self, vendor: VendorInterface, guard: Callable[..., Any]):
+        self.vendor = vendor
+        self.guard = guard
+        self.started: Optional[float] = None
+        self._reported = False
+    
+    def _slot_acquired(self):
+        """Restart the clock once a slot is held; queueing does not count against the timeout."""
+        self.started = time.monotonic()
+    
+    def claim_outcome(self) -> bool:
+        """Take the right to report this call to its breaker; True only the first time."""
+        with _OUTCOME_LOCK:
+            reported, self._reported = self._reported, True
+        return not reported
+
+
+class _VendorCall(_GuardedCall):
+    """One (query, vendor) unit of work scheduled on the vendor pool."""
+    
+    __slots__ = ("query_index", "query", "flights", "outcome")
+    
+    def __init__(
+        self,
+        query_index: int,
+        vendor: VendorInterface,
+        query: SearchQuery,
+        guard: Callable[..., List[Product]],
+        flights: Optional[SingleFlight] = None,
+    ):
+        super().__init__(vendor, guard)
+        self.query_index = query_index
+        self.query = query
+        self.flights = flights
+        self.outcome: Union[List[Product], VendorError] = []
+    
+    def run(self) -> List[Product]:
+        """Execute the vendor search, recording when it actually started."""
+        self.started = time.monotonic()
+        if self.flights is None:
+            return self._search()
+        key = SearchCache.make_key(
+            self.vendor.get_vendor_type(),
+            self.query.query,
+            self.query.max_results,
+            _source(self.vendor),
+        )
+        return self.flights.do(key, self._search)
+    
+    def _search(self) -> List[Product]:
+        """Send the search to the vendor through the searcher's guards."""
+        return self.guard(
+            self.vendor,
+            lambda: self.vendor.search(self.query.query, max_results=self.query.max_results),
+            self._slot_acquired,
+            self.claim_outcome,
+        )
+    
+    @property
+    def members(self) -> List["_VendorCall"]:
+        """The (query, vendor) calls this unit answers."""
+        return [self]
+    
+    def settle(self, outcome: Union[List[Product], VendorError]):
+        """Record the vendor's answer or the error that replaced it."""
+        self.outcome = outcome
+
+
+class _VendorBatchCall(_GuardedCall):
+    """Several (query, vendor) calls sent to one vendor as a single batch request."""
+    
+    __slots__ = ("members",)
+    
+    def __init__(
+        self,
+        vendor: VendorInterface,
+        members: List[_VendorCall],
+        guard: Callable[..., List[List[Product]]],
+    ):
+        super().__init__(vendor, guard)
+        self.members = members
+    
+    def run(self) -> List[List[Product]]:
+        """Send one ``search_batch`` request; identical queries are asked once."""
+        self.started = time.monotonic()
+        texts = list(dict.fromkeys(call.query.query for call in self.members))
+        max_results = self.members[0].query.max_results
+        results = self.guard(
+            self.vendor,
+            lambda: self.vendor.search_batch(texts, max_results=max_results),
+            self._slot_acquired,
+            self.claim_outcome,
+        )
+        _check_batch_results(texts, results)
+        by_text = dict(zip(texts, results))
+        return [by_text[call.query.query] for call in self.members]
+    
+    def settle(self, outcome: Union[List[List[Product]], VendorError]):
+        """Hand each member its products, or every member the batch's error."""
+        if isinstance(outcome, VendorError):
+            for call in self.members:
+                call.outcome = outcome
+            return
+        for call, products in zip(self.members, outcome):
+            call.outcome = products
+
+
+_CallUnit = Union[_VendorCall, _VendorBatchCall]
+
+
+class _AsyncBatch:
+    """A ``search_batch`` request in flight on the event loop, shared by its queries."""
+    
+    __slots__ = ("task", "started")
+    
+    def __init__(self, task: "asyncio.Task", started: asyncio.Event):
+        self.task = task
+        self.started = started
 
 
 class ProductSearcher:
     """Coordinates product searches across multiple vendors."""
     
-    def __init__(self, vendors: Optional[List[VendorInterface]] = None):
+    def __init__(
+        self,
+        vendors: Optional[List[VendorInterface]] = None,
+        concurrent: bool = True,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        vendor_timeout: Optional[float] = None,
+        search_timeout: Optional[float] = None,
+        cache: Optional[SearchCache] = None,
+        catalog=None,
+        coalesce: bool = True,
+        rate_limits: Optional[RateLimiterRegistry] = None,
+        breakers: Optional[CircuitBreakerRegistry] = None,
+        hedge_percentile: Optional[float] = None,
+    ):
         """
         Initialize the product searcher.
         
         Args:
             vendors: List of vendor interfaces to search. If None, will be loaded dynamically.
+            concurrent: If True, run vendor calls concurrently on a bounded thread pool
+            max_in_flight: Maximum number of vendor calls running at the same time
+            vendor_timeout: Seconds to wait for any single vendor call once it has started
+            search_timeout: Deadline in seconds for a whole query across all vendors
+            cache: Optional cache consulted before each vendor search
+            catalog: Optional persistent store with the same ``get``/``put``
+                interface as ``SearchCache``, consulted when the cache misses;
+                its errors count as misses and unsaved results
+            coalesce: If True, identical concurrent vendor lookups share one upstream call
+            rate_limits: Optional per-vendor rate limiters; calls over a vendor's
+                limits wait for a slot instead of failing
+            breakers: Optional per-vendor circuit breakers; vendors whose circuit
+                is open are skipped without being called
+            hedge_percentile: If set, a vendor call slower than this percentile of
+                the vendor's recent latencies is re-issued and the first answer wins
         """
         self.vendors = vendors or []
+        self.concurrent = concurrent
+        self.max_in_flight = max_in_flight
+        self.vendor_timeout = vendor_timeout
+        self.search_timeout = search_timeout
+        self.cache = cache
+        self.catalog = catalog
+        self.flights: Optional[SingleFlight] = SingleFlight() if coalesce else None
+        self.rate_limits = rate_limits
+        self.breakers = breakers
+        self.hedge_percentile = hedge_percentile
+        self.hedgers: Dict[Vendor, Hedger] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
     
     def register_vendor(self, vendor: VendorInterface):
         """Register a vendor for searching."""
         self.vendors.append(vendor)
     
+    def close(self):
+        """Release the vendor thread pools without waiting for straggling vendors."""
+        with self._executor_lock:
+            for executor in (self._executor, self._hedge_executor):
+                if executor is not None:
+                    executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._hedge_executor = None
+    
     def search(self, query: SearchQuery) -> SearchResult:
         """
         Search for products across all registered vendors.
         
+        Vendors that raise or miss their timeout are reported in
+        ``SearchResult.errors``; products from the vendors that answered in
+        time are still returned.
+        
         Args:
             query: The search query
             
         Returns:
             SearchResult containing products from all vendors
         """
-        all_products = []
+        return self.search_multiple([query])[0]
+    
+    def search_multiple(self, queries: List[SearchQuery]) -> List[SearchResult]:
+        """
+        Execute multiple search queries.
         
-        for vendor in self.vendors:
+        Every (query, vendor) pair is scheduled as an independent call, with at
+        most ``max_in_flight`` running at once; for vendors that support batch
+        search, the pairs the cache cannot answer are grouped into
+        ``search_batch`` requests of up to the vendor's ``max_batch_size``
+        queries instead. Results are returned in the same order as ``queries``.
+        
+        Args:
+            queries: List of search queries
+            
+        Returns:
+            List of search results
+        """
+        calls = [
+            _VendorCall(index, vendor, query, self._guarded, self.flights)
+            for index, query in enumerate(queries)
+            for vendor in self.vendors
+        ]
+        
+        # Only calls the cache cannot answer go to the vendors
+        uncached = [call for call in calls if not self._load_from_cache(call)]
+        units = self._batch_calls(uncached)
+        
+        if self._use_pool(units):
+            self._run_concurrent(units, len(queries))
+        else:
+            self._run_sequential(units)
+        
+        for call in uncached:
+            self._store_in_cache(call.vendor, call.query, call.outcome)
+        
+        products: List[List[Product]] = [[] for _ in queries]
+        errors: List[List[VendorError]] = [[] for _ in queries]
+        
+        # Calls are in (query, vendor registration) order, so the merged
+        # output does not depend on which vendor answered first
+        for call in calls:
+            if isinstance(call.outcome, VendorError):
+                errors[call.query_index].append(call.outcome)
+            else:
+                products[call.query_index].extend(call.outcome)
+        
+        return [
+            self._build_result(query, products[index], errors[index])
+            for index, query in enumerate(queries)
+        ]
+    
+    async def asearch(self, query: SearchQuery) -> SearchResult:
+        """
+        Search for products across all registered vendors without blocking the event loop.
+        
+        Args:
+            query: The search query
+            
+        Returns:
+            SearchResult containing products from all vendors
+        """
+        return (await self.asearch_multiple([query]))[0]
+    
+    async def asearch_multiple(self, queries: List[SearchQuery]) -> List[SearchResult]:
+        """
+        Execute multiple search queries concurrently on the event loop.
+        
+        Mirrors ``search_multiple``: at most ``max_in_flight`` vendor calls run
+        at once, the same timeouts apply, batch-capable vendors get batch
+        requests and results keep the query order. Synchronous vendors are run
+        on worker threads via ``SyncVendorAdapter``.
+        
+        Args:
+            queries: List of search queries
+            
+        Returns:
+            List of search results
+        """
+        vendors = [as_async_vendor(vendor) for vendor in self.vendors]
+        semaphore = asyncio.Semaphore(max(self.max_in_flight, 1))
+        batched = await self._astart_batches(queries, vendors, semaphore)
+        return list(await asyncio.gather(*(
+            self._asearch_query(query, vendors, semaphore, batched[index])
+            for index, query in enumerate(queries)
+        )))
+    
+    async def _astart_batches(
+        self,
+        queries: List[SearchQuery],
+        vendors: List[AsyncVendorInterface],
+        semaphore: asyncio.Semaphore,
+    ) -> List[Dict[int, Any]]:
+        """
+        Look queries up in the cache for batch-capable vendors and send the
+        misses as batch requests.
+        
+        Returns:
+            Per query, a mapping of vendor position to its cached products, the
+            ``_AsyncBatch`` answering it, or None for a miss sent on its own
+        """
+        batched: List[Dict[int, Any]] = [{} for _ in queries]
+        positions = [
+            position for position, vendor in enumerate(vendors) if vendor.supports_batch_search
+        ]
+        # Every distinct lookup at once; catalog reads overlap on worker threads
+        lookups: Dict[Tuple[int, str, int], SearchQuery] = {}
+        for position in positions:
+            for query in queries:
+                lookups.setdefault((position, query.query, query.max_results), query)
+        found = await asyncio.gather(*(
+            self._acached(vendors[position], query)
+            for (position, _, _), query in lookups.items()
+        ))
+        cached_by_key = dict(zip(lookups, found))
+        
+        for position in positions:
+            vendor = vendors[position]
+            misses = []
+            for index, query in enumerate(queries):
+                cached = cached_by_key[position, query.query, query.max_results]
+                batched[index][position] = cached
+                if cached is None:
+                    misses.append((query, index))
+            
+            for max_results, by_text in _batch_chunks(misses, vendor.max_batch_size):
+                if len(by_text) == 1:
+                    continue
+                started = asyncio.Event()
+                batch = _AsyncBatch(asyncio.create_task(
+                    self._acall_batch(vendor, list(by_text), max_results, semaphore, started)
+                ), started)
+                for indexes in by_text.values():
+                    for index in indexes:
+                        batched[index][position] = batch
+        return batched
+    
+    async def _asearch_query(
+        self,
+        query: SearchQuery,
+        vendors: List[AsyncVendorInterface],
+        semaphore: asyncio.Semaphore,
+        batched: Optional[Dict[int, Any]] = None,
+    ) -> SearchResult:
+        """Fan one query out to every vendor and apply the query deadline."""
+        batched = batched or {}
+        first_started = asyncio.Event()
+        tasks = []
+        for position, vendor in enumerate(vendors):
+            if position not in batched:
+                call = self._acall_vendor(vendor, query, semaphore, first_started)
+            elif batched[position] is None:
+                # The cache was already consulted
+                call = self._acall_vendor(vendor, query, semaphore, first_started, cached=False)
+            elif isinstance(batched[position], _AsyncBatch):
+                call = self._abatched(batched[position], query, first_started)
+            else:
+                call = self._ahit(batched[position], first_started)
+            tasks.append(asyncio.create_task(call))
+        
+        if tasks and self.search_timeout is not None:
+            # The query clock starts once one of its calls gets a slot
+            await first_started.wait()
+            await asyncio.wait(tasks, timeout=self.search_timeout)
+        elif tasks:
+            await asyncio.wait(tasks)
+        
+        all_products: List[Product] = []
+        errors: List[VendorError] = []
+        
+        for vendor, task in zip(vendors, tasks):
+            if not task.done():
+                task.cancel()
+                errors.append(VendorError(
+                    vendor=vendor.get_name(),
+                    error=f"Timed out after {self.search_timeout:.2f}s",
+                    timed_out=True,
+                ))
+                continue
+            outcome = task.result()
+            if isinstance(outcome, VendorError):
+                errors.append(outcome)
+            else:
+                all_products.extend(outcome)
+        
+        return self._build_result(query, all_products, errors)
+    
+    async def _acall_vendor(
+        self,
+        vendor: AsyncVendorInterface,
+        query: SearchQuery,
+        semaphore: asyncio.Semaphore,
+        first_started: asyncio.Event,
+        cached: bool = True,
+    ) -> Union[List[Product], VendorError]:
+        """Run one async vendor search, converting failures into VendorError."""
+        if cached:
+            products = await self._acached(vendor, query)
+            if products is not None:
+                first_started.set()
+                return products
+        
+        async with semaphore:
+            first_started.set()
             try:
-                products = vendor.search(query.query, max_results=query.max_results)
-                all_products.extend(products)
+                # The vendor timeout starts once the call has a rate-limited slot
+                products = await self._acoalesce(
+                    SearchCache.make_key(
+                        vendor.get_vendor_type(), query.query, query.max_results, _source(vendor)
+                    ),
+                    lambda: self._aguarded(vendor, lambda: asyncio.wait_for(
+                        vendor.asearch(query.query, max_results=query.max_results),
+                        timeout=self.vendor_timeout,
+                    )),
+                )
+            except asyncio.TimeoutError as e:
+                return self._atimeout_error(vendor, e)
             except Exception as e:
-                # Log error but continue with other vendors
-                print(f"Error searching vendor {vendor.get_name()}: {e}")
-                continue
+                return self._vendor_error(vendor, e)
+        
+        await self._astore_in_cache(vendor, [(query, products)])
+        return products
+    
+    async def _acall_batch(
+        self,
+        vendor: AsyncVendorInterface,
+        texts: List[str],
+        max_results: int,
+        semaphore: asyncio.Semaphore,
+        started: asyncio.Event,
+    ) -> Union[Dict[str, List[Product]], VendorError]:
+        """Run one async batch search, returning products per query text or a VendorError."""
+        async with semaphore:
+            started.set()
+            try:
+                results = await self._aguarded(vendor, lambda: asyncio.wait_for(
+                    vendor.asearch_batch(texts, max_results=max_results),
+                    timeout=self.vendor_timeout,
+                ))
+                _check_batch_results(texts, results)
+            except asyncio.TimeoutError as e:
+                return self._atimeout_error(vendor, e)
+            except Exception as e:
+                return self._vendor_error(vendor, e)
+        
+        await self._astore_in_cache(vendor, [
+            (SearchQuery(query=text, max_results=max_results), products)
+            for text, products in zip(texts, results)
+        ])
+        return dict(zip(texts, results))
+    
+    @staticmethod
+    async def _ahit(products: List[Product], first_started: asyncio.Event) -> List[Product]:
+        """Answer a query from products already found in the cache."""
+        first_started.set()
+        return products
+    
+    @staticmethod
+    async def _abatched(
+        batch: _AsyncBatch, query: SearchQuery, first_started: asyncio.Event
+    ) -> Union[List[Product], VendorError]:
+        """Wait for a query's share of a batch request."""
+        await batch.started.wait()
+        first_started.set()
+        # Shielded: the query deadline must not cancel the other queries' batch
+        outcome = await asyncio.shield(batch.task)
+        if isinstance(outcome, VendorError):
+            return outcome
+        return outcome[query.query]
+    
+    def fetch(self, vendor_type: Vendor, query: str, max_results: int = 10) -> List[Product]:
+        """
+        Search one vendor directly, bypassing the caches, and store the fresh results.
         
+        Used to refresh cached results in the background.
+        
+        Args:
+            vendor_type: Vendor to search
+            query: Query text
+            max_results: Maximum number of results
+            
+        Returns:
+            The vendor's products
+        """
+        vendor = self._find_vendor(vendor_type)
+        products = self._guarded(vendor, lambda: vendor.search(query, max_results=max_results))
+        self._store_in_cache(vendor, SearchQuery(query=query, max_results=max_results), products)
+        return products
+    
+    def get_product(self, vendor_type: Vendor, product_id: str) -> Product:
+        """
+        Get a specific product from a registered vendor.
+        
+        Concurrent lookups of the same product share one upstream call.
+        
+        Args:
+            vendor_type: Vendor that sells the product
+            product_id: The vendor's product ID
+            
+        Returns:
+            Product object
+        """
+        vendor = self._find_vendor(vendor_type)
+        
+        def fetch() -> Product:
+            return self._guarded(vendor, lambda: vendor.get_product(product_id))
+        
+        if self.flights is None:
+            return fetch()
+        return self.flights.do(("product", vendor_type, product_id), fetch)
+    
+    async def aget_product(self, vendor_type: Vendor, product_id: str) -> Product:
+        """
+        Get a specific product from a registered vendor without blocking the event loop.
+        
+        Args:
+            vendor_type: Vendor that sells the product
+            product_id: The vendor's product ID
+            
+        Returns:
+            Product object
+        """
+        vendor = as_async_vendor(self._find_vendor(vendor_type))
+        return await self._acoalesce(
+            ("product", vendor_type, product_id),
+            lambda: self._aguarded(vendor, lambda: vendor.aget_product(product_id)),
+        )
+    
+    def get_products(self, vendor_type: Vendor, product_ids: List[str]) -> List[Product]:
+        """
+        Get several products from a registered vendor.
+        
+        IDs are sent in ``get_products`` requests of up to the vendor's
+        ``max_batch_size``; vendors without a batch lookup answer each
+        request with one call per ID.
+        
+        Args:
+            vendor_type: Vendor that sells the products
+            product_ids: The vendor's product IDs
+            
+        Returns:
+            Product objects in ID order
+        """
+        vendor = self._find_vendor(vendor_type)
+        size = max(vendor.max_batch_size, 1)
+        products: List[Product] = []
+        for start in range(0, len(product_ids), size):
+            chunk = product_ids[start:start + size]
+            products.extend(self._guarded(vendor, lambda: vendor.get_products(chunk)))
+        return products
+    
+    async def aget_products(self, vendor_type: Vendor, product_ids: List[str]) -> List[Product]:
+        """
+        Get several products from a registered vendor without blocking the event loop.
+        
+        Args:
+            vendor_type: Vendor that sells the products
+            product_ids: The vendor's product IDs
+            
+        Returns:
+            Product objects in ID order
+        """
+        vendor = as_async_vendor(self._find_vendor(vendor_type))
+        size = max(vendor.max_batch_size, 1)
+        
+        async def fetch(chunk: List[str]) -> List[Product]:
+            return await self._aguarded(vendor, lambda: vendor.aget_products(chunk))
+        
+        chunks = await asyncio.gather(*(
+            fetch(product_ids[start:start + size]) for start in range(0, len(product_ids), size)
+        ))
+        return [product for chunk in chunks for product in chunk]
+    
+    def _find_vendor(self, vendor_type: Vendor) -> VendorInterface:
+        """Get the registered vendor for a vendor type."""
+        for vendor in self.vendors:
+            if vendor.get_vendor_type() == vendor_type:
+                return vendor
+        raise ValueError(f"No vendor registered for {vendor_type.value}")
+    
+    def _limiter_for(
+        self, vendor: Union[VendorInterface, AsyncVendorInterface]
+    ) -> Optional[VendorRateLimiter]:
+        """Get the rate limiter for a vendor, if rate limiting is enabled."""
+        if self.rate_limits is None:
+            return None
+        return self.rate_limits.get(vendor.get_vendor_type().value)
+    
+    def _breaker_for(
+        self, vendor: Union[VendorInterface, AsyncVendorInterface]
+    ) -> Optional[CircuitBreaker]:
+        """Get the circuit breaker for a vendor, if circuit breaking is enabled."""
+        if self.breakers is None:
+            return None
+        return self.breakers.get(vendor.get_vendor_type().value)
+    
+    def _hedger_for(
+        self, vendor: Union[VendorInterface, AsyncVendorInterface]
+    ) -> Optional[Hedger]:
+        """Get the latency tracker used to hedge a vendor's calls, if hedging is enabled."""
+        if self.hedge_percentile is None:
+            return None
+        vendor_type = vendor.get_vendor_type()
+        with self._executor_lock:
+            hedger = self.hedgers.get(vendor_type)
+            if hedger is None:
+                hedger = self.hedgers[vendor_type] = Hedger(self.hedge_percentile)
+            return hedger
+    
+    def _guarded(
+        self,
+        vendor: VendorInterface,
+        fn: Callable[[], Any],
+        on_slot: Optional[Callable[[], None]] = None,
+        claim_outcome: Optional[Callable[[], bool]] = None,
+    ) -> Any:
+        """
+        Call ``fn()`` through the vendor's circuit breaker, hedging and rate limiter.
+        
+        Args:
+            vendor: Vendor being called
+            fn: The upstream call
+            on_slot: Called once the original attempt holds a rate-limited slot
+            claim_outcome: Called before the breaker is told how the call went;
+                False means it was already counted (as a timeout when abandoned)
+                
+        Returns:
+            The result of ``fn()``
+        """
+        breaker = self._breaker_for(vendor)
+        hedger = self._hedger_for(vendor)
+        limiter = self._limiter_for(vendor)
+        
+        def attempt(first: bool) -> Any:
+            timed = fn if hedger is None else lambda: hedger.timed(fn)
+            if limiter is None:
+                return timed()
+            with limiter.slot():
+                if first and on_slot is not None:
+                    on_slot()
+                return timed()
+        
+        if breaker is not None:
+            breaker.before_call()
+        try:
+            if hedger is None:
+                result = attempt(True)
+            else:
+                result = hedger.call(self._get_hedge_executor(), attempt)
+        except Exception as e:
+            if breaker is not None and (claim_outcome is None or claim_outcome()):
+                breaker.record_failure(e)
+            raise
+        if breaker is not None and (claim_outcome is None or claim_outcome()):
+            breaker.record_success()
+        return result
+    
+    async def _aguarded(self, vendor: AsyncVendorInterface, fn: Callable[[], Awaitable[Any]]):
+        """Await ``fn()`` through the vendor's circuit breaker, hedging and rate limiter."""
+        breaker = self._breaker_for(vendor)
+        hedger = self._hedger_for(vendor)
+        limiter = self._limiter_for(vendor)
+        
+        async def attempt() -> Any:
+            timed = fn if hedger is None else lambda: hedger.atimed(fn)
+            if limiter is None:
+                return await timed()
+            async with limiter.aslot():
+                return await timed()
+        
+        if breaker is not None:
+            breaker.before_call()
+        try:
+            if hedger is None:
+                result = await attempt()
+            else:
+                result = await hedger.acall(attempt)
+        except Exception as e:
+            if breaker is not None:
+                breaker.record_failure(e)
+            raise
+        except BaseException:
+            # Cancelled by a deadline: hand back a half-open trial slot
+            if breaker is not None:
+                breaker.record_cancelled()
+            raise
+        if breaker is not None:
+            breaker.record_success()
+        return result
+    
+    @staticmethod
+    def _vendor_error(
+        vendor: Union[VendorInterface, AsyncVendorInterface], error: Exception
+    ) -> VendorError:
+        """Build the error recorded for a vendor call that raised."""
+        return VendorError(
+            vendor=vendor.get_name(),
+            error=str(error),
+            circuit_open=isinstance(error, CircuitOpenError),
+        )
+    
+    def _atimeout_error(
+        self, vendor: AsyncVendorInterface, error: asyncio.TimeoutError
+    ) -> VendorError:
+        """
+        Build the error recorded for an async vendor call that timed out.
+        
+        With no ``vendor_timeout`` the timeout came from the vendor itself, so
+        its own message is reported.
+        """
+        if self.vendor_timeout is not None:
+            message = f"Timed out after {self.vendor_timeout:.2f}s"
+        else:
+            message = str(error) or "Timed out"
+        return VendorError(vendor=vendor.get_name(), error=message, timed_out=True)
+    
+    def circuit_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get circuit breaker state and hedging metrics per vendor.
+        
+        Returns:
+            Mapping of vendor name to breaker stats (if enabled) and hedging
+            stats (if enabled)
+        """
+        stats: Dict[str, Dict[str, Any]] = {}
+        if self.breakers is not None:
+            for name, breaker_stats in self.breakers.stats().items():
+                stats.setdefault(name, {})["circuit"] = breaker_stats
+        with self._executor_lock:
+            hedgers = list(self.hedgers.items())
+        for vendor_type, hedger in hedgers:
+            stats.setdefault(vendor_type.value, {})["hedging"] = hedger.stats()
+        return stats
+    
+    async def _acoalesce(self, key, fn):
+        """Await ``fn()`` through the single-flight group when coalescing is enabled."""
+        if self.flights is None:
+            return await fn()
+        return await self.flights.ado(key, fn)
+    
+    async def _acached(
+        self, vendor: AsyncVendorInterface, query: SearchQuery
+    ) -> Optional[List[Product]]:
+        """``_cached`` for the event loop; catalog reads run on a worker thread."""
+        if self.cache is None and self.catalog is None:
+            return None
+        if self.catalog is None:
+            return self._cached(vendor, query)
+        return await asyncio.to_thread(self._cached, vendor, query)
+    
+    def _load_from_cache(self, call: _VendorCall) -> bool:
+        """Fill a call's outcome from the cache. Returns True on a hit."""
+        cached = self._cached(call.vendor, call.query)
+        if cached is None:
+            return False
+        call.outcome = cached
+        return True
+    
+    def _cached(
+        self, vendor: Union[VendorInterface, AsyncVendorInterface], query: SearchQuery
+    ) -> Optional[List[Product]]:
+        """Look a vendor search up in the cache, then the catalog (warming the cache on a hit)."""
+        vendor_type = vendor.get_vendor_type()
+        if self.cache is not None:
+            cached = self.cache.get(vendor_type, query.query, query.max_results, _source(vendor))
+            if cached is not None:
+                return cached
+        if self.catalog is None:
+            return None
+        try:
+            stored = self.catalog.get(vendor_type, query.query, query.max_results)
+        except Exception:
+            # An unavailable catalog is a miss, not a failed search
+            logger.warning("Catalog lookup failed for %r", query.query, exc_info=True)
+            return None
+        if stored is not None and self.cache is not None:
+            self.cache.put(
+                vendor_type, query.query, query.max_results, stored, _source(vendor)
+            )
+        return stored
+    
+    def _store_in_cache(
+        self,
+        vendor: Union[VendorInterface, AsyncVendorInterface],
+        query: SearchQuery,
+        outcome: Union[List[Product], VendorError],
+    ):
+        """Cache a successful vendor response; failures are never cached."""
+        if isinstance(outcome, VendorError):
+            return
+        if self.cache is not None:
+            self.cache.put(
+                vendor.get_vendor_type(), query.query, query.max_results, outcome, _source(vendor)
+            )
+        self._store_in_catalog(vendor, [(query, outcome)])
+    
+    async def _astore_in_cache(
+        self,
+        vendor: AsyncVendorInterface,
+        results: List[Tuple[SearchQuery, List[Product]]],
+    ):
+        """``_store_in_cache`` for the event loop; catalog writes run on a worker thread."""
+        if self.cache is not None:
+            for query, products in results:
+                self.cache.put(
+                    vendor.get_vendor_type(),
+                    query.query,
+                    query.max_results,
+                    products,
+                    _source(vendor),
+                )
+        if self.catalog is not None and results:
+            await asyncio.to_thread(self._store_in_catalog, vendor, results)
+    
+    def _store_in_catalog(
+        self,
+        vendor: Union[VendorInterface, AsyncVendorInterface],
+        results: List[Tuple[SearchQuery, List[Product]]],
+    ):
+        """Write vendor responses to the catalog; a failed write only skips persisting them."""
+        if self.catalog is None:
+            return
+        for query, products in results:
+            try:
+                self.catalog.put(
+                    vendor.get_vendor_type(), query.query, query.max_results, products
+                )
+            except Exception:
+                logger.warning("Catalog write failed for %r", query.query, exc_info=True)
+    
+    def _build_result(
+        self, query: SearchQuery, all_products: List[Product], errors: List[VendorError]
+    ) -> SearchResult:
+        """Apply query filters to the merged vendor products."""
         # Filter by price if specified
         if query.min_price is not None:
             all_products = [p for p in all_products if p.price >= query.min_price]
@@ -58,17 +939,174 @@ class ProductSearcher:
             query=query.query,
             products=all_products,
             total_found=len(all_products),
+            quantity=query.quantity,
+            errors=errors,
         )
     
-    def search_multiple(self, queries: List[SearchQuery]) -> List[SearchResult]:
+    def _batch_calls(self, calls: List[_VendorCall]) -> List[_CallUnit]:
         """
-        Execute multiple search queries.
+        Group the calls to batch-capable vendors into batch requests.
         
-        Args:
-            queries: List of search queries
+        Calls are grouped per vendor and ``max_results``, up to the vendor's
+        ``max_batch_size`` distinct queries per batch (see ``_batch_chunks``);
+        a chunk with a single distinct query stays a plain call.
+        """
+        units: List[_CallUnit] = []
+        groups: Dict[int, List[_VendorCall]] = {}
+        for call in calls:
+            if getattr(call.vendor, "supports_batch_search", False):
+                groups.setdefault(id(call.vendor), []).append(call)
+            else:
+                units.append(call)
+        
+        for members in groups.values():
+            vendor = members[0].vendor
+            entries = [(call.query, call) for call in members]
+            for _, by_text in _batch_chunks(entries, vendor.max_batch_size):
+                chunk = [call for text_calls in by_text.values() for call in text_calls]
+                if len(by_text) == 1:
+                    units.extend(chunk)
+                else:
+                    units.append(_VendorBatchCall(vendor, chunk, self._guarded))
+        return units
+    
+    def _use_pool(self, calls: List[_CallUnit]) -> bool:
+        """Decide whether the calls are worth running on the thread pool."""
+        if not self.concurrent or not calls:
+            return False
+        return len(calls) > 1 or self._has_timeouts()
+    
+    def _has_timeouts(self) -> bool:
+        """Whether any deadline applies to vendor calls."""
+        return self.vendor_timeout is not None or self.search_timeout is not None
+    
+    def _run_sequential(self, calls: List[_CallUnit]):
+        """Run each call in turn, collecting failures instead of raising."""
+        for call in calls:
+            try:
+                call.settle(call.run())
+            except Exception as e:
+                # Record error but continue with other vendors
+                call.settle(self._vendor_error(call.vendor, e))
+    
+    def _run_concurrent(self, calls: List[_CallUnit], query_count: int):
+        """
+        Run calls on the bounded pool and wait no longer than the configured timeouts.
+        
+        The vendor timeout is measured from when a call actually starts, so work
+        queued behind ``max_in_flight`` is not penalised for waiting. The search
+        timeout is measured from when the first call of each query starts.
+        Calls that miss a deadline are left to finish in the background and
+        their results are discarded.
+        """
+        executor = self._get_executor()
+        pending: Dict[Future, _CallUnit] = {
+            executor.submit(call.run): call for call in calls
+        }
+        
+        while pending:
+            now = time.monotonic()
+            query_started = self._query_start_times(calls, query_count)
+            wake_at: Optional[float] = None
             
-        Returns:
-            List of search results
+            for future, call in list(pending.items()):
+                if future.done():
+                    continue
+                if call.started is None and self._has_timeouts():
+                    # Not picked up by a worker yet; look again shortly
+                    poll_at = now + _START_POLL_INTERVAL
+                    wake_at = poll_at if wake_at is None else min(wake_at, poll_at)
+                expires_at = self._expiry(call, query_started)
+                if expires_at is None:
+                    continue
+                if now >= expires_at:
+                    future.cancel()
+                    call.settle(self._timeout_error(call, now))
+                    self._record_timeout(call)
+                    del pending[future]
+                elif wake_at is None or expires_at < wake_at:
+                    wake_at = expires_at
+            
+            if not pending:
+                break
+            
+            timeout = None if wake_at is None else max(0.0, wake_at - now)
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                call = pending.pop(future)
+                try:
+                    call.settle(future.result())
+                except Exception as e:
+                    call.settle(self._vendor_error(call.vendor, e))
+    
+    @staticmethod
+    def _query_start_times(calls: List[_CallUnit], query_count: int) -> List[Optional[float]]:
+        """Earliest start time of any call belonging to each query."""
+        started: List[Optional[float]] = [None] * query_count
+        for call in calls:
+            if call.started is None:
+                continue
+            for member in call.members:
+                current = started[member.query_index]
+                if current is None or call.started < current:
+                    started[member.query_index] = call.started
+        return started
+    
+    def _expiry(
+        self, call: _CallUnit, query_started: List[Optional[float]]
+    ) -> Optional[float]:
+        """Monotonic time after which a call should be abandoned, if any."""
+        deadlines = []
+        if self.vendor_timeout is not None and call.started is not None:
+            deadlines.append(call.started + self.vendor_timeout)
+        if self.search_timeout is not None:
+            # A batch is abandoned at the earliest deadline of its queries
+            for member in call.members:
+                if query_started[member.query_index] is not None:
+                    deadlines.append(query_started[member.query_index] + self.search_timeout)
+        return min(deadlines) if deadlines else None
+    
+    def _record_timeout(self, call: _CallUnit):
         """
-        return [self.search(query) for query in queries]
-
+        Count an abandoned call that had reached the vendor as a breaker failure.
+        
+        The call keeps running in the background; whichever of this and the
+        call itself finishing comes first is the one the breaker counts.
+        """
+        breaker = self._breaker_for(call.vendor)
+        if breaker is not None and call.started is not None and call.claim_outcome():
+            breaker.record_failure(TimeoutError(f"{call.vendor.get_name()} timed out"))
+    
+    @staticmethod
+    def _timeout_error(call: _CallUnit, now: float) -> VendorError:
+        """Build the error recorded for a call that missed its deadline."""
+        if call.started is None:
+            message = "Timed out before the vendor call started"
+        else:
+            message = f"Timed out after {now - call.started:.2f}s"
+        return VendorError(vendor=call.vendor.get_name(), error=message, timed_out=True)
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Lazily create the shared vendor thread pool."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(self.max_in_flight, 1),
+                    thread_name_prefix="vendor-search",
+                )
+            return self._executor
+    
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        """
+        Lazily create the pool that runs hedged attempts.
+        
+        Hedged calls wait on their attempts from a vendor-pool worker, so the
+        attempts need a pool of their own: two per call that can be in flight.
+        """
+        with self._executor_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(
+                    max_workers=2 * max(self.max_in_flight, 1),
+                    thread_name_prefix="vendor-hedge",
+                )
+            return self._hedge_executor
@@ -0,0 +1,126 @@
+"""
+Request coalescing for identical in-flight vendor calls.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    """A call in progress on some thread, shared by every caller with the same key."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls that share a key.
+
+    While a call for a key is running, later callers with the same key wait
+    for it and receive its result (or its exception) instead of issuing their
+    own. Once it finishes the key is forgotten, so this never serves stale
+    data; pair it with ``SearchCache`` for reuse across time.
+    """
+
+    def __init__(self):
+        """Initialize the coalescer."""
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run ``fn`` unless an identical call is already in flight on another thread.
+
+        Args:
+            key: Identity of the call
+            fn: Zero-argument callable performing the upstream request
+
+        Returns:
+            The result of the (possibly shared) call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await ``fn()`` unless an identical call is already in flight on this event loop.
+
+        The upstream call runs as its own task, so a caller that is cancelled
+        (for example by a timeout) does not cancel it for the other waiters.
+
+        Args:
+            key: Identity of the call
+            fn: Zero-argument coroutine function performing the upstream request
+
+        Returns:
+            The result of the (possibly shared) call
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is not None and task.get_loop() is loop:
+                self.shared += 1
+            else:
+                task = loop.create_task(fn())
+                self._tasks[key] = task
+                self.executed += 1
+                task.add_done_callback(lambda t, key=key: self._forget_task(key, t))
+
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        """
+        Get coalescing counters.
+
+        Returns:
+            Dictionary with upstream calls executed, calls served from a shared flight
+            and calls currently in flight
+        """
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "shared": self.shared,
+                "in_flight": len(self._calls) + len(self._tasks),
+            }
+
+    def _forget_task(self, key: Hashable, task: asyncio.Task):
+        """Drop a finished task unless a newer one has replaced it."""
+        with self._lock:
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved when every waiter has gone away
+            task.exception()
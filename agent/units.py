@@ -0,0 +1,162 @@
+"""
+Pack-size parsing, unit prices and quantity covering.
+"""
+
+import math
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from agent.schemas import Product
+
+# Multipliers spelled out in listings, e.g. "Pack of 12", "Box of 24", "12-Pack", "100 ct"
+_PACK_PATTERNS = [
+    re.compile(r"\b(?:pack|box|case|set|carton|bag|pkg|package) of (\d+)\b"),
+    re.compile(r"\b(\d+)[\s-]?(?:pack|pk|ct|count|pcs|pieces|per box)\b"),
+    re.compile(r"\b(\d+)\s*/\s*(?:pack|pk|box)\b"),
+]
+_DOZEN_PATTERN = re.compile(r"\b(?:(\d+) )?dozen\b")
+
+
+@lru_cache(maxsize=16384)
+def parse_pack_size(text: Optional[str]) -> int:
+    """
+    Parse the number of units a listing contains from its text.
+    
+    Only explicit pack wording counts; measures such as "500 Sheets" describe
+    the unit itself (one ream) and are ignored. Results are cached because the
+    same listing names come back from every search.
+    
+    Args:
+        text: Listing text, usually the product name
+        
+    Returns:
+        Units per listing, 1 if no pack size is found
+    """
+    if not text:
+        return 1
+    
+    text = text.lower()
+    for pattern in _PACK_PATTERNS:
+        match = pattern.search(text)
+        if match and int(match.group(1)) > 0:
+            return int(match.group(1))
+    
+    match = _DOZEN_PATTERN.search(text)
+    if match:
+        return 12 * int(match.group(1) or 1)
+    
+    return 1
+
+
+def pack_size(product: Product) -> int:
+    """
+    Get the number of units in one listing of a product.
+    
+    Args:
+        product: Product to inspect
+        
+    Returns:
+        Units per listing, from the name or else the description
+    """
+    size = parse_pack_size(product.name)
+    if size == 1:
+        size = parse_pack_size(product.description)
+    return size
+
+
+def unit_price(product: Product) -> float:
+    """
+    Get the price of a single unit of a product.
+    
+    Args:
+        product: Product to price
+        
+    Returns:
+        Listing price divided by pack size
+    """
+    return product.price / pack_size(product)
+
+
+def packs_needed(product: Product, quantity: int) -> int:
+    """
+    Get how many listings of a product cover a quantity of units.
+    
+    Args:
+        product: Product to buy
+        quantity: Units required
+        
+    Returns:
+        Number of listings to buy
+    """
+    return math.ceil(quantity / pack_size(product))
+
+
+def cheapest_cover(products: List[Product], quantity: int) -> List[Tuple[Product, int]]:
+    """
+    Choose the cheapest combination of listings that covers a quantity.
+    
+    Solves an unbounded min-cost cover over pack sizes with dynamic
+    programming in whole cents. For each pack size only the cheapest listing
+    is considered, with ties going to the higher rating and then the earlier
+    listing, so a quantity of 1 picks the same product as plain price sorting.
+    Pack sizes at or above the quantity compete as one size.
+    
+    The table is kept small regardless of the quantity: pack sizes and the
+    quantity are divided by the pack sizes' common divisor, and the bulk of a
+    large quantity is covered up front with the best-value pack. Some optimal
+    cover uses fewer than ``size`` packs of anything else (any ``size`` of them
+    contain a subset whose units are a multiple of ``size``, which the
+    best-value pack covers as cheaply), so the table never needs to go past
+    about ``size`` times the largest pack size.
+    
+    Args:
+        products: Candidate listings for one item
+        quantity: Units required
+        
+    Returns:
+        List of (product, number of listings), in listing order; empty if
+        there are no products
+    """
+    if not products:
+        return []
+    
+    # Cheapest listing per pack size
+    best_by_size = {}
+    for position, product in enumerate(products):
+        key = (round(product.price * 100), -(product.rating or 0), position)
+        size = min(pack_size(product), quantity)
+        if size not in best_by_size or key < best_by_size[size][0]:
+            best_by_size[size] = (key, product)
+    
+    # Every combination covers a multiple of the common divisor
+    divisor = math.gcd(*best_by_size)
+    quantity = math.ceil(quantity / divisor)
+    options = [
+        (size // divisor, key[0], key, product) for size, (key, product) in best_by_size.items()
+    ]
+    
+    # Cover all but a bounded remainder with the best-value pack
+    best = min(range(len(options)), key=lambda i: (options[i][1] / options[i][0], options[i][2]))
+    best_size = options[best][0]
+    bulk = max(0, quantity - best_size * (max(size for size, *_ in options) + 1)) // best_size
+    quantity -= bulk * best_size
+    
+    # cost[q] is the cheapest way to get at least q units; last[q] the option added last
+    cost = [0] + [math.inf] * quantity
+    last = [-1] * (quantity + 1)
+    for q in range(1, quantity + 1):
+        for index, (size, cents, _, _) in enumerate(options):
+            total = cost[max(0, q - size)] + cents
+            if total < cost[q]:
+                cost[q] = total
+                last[q] = index
+    
+    counts = [0] * len(options)
+    counts[best] += bulk
+    q = quantity
+    while q > 0:
+        counts[last[q]] += 1
+        q = max(0, q - options[last[q]][0])
+    
+    chosen = [(options[i][2][2], options[i][3], count) for i, count in enumerate(counts) if count]
+    return [(product, count) for _, product, count in sorted(chosen, key=lambda c: c[0])]
@@ -3,7 +3,7 @@ Configuration management for the API.
 """
 
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
@@ -16,6 +16,17 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str = "sqlite:///./data/app.db"
+    db_pool_size: int = 10  # Connections kept open per process
+    db_max_overflow: int = 20  # Extra connections allowed under load
+    db_pool_timeout_seconds: float = 30.0  # Wait for a free connection before failing
+    db_pool_recycle_seconds: int = 1800  # Reconnect older connections; -1 disables
+    db_pool_pre_ping: bool = True  # Check connections on checkout (survives DB restarts)
+    
+    # SQLite tuning, applied to every connection
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kb: int = 65536
     
     # AWS
     aws_region: str = "us-east-1"
@@ -41,6 +52,62 @@ class Settings(BaseSettings):
     preferred_vendors: str = "amazon,staples"
     preferred_brands: str = ""
     
+    # Search cache
+    search_cache_max_entries: int = 10000
+    search_cache_ttl_seconds: float = 300.0
+    search_cache_vendor_ttls: str = ""  # e.g. "amazon=600,staples=120"
+    
+    # Vendor rate limits (requests per second) and adaptive concurrency
+    vendor_rate_limits: str = ""  # e.g. "amazon=1,staples=10"; unlisted vendors are unlimited
+    vendor_initial_concurrency: int = 4
+    vendor_max_concurrency: int = 32
+    vendor_latency_target_seconds: float = 2.0
+    
+    # Vendor circuit breakers and hedged requests
+    vendor_failure_threshold: int = 5
+    vendor_recovery_seconds: float = 30.0
+    search_hedge_percentile: Optional[float] = None  # e.g. 95 to hedge calls slower than p95
+    
+    # Persistent product catalog
+    catalog_enabled: bool = True
+    catalog_max_age_seconds: float = 3600.0
+    catalog_refresh_interval_seconds: float = 300.0  # 0 disables background refresh
+    catalog_refresh_after_seconds: float = 2700.0
+    catalog_refresh_min_hits: int = 3
+    catalog_refresh_batch_size: int = 50
+    catalog_hit_flush_size: int = 100  # Lookups counted in memory before they are written
+    
+    # Procurement execution: "background" runs orders in the API process;
+    # "database" queues them for worker processes (scripts/run_worker.py)
+    procurement_queue: str = "background"
+    job_worker_concurrency: int = 16  # Orders one worker process runs at once
+    job_lease_seconds: float = 120.0
+    job_heartbeat_seconds: float = 30.0
+    job_poll_seconds: float = 1.0
+    job_max_attempts: int = 3
+    
+    # "phased" searches, optimizes and buys all items together (as one basket
+    # under a spending limit); "streaming" moves each item through on its own,
+    # recording its progress on the order item as it goes
+    procurement_pipeline: str = "phased"
+    
+    # Order progress streams (GET /orders/{id}/events)
+    order_events_queue_size: int = 100  # Events buffered per client before it resyncs
+    order_events_keepalive_seconds: float = 15.0
+    order_events_poll_seconds: float = 1.0  # Re-read interval with PROCUREMENT_QUEUE=database
+    
+    # Batch procurement
+    procurement_batch_chunk_size: int = 500  # Orders committed per transaction
+    procurement_batch_concurrency: int = 8  # Orders from one batch processed at once
+    
+    # Process pool for large optimizations
+    optimizer_processes: int = 0  # 0 keeps every optimization in-process
+    optimizer_process_min_candidates: int = 20000  # Smaller requests skip the pool
+    
+    # Price history (memory-mapped series fed by the catalog)
+    price_history_dir: str = "./data/price_history"
+    price_history_savings_days: float = 30.0
+    
     # CORS
     cors_origins: str = "http://localhost:8000"
     
@@ -62,6 +129,26 @@ class Settings(BaseSettings):
         """Get preferred vendors as a list."""
         return [v.strip() for v in self.preferred_vendors.split(",") if v.strip()]
     
+    @property
+    def search_cache_vendor_ttls_map(self) -> Dict[str, float]:
+        """Get per-vendor search cache TTLs as a vendor -> seconds mapping."""
+        return self._parse_vendor_map(self.search_cache_vendor_ttls)
+    
+    @property
+    def vendor_rate_limits_map(self) -> Dict[str, float]:
+        """Get per-vendor rate limits as a vendor -> requests per second mapping."""
+        return self._parse_vendor_map(self.vendor_rate_limits)
+    
+    @staticmethod
+    def _parse_vendor_map(value: str) -> Dict[str, float]:
+        """Parse a "vendor=number,vendor=number" setting."""
+        parsed = {}
+        for pair in value.split(","):
+            if "=" in pair:
+                vendor, number = pair.split("=", 1)
+                parsed[vendor.strip()] = float(number)
+        return parsed
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
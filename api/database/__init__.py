@@ -2,7 +2,7 @@
 Database configuration and connection.
 """
 
-from api.database.connection import get_db, engine, Base
+from api.database.connection import get_db, engine, Base, SessionLocal
 
-__all__ = ["get_db", "engine", "Base"]
+__all__ = ["get_db", "engine", "Base", "SessionLocal"]
 
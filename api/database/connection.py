@@ -2,17 +2,93 @@
 Database connection and session management.
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from api.config import settings
-from typing import Generator
+from typing import Any, Dict, Generator, Optional
+
+
+def engine_options(database_url: str) -> Dict[str, Any]:
+    """
+    Build ``create_engine`` keyword arguments for a database URL.
+    
+    Every backend gets the pool settings, pre-ping and recycle from
+    ``settings``; SQLite additionally lets connections cross threads, since
+    background procurement writes from worker threads.
+    
+    Args:
+        database_url: SQLAlchemy database URL
+        
+    Returns:
+        Keyword arguments for ``create_engine``
+    """
+    options: Dict[str, Any] = {
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+    }
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        if url.database in (None, "", ":memory:"):
+            # In-memory databases get SQLAlchemy's per-thread pool, which takes
+            # no sizing options
+            for key in ("pool_size", "max_overflow", "pool_timeout"):
+                del options[key]
+    return options
+
+
+def configure_sqlite(engine: Engine):
+    """
+    Apply the SQLite pragmas from ``settings`` to every new connection.
+    
+    WAL lets readers run alongside the single writer, ``synchronous=NORMAL``
+    is durable across application crashes in WAL mode while skipping most
+    fsyncs, and the busy timeout makes a writer wait for the lock instead of
+    failing with "database is locked".
+    
+    Args:
+        engine: Engine connected to a SQLite database
+    """
+    in_memory = engine.url.database in (None, "", ":memory:")
+    
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            if not in_memory:
+                cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+            cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+            cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+            # Negative cache_size is in KiB rather than pages
+            cursor.execute(f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kb)}")
+        finally:
+            cursor.close()
+
+
+def create_db_engine(database_url: Optional[str] = None) -> Engine:
+    """
+    Create an engine configured from ``settings``.
+    
+    Args:
+        database_url: Database URL (defaults to ``settings.database_url``)
+        
+    Returns:
+        Configured engine
+    """
+    database_url = database_url or settings.database_url
+    engine = create_engine(database_url, **engine_options(database_url))
+    if engine.dialect.name == "sqlite":
+        configure_sqlite(engine)
+    return engine
+
 
 # Create database engine
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
-)
+engine = create_db_engine()
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -33,4 +109,3 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
-
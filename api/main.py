@@ -2,20 +2,47 @@
 FastAPI application main entry point.
 """
 
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api.config import settings
 from api.routes import api_router
+from api.routes.procurement import procurement_service
 from api.database import engine, Base
+from integrations.transport import aclose_transports
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Run the catalog refresher in the background while the app is up; on
+    shutdown write the catalog hits counted in memory, stop the optimizer's
+    worker processes and close pooled vendor connections.
+    """
+    refresher = procurement_service.catalog_refresher
+    task = None
+    if refresher is not None and settings.catalog_refresh_interval_seconds > 0:
+        task = asyncio.create_task(refresher.run(settings.catalog_refresh_interval_seconds))
+    yield
+    if task is not None:
+        task.cancel()
+    if procurement_service.catalog is not None:
+        procurement_service.catalog.flush_hits()
+    if procurement_service.optimizer.pool is not None:
+        procurement_service.optimizer.pool.shutdown()
+    await aclose_transports()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Office Essentials Procurement Agent API",
     description="API for office essentials procurement automation",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -3,9 +3,20 @@ Database models.
 """
 
 from api.models.base import Base
+from api.models.catalog import CatalogProduct, CatalogQuery
 from api.models.customer import Customer
+from api.models.job import JobStatus, ProcurementJob
 from api.models.order import Order
 from api.models.order_item import OrderItem
 
-__all__ = ["Base", "Customer", "Order", "OrderItem"]
+__all__ = [
+    "Base",
+    "CatalogProduct",
+    "CatalogQuery",
+    "Customer",
+    "JobStatus",
+    "Order",
+    "OrderItem",
+    "ProcurementJob",
+]
 
@@ -3,10 +3,8 @@ Base model class.
 """
 
 from sqlalchemy import Column, Integer, DateTime
-from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
-
-Base = declarative_base()
+from api.database.connection import Base
 
 
 class BaseModel(Base):
@@ -0,0 +1,80 @@
+"""
+Product catalog models: vendor listings and cached searches.
+
+Price history lives in ``agent.price_history`` rather than one row per observation.
+"""
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+)
+from datetime import datetime
+from agent.schemas import Product, Vendor
+from api.models.base import BaseModel
+
+
+class CatalogProduct(BaseModel):
+    """Latest known listing for one vendor product."""
+    
+    __tablename__ = "catalog_products"
+    __table_args__ = (
+        UniqueConstraint("vendor", "product_id", name="uq_catalog_products_vendor_product"),
+    )
+    
+    vendor = Column(String(50), nullable=False)
+    product_id = Column(String(255), nullable=False)
+    name = Column(String(500), nullable=False)
+    normalized_name = Column(String(500), nullable=False, index=True)
+    description = Column(Text, nullable=True)
+    price = Column(Float, nullable=False)
+    url = Column(String(1000), nullable=True)
+    image_url = Column(String(1000), nullable=True)
+    rating = Column(Float, nullable=True)
+    review_count = Column(Integer, nullable=True)
+    in_stock = Column(Boolean, default=True)
+    category = Column(String(255), nullable=True)
+    brand = Column(String(255), nullable=True)
+    last_seen_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def to_product(self) -> Product:
+        """Convert the row back to the agent's ``Product`` schema."""
+        return Product(
+            id=self.product_id,
+            name=self.name,
+            description=self.description,
+            price=self.price,
+            vendor=Vendor(self.vendor),
+            url=self.url,
+            image_url=self.image_url,
+            rating=self.rating,
+            review_count=self.review_count,
+            in_stock=self.in_stock,
+            category=self.category,
+            brand=self.brand,
+        )
+
+
+class CatalogQuery(BaseModel):
+    """A vendor search whose ranked results are stored in the catalog."""
+    
+    __tablename__ = "catalog_queries"
+    __table_args__ = (
+        UniqueConstraint(
+            "vendor", "query", "max_results", name="uq_catalog_queries_vendor_query"
+        ),
+        Index("ix_catalog_queries_fetched_at", "fetched_at"),
+    )
+    
+    vendor = Column(String(50), nullable=False)
+    query = Column(String(500), nullable=False)  # Normalized query text
+    max_results = Column(Integer, nullable=False)
+    product_ids = Column(Text, nullable=False, default="[]")  # JSON list, in vendor ranking order
+    fetched_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    hit_count = Column(Integer, default=1, nullable=False)
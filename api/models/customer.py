@@ -2,7 +2,7 @@
 Customer model.
 """
 
-from sqlalchemy import Column, String, Text
+from sqlalchemy import Column, Index, String, Text
 from api.models.base import BaseModel
 
 
@@ -10,6 +10,10 @@ class Customer(BaseModel):
     """Customer model."""
     
     __tablename__ = "customers"
+    __table_args__ = (
+        # Keyset pagination order
+        Index("ix_customers_created_at_id", "created_at", "id"),
+    )
     
     name = Column(String(255), nullable=False, index=True)
     email = Column(String(255), unique=True, nullable=False, index=True)
@@ -0,0 +1,38 @@
+"""
+Procurement job model: the durable queue between the API and workers.
+"""
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text, Enum as SQLEnum
+from api.models.base import BaseModel
+import enum
+
+
+class JobStatus(str, enum.Enum):
+    """Procurement job status enum."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class ProcurementJob(BaseModel):
+    """
+    A queued procurement run for one order.
+    
+    A worker owns a running job only while its lease is current; a job whose
+    lease has expired (the worker died or stalled) can be claimed again.
+    """
+    
+    __tablename__ = "procurement_jobs"
+    __table_args__ = (
+        # Claim order: queued jobs oldest first, and expired leases
+        Index("ix_procurement_jobs_status_lease", "status", "lease_expires_at", "id"),
+    )
+    
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
+    payload = Column(Text, nullable=False)  # ProcurementRequest as JSON
+    status = Column(SQLEnum(JobStatus), default=JobStatus.QUEUED, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    lease_owner = Column(String(255), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
@@ -2,7 +2,7 @@
 Order model.
 """
 
-from sqlalchemy import Column, String, Float, Integer, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Float, Integer, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from api.models.base import BaseModel
 import enum
@@ -16,6 +16,7 @@ class OrderStatus(str, enum.Enum):
     OPTIMIZING = "optimizing"
     PURCHASING = "purchasing"
     COMPLETED = "completed"
+    PARTIAL = "partial"  # Some items bought, others not
     FAILED = "failed"
     CANCELLED = "cancelled"
 
@@ -24,8 +25,16 @@ class Order(BaseModel):
     """Order model."""
     
     __tablename__ = "orders"
+    __table_args__ = (
+        # Keyset pagination order, overall and per customer; the latter also
+        # serves plain customer_id lookups, so customer_id has no index of its own
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        Index("ix_orders_customer_created_at_id", "customer_id", "created_at", "id"),
+        # Orders in a status, least recently updated first
+        Index("ix_orders_status_updated_at", "status", "updated_at"),
+    )
     
-    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False, index=True)
+    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False)
     status = Column(SQLEnum(OrderStatus), default=OrderStatus.PENDING, nullable=False)
     total_amount = Column(Float, default=0.0)
     budget_limit = Column(Float, nullable=True)
@@ -33,5 +42,10 @@ class Order(BaseModel):
     
     # Relationships
     customer = relationship("Customer", backref="orders")
-    items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
+    items = relationship(
+        "OrderItem",
+        back_populates="order",
+        cascade="all, delete-orphan",
+        order_by="OrderItem.id",
+    )
 
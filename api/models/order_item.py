@@ -2,7 +2,7 @@
 Order item model.
 """
 
-from sqlalchemy import Column, String, Float, Integer, ForeignKey, Text
+from sqlalchemy import Column, String, Float, Integer, ForeignKey, Index, Text
 from sqlalchemy.orm import relationship
 from api.models.base import BaseModel
 
@@ -11,6 +11,10 @@ class OrderItem(BaseModel):
     """Order item model."""
     
     __tablename__ = "order_items"
+    __table_args__ = (
+        # Items bought from a vendor, optionally for one product
+        Index("ix_order_items_vendor_product_id", "vendor", "product_id"),
+    )
     
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
     item_name = Column(String(255), nullable=False)
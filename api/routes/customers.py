@@ -2,12 +2,13 @@
 Customer routes.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from api.database import get_db
 from api.schemas.customer import CustomerCreate, CustomerResponse, CustomerUpdate
 from api.services.customer_service import CustomerService
+from api.services.pagination import decode_cursor, next_cursor
 
 router = APIRouter()
 
@@ -28,12 +29,28 @@ def create_customer(
 
 @router.get("/", response_model=List[CustomerResponse])
 def list_customers(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    skip: int = Query(0, ge=0, description="Legacy offset, ignored with a cursor"),
+    limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(get_db),
 ):
-    """List all customers."""
-    return CustomerService.list_customers(db, skip=skip, limit=limit)
+    """
+    List customers, oldest first.
+    
+    Pass the ``X-Next-Cursor`` response header back as ``cursor`` to fetch
+    the next page; the header is absent on the last page.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    customers = CustomerService.list_customers(db, skip=skip, limit=limit, after=after)
+    next_page = next_cursor(customers, limit)
+    if next_page:
+        response.headers["X-Next-Cursor"] = next_page
+    return customers
 
 
 @router.get("/{customer_id}", response_model=CustomerResponse)
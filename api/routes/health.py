@@ -4,16 +4,35 @@ Health check routes.
 
 from fastapi import APIRouter
 from datetime import datetime
+from integrations.circuit import CircuitState
 
 router = APIRouter()
 
 
 @router.get("/")
 def health_check():
-    """Health check endpoint."""
+    """Health check endpoint; degraded while any vendor's circuit is open."""
+    from api.routes.procurement import procurement_service
+    
+    vendors = {
+        name: stats["state"]
+        for name, stats in procurement_service.breakers.stats().items()
+    }
     return {
-        "status": "healthy",
+        "status": "degraded" if CircuitState.OPEN.value in vendors.values() else "healthy",
         "timestamp": datetime.utcnow().isoformat(),
         "service": "office-essentials-agent-api",
+        "vendors": vendors,
+    }
+
+
+@router.get("/vendors")
+def vendor_metrics():
+    """Per-vendor rate limiting, circuit breaker and hedging metrics."""
+    from api.routes.procurement import procurement_service
+    
+    return {
+        "rate_limits": procurement_service.rate_limits.stats(),
+        "circuits": procurement_service.searcher.circuit_stats(),
     }
 
@@ -2,25 +2,74 @@
 Order routes.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from api.config import settings
 from api.database import get_db
-from api.schemas.order import OrderResponse, OrderStatusUpdate
+from api.models.order import OrderStatus
+from api.schemas.order import OrderItemResponse, OrderResponse, OrderStatusUpdate
 from api.services.order_service import OrderService
+from api.services.pagination import decode_cursor, next_cursor
+from api.routes.procurement import procurement_service
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[OrderResponse])
 def list_orders(
+    response: Response,
     customer_id: Optional[int] = Query(None, description="Filter by customer ID"),
+    status: Optional[OrderStatus] = Query(None, description="Filter by status"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    skip: int = Query(0, ge=0, description="Legacy offset, ignored with a cursor"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+):
+    """
+    List orders, oldest first.
+    
+    Pass the ``X-Next-Cursor`` response header back as ``cursor`` to fetch
+    the next page; the header is absent on the last page.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    orders = OrderService.list_order_rows(
+        db, customer_id=customer_id, skip=skip, limit=limit, after=after, status=status
+    )
+    next_page = next_cursor(orders, limit)
+    if next_page:
+        response.headers["X-Next-Cursor"] = next_page
+    return orders
+
+
+@router.get("/status/{status}", response_model=List[OrderResponse])
+def list_orders_by_status(
+    status: OrderStatus,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+):
+    """List orders in a status, least recently updated first."""
+    return OrderService.list_orders_by_status(db, status, limit=limit)
+
+
+@router.get("/items", response_model=List[OrderItemResponse])
+def list_items_by_vendor(
+    vendor: str = Query(..., description="Vendor the items were bought from"),
+    product_id: Optional[str] = Query(None, description="Filter by vendor product ID"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(get_db),
 ):
-    """List orders."""
-    return OrderService.list_orders(db, customer_id=customer_id, skip=skip, limit=limit)
+    """List order items bought from a vendor."""
+    return OrderService.list_items_by_vendor(
+        db, vendor, product_id=product_id, skip=skip, limit=limit
+    )
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
@@ -35,6 +84,38 @@ def get_order(
     return order
 
 
+@router.get("/{order_id}/events")
+async def stream_order_events(order_id: int):
+    """
+    Stream an order's progress as Server-Sent Events.
+    
+    The stream opens with a ``snapshot`` event holding the whole order, then
+    sends ``status`` events (changed order fields) and ``item`` events (changed
+    fields of the item at ``index``) until the order completes, fails or is
+    cancelled. Every watcher of an order shares one database read.
+    """
+    events = procurement_service.order_events
+    subscription = await events.subscribe(order_id)
+    if subscription is None:
+        raise HTTPException(status_code=404, detail="Order not found")
+    
+    async def stream():
+        try:
+            async for event, data in subscription.events(settings.order_events_keepalive_seconds):
+                if event is None:
+                    yield ": keepalive\n\n"
+                else:
+                    yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            events.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.patch("/{order_id}/status", response_model=OrderResponse)
 def update_order_status(
     order_id: int,
@@ -45,5 +126,8 @@ def update_order_status(
     order = OrderService.update_order_status(db, order_id, status_update)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
+    procurement_service.order_events.publish(
+        order_id, "status", {"status": order.status.value, "notes": status_update.notes}
+    )
     return order
 
@@ -5,9 +5,19 @@ Procurement routes.
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlalchemy.orm import Session
 from api.database import get_db
-from api.schemas.procurement import ProcurementRequest, ProcurementResponse
+from api.config import settings
+from api.schemas.procurement import (
+    BatchProcurementError,
+    BatchProcurementRequest,
+    BatchProcurementResponse,
+    ProcurementRequest,
+    ProcurementResponse,
+)
+from api.models.order import OrderStatus
+from api.services.order_service import OrderService
 from api.services.procurement_service import ProcurementService
 from api.services.customer_service import CustomerService
+from api.services.job_service import JobService
 from datetime import datetime
 
 router = APIRouter()
@@ -26,22 +36,28 @@ async def create_procurement_request(
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
     
-    # Create order first
-    from api.services.order_service import OrderService
+    # Create order first; a queued order commits together with its job
+    queued = settings.procurement_queue == "database"
     order = OrderService.create_order(
         db=db,
         customer_id=request.customer_id,
         items=request.items,
         budget_limit=request.budget_limit,
         notes=request.notes,
+        quantity_per_item=request.quantity_per_item,
+        commit=not queued,
     )
     
-    # Process procurement in background
-    background_tasks.add_task(
-        procurement_service.process_procurement_async,
-        order.id,
-        request
-    )
+    if queued:
+        # Picked up by a worker process
+        JobService.enqueue(db, [(order.id, request)])
+    else:
+        # Process procurement in background
+        background_tasks.add_task(
+            procurement_service.process_procurement_async,
+            order.id,
+            request
+        )
     
     return ProcurementResponse(
         order_id=order.id,
@@ -50,3 +66,59 @@ async def create_procurement_request(
         created_at=order.created_at,
     )
 
+
+@router.post("/batch", response_model=BatchProcurementResponse)
+async def create_procurement_batch(
+    batch: BatchProcurementRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+):
+    """
+    Create many procurement requests at once.
+    
+    Customers are checked with one query, orders are bulk-inserted in chunks
+    of ``procurement_batch_chunk_size`` per transaction, and requests for
+    unknown customers are reported in ``errors`` instead of failing the batch.
+    """
+    existing = CustomerService.get_existing_ids(db, (r.customer_id for r in batch.requests))
+    errors = [
+        BatchProcurementError(index=index, detail="Customer not found")
+        for index, request in enumerate(batch.requests)
+        if request.customer_id not in existing
+    ]
+    accepted = [request for request in batch.requests if request.customer_id in existing]
+    
+    queued = settings.procurement_queue == "database"
+    created = []
+    chunk_size = max(settings.procurement_batch_chunk_size, 1)
+    for start in range(0, len(accepted), chunk_size):
+        chunk = accepted[start:start + chunk_size]
+        chunk_orders = OrderService.create_orders(db, chunk, commit=not queued)
+        if queued:
+            # Spread across worker processes; each chunk's orders commit with their jobs
+            JobService.enqueue(
+                db, [(order_id, request) for (order_id, _), request in zip(chunk_orders, chunk)]
+            )
+        created.extend(zip(chunk_orders, chunk))
+    
+    orders = [(order_id, request) for (order_id, _), request in created]
+    if not queued:
+        # Process the whole batch in one background task
+        background_tasks.add_task(
+            procurement_service.process_procurement_batch_async,
+            orders,
+            settings.procurement_batch_concurrency,
+        )
+    
+    return BatchProcurementResponse(
+        orders=[
+            ProcurementResponse(
+                order_id=order_id,
+                status=OrderStatus.PENDING.value,
+                message="Procurement request created and processing",
+                created_at=created_at,
+            )
+            for (order_id, created_at), _ in created
+        ],
+        errors=errors,
+    )
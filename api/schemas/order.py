@@ -13,6 +13,7 @@ class OrderItemResponse(BaseModel):
     id: int
     item_name: str
     requested_quantity: int
+    product_id: Optional[str] = None
     product_name: Optional[str] = None
     vendor: Optional[str] = None
     price: Optional[float] = None
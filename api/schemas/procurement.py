@@ -2,9 +2,10 @@
 Procurement request schemas.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, conint
 from typing import List, Optional, Dict
 from datetime import datetime
+from agent.schemas import MAX_QUANTITY
 
 
 class ProcurementRequest(BaseModel):
@@ -12,8 +13,8 @@ class ProcurementRequest(BaseModel):
     customer_id: int
     items: List[str] = Field(..., description="List of items to procure")
     budget_limit: Optional[float] = Field(None, ge=0, description="Budget limit in USD")
-    quantity_per_item: Optional[Dict[str, int]] = Field(
-        None, description="Quantity for each item"
+    quantity_per_item: Optional[Dict[str, conint(ge=1, le=MAX_QUANTITY)]] = Field(
+        None, description=f"Quantity for each item, 1 to {MAX_QUANTITY}"
     )
     preferred_vendors: Optional[List[str]] = None
     preferred_brands: Optional[List[str]] = None
@@ -30,3 +31,20 @@ class ProcurementResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+class BatchProcurementRequest(BaseModel):
+    """Schema for many procurement requests submitted together."""
+    requests: List[ProcurementRequest] = Field(..., min_length=1, max_length=5000)
+
+
+class BatchProcurementError(BaseModel):
+    """A request in a batch that was not accepted."""
+    index: int = Field(..., description="Position of the request in the batch")
+    detail: str
+
+
+class BatchProcurementResponse(BaseModel):
+    """Schema for batch procurement response."""
+    orders: List[ProcurementResponse]
+    errors: List[BatchProcurementError] = []
+
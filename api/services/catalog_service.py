@@ -0,0 +1,455 @@
+"""
+Catalog service: persisted vendor listings, price history and incremental refresh.
+"""
+
+import asyncio
+import json
+import calendar
+import logging
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import bindparam, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from agent.cache import normalize_query
+from agent.price_history import PriceHistory
+from agent.schemas import Product, Vendor
+from api.models.catalog import CatalogProduct, CatalogQuery
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogService:
+    """Service for catalog operations."""
+    
+    @staticmethod
+    def record_search(
+        db: Session,
+        vendor: Vendor,
+        query: str,
+        max_results: int,
+        products: List[Product],
+        now: Optional[datetime] = None,
+        history: Optional[PriceHistory] = None,
+    ) -> CatalogQuery:
+        """
+        Store a vendor's search results, updating listings and price history.
+        
+        Prices are appended to the history only once the listings are
+        committed, so a write that fails and is retried does not record them twice.
+        
+        Args:
+            db: Database session
+            vendor: Vendor that answered
+            query: Query text as searched
+            max_results: Result limit the vendor was asked for
+            products: Products returned, in vendor ranking order
+            now: Observation time (defaults to now)
+            history: Optional price history the observed prices are appended to
+            
+        Returns:
+            The stored catalog query
+        """
+        now = now or datetime.utcnow()
+        CatalogService.record_products(db, vendor, products, now)
+        
+        entry = (
+            db.query(CatalogQuery)
+            .filter(
+                CatalogQuery.vendor == vendor.value,
+                CatalogQuery.query == normalize_query(query),
+                CatalogQuery.max_results == max_results,
+            )
+            .first()
+        )
+        if entry is None:
+            entry = CatalogQuery(
+                vendor=vendor.value, query=normalize_query(query), max_results=max_results
+            )
+            db.add(entry)
+        entry.product_ids = json.dumps([product.id for product in products])
+        entry.fetched_at = now
+        db.commit()
+        
+        if history is not None:
+            # utcnow() is naive UTC, so convert with timegm rather than timestamp()
+            observed = calendar.timegm(now.utctimetuple())
+            for product in products:
+                history.record(vendor, product.id, product.price, ts=observed)
+        return entry
+    
+    @staticmethod
+    def record_products(
+        db: Session, vendor: Vendor, products: List[Product], now: Optional[datetime] = None
+    ) -> List[CatalogProduct]:
+        """
+        Upsert vendor listings without committing.
+        
+        Args:
+            db: Database session
+            vendor: Vendor selling the products
+            products: Current listings
+            now: Observation time (defaults to now)
+            
+        Returns:
+            The catalog rows, in the order of ``products``
+        """
+        now = now or datetime.utcnow()
+        existing = {
+            row.product_id: row
+            for row in db.query(CatalogProduct).filter(
+                CatalogProduct.vendor == vendor.value,
+                CatalogProduct.product_id.in_({product.id for product in products}),
+            )
+        }
+        
+        rows = []
+        for product in products:
+            row = existing.get(product.id)
+            if row is None:
+                row = existing[product.id] = CatalogProduct(
+                    vendor=vendor.value, product_id=product.id
+                )
+                db.add(row)
+            row.name = product.name
+            row.normalized_name = normalize_query(product.name)
+            row.description = product.description
+            row.price = product.price
+            row.url = product.url
+            row.image_url = product.image_url
+            row.rating = product.rating
+            row.review_count = product.review_count
+            row.in_stock = product.in_stock
+            row.category = product.category
+            row.brand = product.brand
+            row.last_seen_at = now
+            rows.append(row)
+        return rows
+    
+    @staticmethod
+    def lookup_search(
+        db: Session,
+        vendor: Vendor,
+        query: str,
+        max_results: int,
+        max_age: float,
+        now: Optional[datetime] = None,
+        count_hit: bool = True,
+    ) -> Optional[List[Product]]:
+        """
+        Serve a vendor search from the catalog if it was fetched recently.
+        
+        Every lookup of a known query counts towards its popularity, fresh or not.
+        
+        Args:
+            db: Database session
+            vendor: Vendor to look up
+            query: Query text
+            max_results: Result limit
+            max_age: Seconds after which stored results are stale
+            now: Current time (defaults to now)
+            count_hit: If False the lookup is read-only; the caller counts the
+                hit itself (see ``record_hits``)
+                
+        Returns:
+            Stored products in ranking order, or None if unknown or stale
+        """
+        now = now or datetime.utcnow()
+        entry = (
+            db.query(CatalogQuery)
+            .filter(
+                CatalogQuery.vendor == vendor.value,
+                CatalogQuery.query == normalize_query(query),
+                CatalogQuery.max_results == max_results,
+            )
+            .first()
+        )
+        if entry is None:
+            return None
+        if count_hit:
+            entry.hit_count += 1
+            db.commit()
+        if entry.fetched_at < now - timedelta(seconds=max_age):
+            return None
+        
+        product_ids = json.loads(entry.product_ids)
+        rows = {
+            row.product_id: row
+            for row in db.query(CatalogProduct).filter(
+                CatalogProduct.vendor == vendor.value,
+                CatalogProduct.product_id.in_(product_ids),
+            )
+        }
+        if any(product_id not in rows for product_id in product_ids):
+            return None
+        return [rows[product_id].to_product() for product_id in product_ids]
+    
+    @staticmethod
+    def record_hits(db: Session, hits: Dict[Tuple[str, str, int], int]):
+        """
+        Add lookups counted elsewhere to the popularity of stored searches.
+        
+        Args:
+            db: Database session
+            hits: (vendor, normalized query, max_results) -> lookups to add;
+                searches not in the catalog are skipped
+        """
+        if not hits:
+            return
+        db.execute(
+            update(CatalogQuery.__table__)
+            .where(
+                CatalogQuery.vendor == bindparam("hit_vendor"),
+                CatalogQuery.query == bindparam("hit_query"),
+                CatalogQuery.max_results == bindparam("hit_max_results"),
+            )
+            .values(hit_count=CatalogQuery.hit_count + bindparam("hits")),
+            [
+                {
+                    "hit_vendor": vendor,
+                    "hit_query": query,
+                    "hit_max_results": max_results,
+                    "hits": count,
+                }
+                for (vendor, query, max_results), count in hits.items()
+            ],
+        )
+        db.commit()
+    
+    @staticmethod
+    def find_products(
+        db: Session, name: str, vendor: Optional[Vendor] = None, limit: int = 20
+    ) -> List[CatalogProduct]:
+        """
+        Find stored listings whose normalized name starts with ``name``.
+        
+        Args:
+            db: Database session
+            name: Product name prefix
+            vendor: Optional vendor to restrict to
+            limit: Maximum number of rows
+            
+        Returns:
+            Matching listings, cheapest first
+        """
+        query = db.query(CatalogProduct).filter(
+            CatalogProduct.normalized_name.startswith(normalize_query(name), autoescape=True)
+        )
+        if vendor is not None:
+            query = query.filter(CatalogProduct.vendor == vendor.value)
+        return query.order_by(CatalogProduct.price).limit(limit).all()
+    
+    @staticmethod
+    def due_for_refresh(
+        db: Session,
+        refresh_after: float,
+        min_hits: int,
+        limit: int,
+        now: Optional[datetime] = None,
+    ) -> List[Tuple[Vendor, str, int]]:
+        """
+        Pick popular searches that are about to go stale, most popular first.
+        
+        Unpopular searches are not refreshed; they are re-fetched on their next
+        lookup once stale.
+        
+        Args:
+            db: Database session
+            refresh_after: Age in seconds after which a search may be refreshed
+            min_hits: Lookups a search needs to count as popular
+            limit: Maximum number of searches to return
+            now: Current time (defaults to now)
+            
+        Returns:
+            (vendor, normalized query, max_results) tuples
+        """
+        now = now or datetime.utcnow()
+        entries = (
+            db.query(CatalogQuery)
+            .filter(
+                CatalogQuery.fetched_at < now - timedelta(seconds=refresh_after),
+                CatalogQuery.hit_count >= min_hits,
+            )
+            .order_by(CatalogQuery.hit_count.desc(), CatalogQuery.fetched_at)
+            .limit(limit)
+            .all()
+        )
+        return [(Vendor(entry.vendor), entry.query, entry.max_results) for entry in entries]
+
+
+class CatalogStore:
+    """
+    Persistent second-level search cache for ``ProductSearcher``.
+    
+    Exposes the same ``get``/``put`` interface as ``SearchCache`` on top of
+    ``CatalogService``, opening a short-lived session per call so it can be
+    used from the searcher's worker threads. Lookups are read-only: hits are
+    counted in memory and written in one batch every ``hit_flush_size``
+    lookups, or when ``flush_hits`` is called (the refresher does so before
+    each pass).
+    """
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        max_age: float = 3600.0,
+        history: Optional[PriceHistory] = None,
+        hit_flush_size: int = 100,
+    ):
+        """
+        Initialize the store.
+        
+        Args:
+            session_factory: Creates database sessions (e.g. ``SessionLocal``)
+            max_age: Seconds for which stored search results are served
+            history: Optional price history fed with every stored price
+            hit_flush_size: Lookups counted in memory before they are written
+        """
+        self.session_factory = session_factory
+        self.max_age = max_age
+        self.history = history
+        self.hit_flush_size = max(hit_flush_size, 1)
+        self._hits: Counter = Counter()
+        self._pending_hits = 0
+        self._hits_lock = threading.Lock()
+    
+    def get(self, vendor: Vendor, query: str, max_results: int) -> Optional[List[Product]]:
+        """Get fresh stored results for a vendor search, if any."""
+        self._count_hit(vendor, query, max_results)
+        db = self.session_factory()
+        try:
+            return CatalogService.lookup_search(
+                db, vendor, query, max_results, self.max_age, count_hit=False
+            )
+        finally:
+            db.close()
+    
+    def flush_hits(self) -> int:
+        """
+        Write the lookups counted since the last flush.
+        
+        Returns:
+            Number of lookups written; on a database error they are kept for
+            the next flush and 0 is returned
+        """
+        with self._hits_lock:
+            hits, self._hits = self._hits, Counter()
+            pending, self._pending_hits = self._pending_hits, 0
+        if not hits:
+            return 0
+        
+        db = self.session_factory()
+        try:
+            CatalogService.record_hits(db, hits)
+        except Exception:
+            db.rollback()
+            with self._hits_lock:
+                self._hits.update(hits)
+                self._pending_hits += pending
+            return 0
+        finally:
+            db.close()
+        return pending
+    
+    def _count_hit(self, vendor: Vendor, query: str, max_results: int):
+        """Count a lookup, flushing once enough have accumulated."""
+        with self._hits_lock:
+            self._hits[(vendor.value, normalize_query(query), max_results)] += 1
+            self._pending_hits += 1
+            full = self._pending_hits >= self.hit_flush_size
+        if full:
+            self.flush_hits()
+    
+    def put(self, vendor: Vendor, query: str, max_results: int, products: List[Product]):
+        """Store vendor search results; a concurrent writer for the same rows wins."""
+        db = self.session_factory()
+        try:
+            CatalogService.record_search(
+                db, vendor, query, max_results, products, history=self.history
+            )
+        except IntegrityError:
+            db.rollback()
+        finally:
+            db.close()
+
+
+class CatalogRefresher:
+    """Background task that re-prices popular catalog searches before they go stale."""
+    
+    def __init__(
+        self,
+        searcher,
+        session_factory: Callable[[], Session],
+        refresh_after: float = 2700.0,
+        min_hits: int = 3,
+        batch_size: int = 50,
+    ):
+        """
+        Initialize the refresher.
+        
+        Args:
+            searcher: ``ProductSearcher`` whose catalog is refreshed
+            session_factory: Creates database sessions
+            refresh_after: Age in seconds after which a popular search is refreshed
+            min_hits: Lookups a search needs to be refreshed in the background
+            batch_size: Maximum searches refreshed per pass
+        """
+        self.searcher = searcher
+        self.session_factory = session_factory
+        self.refresh_after = refresh_after
+        self.min_hits = min_hits
+        self.batch_size = batch_size
+        self.refreshed = 0
+        self.failed = 0
+        self.errors = 0
+    
+    def refresh_once(self) -> int:
+        """
+        Refresh one batch of due searches.
+        
+        Returns:
+            Number of searches refreshed
+        """
+        # Popularity counted in memory decides what is due
+        if isinstance(self.searcher.catalog, CatalogStore):
+            self.searcher.catalog.flush_hits()
+        
+        db = self.session_factory()
+        try:
+            due = CatalogService.due_for_refresh(
+                db, self.refresh_after, self.min_hits, self.batch_size
+            )
+        finally:
+            db.close()
+        
+        refreshed = 0
+        for vendor, query, max_results in due:
+            try:
+                self.searcher.fetch(vendor, query, max_results)
+            except Exception:
+                # Left as is; it is retried next pass or re-fetched once stale
+                self.failed += 1
+                continue
+            refreshed += 1
+        self.refreshed += refreshed
+        return refreshed
+    
+    async def run(self, interval: float):
+        """
+        Refresh due searches every ``interval`` seconds until cancelled.
+        
+        A pass that fails (e.g. the database is unavailable) is logged and the
+        next one runs on schedule.
+        
+        Args:
+            interval: Seconds between passes
+        """
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh_once)
+            except Exception:
+                self.errors += 1
+                logger.warning("Catalog refresh pass failed", exc_info=True)
+            await asyncio.sleep(interval)
@@ -2,10 +2,12 @@
 Customer service for business logic.
 """
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Iterable, List, Optional, Set
 from api.models.customer import Customer
 from api.schemas.customer import CustomerCreate, CustomerUpdate
+from api.services.pagination import Cursor, keyset_page
 
 
 class CustomerService:
@@ -58,19 +60,39 @@ class CustomerService:
         return db.query(Customer).filter(Customer.email == email).first()
     
     @staticmethod
-    def list_customers(db: Session, skip: int = 0, limit: int = 100) -> List[Customer]:
+    def get_existing_ids(db: Session, customer_ids: Iterable[int]) -> Set[int]:
         """
-        List all customers.
+        Find which of the given customer IDs exist, in one query.
         
         Args:
             db: Database session
-            skip: Number of records to skip
+            customer_ids: Customer IDs to check
+            
+        Returns:
+            The IDs that exist
+        """
+        ids = set(customer_ids)
+        if not ids:
+            return set()
+        return set(db.scalars(select(Customer.id).where(Customer.id.in_(ids))))
+    
+    @staticmethod
+    def list_customers(
+        db: Session, skip: int = 0, limit: int = 100, after: Optional[Cursor] = None
+    ) -> List[Customer]:
+        """
+        List all customers, oldest first.
+        
+        Args:
+            db: Database session
+            skip: Number of records to skip (legacy; ignored with ``after``)
             limit: Maximum number of records to return
+            after: Keyset cursor position of the last customer already returned
             
         Returns:
             List of customers
         """
-        return db.query(Customer).offset(skip).limit(limit).all()
+        return keyset_page(db.query(Customer), Customer, after, skip, limit).all()
     
     @staticmethod
     def update_customer(
@@ -0,0 +1,477 @@
+"""
+Job service: durable procurement queue with leased, heartbeated workers.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from sqlalchemy import and_, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+from api.models.job import JobStatus, ProcurementJob
+from api.models.order import Order, OrderStatus
+from api.schemas.procurement import ProcurementRequest
+
+logger = logging.getLogger(__name__)
+
+# A claimed job: (job ID, order ID, request)
+ClaimedJob = Tuple[int, int, ProcurementRequest]
+
+
+class JobService:
+    """Service for procurement job queue operations."""
+    
+    @staticmethod
+    def enqueue(
+        db: Session, orders: List[Tuple[int, ProcurementRequest]], commit: bool = True
+    ) -> List[int]:
+        """
+        Queue procurement jobs for orders in one bulk insert.
+        
+        Create the orders with ``commit=False`` in the same session first, so
+        an order is never committed without its job.
+        
+        Args:
+            db: Database session
+            orders: (order ID, procurement request) pairs
+            commit: If False, the transaction is left open for the caller to commit
+            
+        Returns:
+            Job IDs, in order
+        """
+        if not orders:
+            return []
+        
+        now = datetime.utcnow()
+        # Same multi-row INSERT ... RETURNING as OrderService.create_orders
+        job_ids = sorted(db.scalars(
+            insert(ProcurementJob.__table__).returning(ProcurementJob.id),
+            [
+                {
+                    "order_id": order_id,
+                    "payload": request.model_dump_json(),
+                    "status": JobStatus.QUEUED,
+                    "attempts": 0,
+                    "lease_owner": None,
+                    "lease_expires_at": None,
+                    "last_error": None,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for order_id, request in orders
+            ],
+        ))
+        if commit:
+            db.commit()
+        return job_ids
+    
+    @staticmethod
+    def claim(
+        db: Session,
+        worker_id: str,
+        limit: int,
+        lease_seconds: float,
+        max_attempts: int = 3,
+        now: Optional[datetime] = None,
+    ) -> List[ClaimedJob]:
+        """
+        Lease up to ``limit`` runnable jobs to a worker, oldest first.
+        
+        Queued jobs and running jobs whose lease has expired are runnable.
+        Expired jobs that already used ``max_attempts`` are failed (with their
+        orders) instead. Candidates are locked with ``SKIP LOCKED`` where the
+        database supports it, and the claiming ``UPDATE`` re-checks them, so
+        two workers never lease the same job.
+        
+        Args:
+            db: Database session
+            worker_id: Claiming worker
+            limit: Maximum number of jobs to claim
+            lease_seconds: Lease length; renew with ``heartbeat``
+            max_attempts: Claims a job gets before it is failed
+            now: Current time (defaults to now)
+            
+        Returns:
+            The claimed jobs
+        """
+        now = now or datetime.utcnow()
+        expired = and_(
+            ProcurementJob.status == JobStatus.RUNNING,
+            ProcurementJob.lease_expires_at < now,
+        )
+        JobService._fail_jobs(
+            db,
+            and_(expired, ProcurementJob.attempts >= max_attempts),
+            f"Lease expired after {max_attempts} attempts",
+            now,
+        )
+        
+        runnable = and_(
+            or_(ProcurementJob.status == JobStatus.QUEUED, expired),
+            ProcurementJob.attempts < max_attempts,
+        )
+        candidates = db.scalars(
+            select(ProcurementJob.id)
+            .where(runnable)
+            .order_by(ProcurementJob.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not candidates:
+            db.commit()
+            return []
+        
+        claimed = db.execute(
+            update(ProcurementJob.__table__)
+            .where(ProcurementJob.id.in_(candidates), runnable)
+            .values(
+                status=JobStatus.RUNNING,
+                lease_owner=worker_id,
+                lease_expires_at=now + timedelta(seconds=lease_seconds),
+                attempts=ProcurementJob.attempts + 1,
+                updated_at=now,
+            )
+            .returning(ProcurementJob.id, ProcurementJob.order_id, ProcurementJob.payload)
+        ).all()
+        db.commit()
+        return sorted(
+            (job_id, order_id, ProcurementRequest.model_validate_json(payload))
+            for job_id, order_id, payload in claimed
+        )
+    
+    @staticmethod
+    def heartbeat(
+        db: Session,
+        worker_id: str,
+        job_ids: List[int],
+        lease_seconds: float,
+        now: Optional[datetime] = None,
+    ) -> Set[int]:
+        """
+        Renew a worker's leases.
+        
+        Args:
+            db: Database session
+            worker_id: Worker holding the leases
+            job_ids: Jobs the worker is running
+            lease_seconds: New lease length from now
+            now: Current time (defaults to now)
+            
+        Returns:
+            The jobs still leased to the worker; any others were lost
+        """
+        if not job_ids:
+            return set()
+        
+        now = now or datetime.utcnow()
+        held = db.scalars(
+            update(ProcurementJob.__table__)
+            .where(
+                ProcurementJob.id.in_(job_ids),
+                ProcurementJob.lease_owner == worker_id,
+                ProcurementJob.status == JobStatus.RUNNING,
+            )
+            .values(lease_expires_at=now + timedelta(seconds=lease_seconds), updated_at=now)
+            .returning(ProcurementJob.id)
+        ).all()
+        db.commit()
+        return set(held)
+    
+    @staticmethod
+    def complete(db: Session, job_id: int, worker_id: str) -> bool:
+        """
+        Mark a leased job done.
+        
+        Args:
+            db: Database session
+            job_id: Job ID
+            worker_id: Worker holding the lease
+            
+        Returns:
+            True if the worker still held the job
+        """
+        done = db.execute(
+            update(ProcurementJob.__table__)
+            .where(
+                ProcurementJob.id == job_id,
+                ProcurementJob.lease_owner == worker_id,
+                ProcurementJob.status == JobStatus.RUNNING,
+            )
+            .values(
+                status=JobStatus.DONE,
+                lease_owner=None,
+                lease_expires_at=None,
+                updated_at=datetime.utcnow(),
+            )
+        ).rowcount
+        db.commit()
+        return done == 1
+    
+    @staticmethod
+    def fail(
+        db: Session, job_id: int, worker_id: str, error: str, max_attempts: int = 3
+    ) -> Optional[JobStatus]:
+        """
+        Release a leased job after an error, re-queueing it while attempts remain.
+        
+        Args:
+            db: Database session
+            job_id: Job ID
+            worker_id: Worker holding the lease
+            error: Error message to store
+            max_attempts: Claims a job gets before it is failed
+            
+        Returns:
+            The job's new status, or None if the worker no longer held it
+        """
+        now = datetime.utcnow()
+        held = and_(
+            ProcurementJob.id == job_id,
+            ProcurementJob.lease_owner == worker_id,
+            ProcurementJob.status == JobStatus.RUNNING,
+        )
+        exhausted = and_(held, ProcurementJob.attempts >= max_attempts)
+        if JobService._fail_jobs(db, exhausted, error, now):
+            return JobStatus.FAILED
+        
+        requeued = db.execute(
+            update(ProcurementJob.__table__)
+            .where(held)
+            .values(
+                status=JobStatus.QUEUED,
+                lease_owner=None,
+                lease_expires_at=None,
+                last_error=error,
+                updated_at=now,
+            )
+        ).rowcount
+        db.commit()
+        return JobStatus.QUEUED if requeued else None
+    
+    @staticmethod
+    def stats(db: Session) -> Dict[str, int]:
+        """
+        Count jobs by status.
+        
+        Args:
+            db: Database session
+            
+        Returns:
+            Status -> number of jobs, for every status
+        """
+        counts = dict(
+            db.execute(
+                select(ProcurementJob.status, func.count()).group_by(ProcurementJob.status)
+            ).all()
+        )
+        return {status.value: counts.get(status, 0) for status in JobStatus}
+    
+    @staticmethod
+    def _fail_jobs(db: Session, condition, error: str, now: datetime) -> int:
+        """Fail the jobs matching ``condition`` and their orders; returns how many."""
+        order_ids = db.scalars(
+            update(ProcurementJob.__table__)
+            .where(condition)
+            .values(status=JobStatus.FAILED, lease_owner=None, last_error=error, updated_at=now)
+            .returning(ProcurementJob.order_id)
+        ).all()
+        if order_ids:
+            db.execute(
+                update(Order.__table__)
+                .where(Order.id.in_(order_ids))
+                .values(status=OrderStatus.FAILED, notes=f"Error: {error}", updated_at=now)
+            )
+        db.commit()
+        return len(order_ids)
+
+
+class JobWorker:
+    """
+    Runs queued procurement jobs, many at a time, in one worker process.
+    
+    Claims jobs up to ``concurrency`` in flight, renews their leases every
+    ``heartbeat_seconds``, and cancels any job whose lease was lost to
+    another worker. Database errors while claiming, renewing or settling (e.g.
+    SQLite's "database is locked") are logged and retried, so they neither
+    stop the worker, let its leases lapse, nor leave a finished job to be run
+    again. Add processes to scale throughput; the
+    API is unchanged.
+    """
+    
+    def __init__(
+        self,
+        process: Callable[[int, ProcurementRequest], Awaitable[None]],
+        session_factory: Callable[[], Session],
+        worker_id: Optional[str] = None,
+        concurrency: int = 16,
+        lease_seconds: float = 120.0,
+        heartbeat_seconds: float = 30.0,
+        poll_seconds: float = 1.0,
+        max_attempts: int = 3,
+        max_backoff_seconds: float = 30.0,
+    ):
+        """
+        Initialize the worker.
+        
+        Args:
+            process: Runs procurement for an order and raises on errors, e.g.
+                ``ProcurementService.process_procurement_job``
+            session_factory: Creates database sessions
+            worker_id: Lease owner name (defaults to host, PID and a random suffix)
+            concurrency: Jobs run at the same time
+            lease_seconds: Lease length; must exceed ``heartbeat_seconds``
+            heartbeat_seconds: Seconds between lease renewals
+            poll_seconds: Wait between claims when idle or full
+            max_attempts: Claims a job gets before it is failed
+            max_backoff_seconds: Longest wait between claims after repeated errors
+        """
+        self.process = process
+        self.session_factory = session_factory
+        self.worker_id = worker_id or (
+            f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        )
+        self.concurrency = max(concurrency, 1)
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self.max_backoff_seconds = max_backoff_seconds
+        self.running: Dict[int, asyncio.Task] = {}
+        self.completed = 0
+        self.failed = 0
+        self.lost = 0
+        self.errors = 0
+    
+    def _call(self, method, *args, **kwargs):
+        """Run a ``JobService`` method in its own session."""
+        db = self.session_factory()
+        try:
+            return method(db, *args, **kwargs)
+        finally:
+            db.close()
+    
+    async def run_once(self) -> int:
+        """
+        Claim jobs up to free capacity and start them.
+        
+        Returns:
+            Number of jobs started
+        """
+        free = self.concurrency - len(self.running)
+        if free <= 0:
+            return 0
+        
+        claimed = await asyncio.to_thread(
+            self._call,
+            JobService.claim,
+            self.worker_id,
+            free,
+            self.lease_seconds,
+            self.max_attempts,
+        )
+        for job_id, order_id, request in claimed:
+            self.running[job_id] = asyncio.create_task(self._execute(job_id, order_id, request))
+        return len(claimed)
+    
+    async def _execute(self, job_id: int, order_id: int, request: ProcurementRequest):
+        """Run one job and settle it."""
+        try:
+            try:
+                await self.process(order_id, request)
+            except Exception as e:
+                self.failed += 1
+                await self._settle(
+                    JobService.fail, job_id, self.worker_id, str(e), self.max_attempts
+                )
+            else:
+                self.completed += 1
+                await self._settle(JobService.complete, job_id, self.worker_id)
+        finally:
+            self.running.pop(job_id, None)
+    
+    async def _settle(self, method, job_id: int, *args):
+        """
+        Record a job's outcome, retrying database errors until it is stored.
+        
+        The job stays in ``running`` meanwhile, so heartbeats keep its lease
+        and no other worker claims it and repeats the purchase.
+        """
+        delay = self.poll_seconds
+        while True:
+            try:
+                return await asyncio.to_thread(self._call, method, job_id, *args)
+            except Exception:
+                self.errors += 1
+                logger.exception("Worker %s could not settle job %s", self.worker_id, job_id)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_backoff_seconds)
+    
+    async def heartbeat_once(self):
+        """Renew leases on running jobs and cancel any that were lost."""
+        job_ids = list(self.running)
+        if not job_ids:
+            return
+        
+        held = await asyncio.to_thread(
+            self._call, JobService.heartbeat, self.worker_id, job_ids, self.lease_seconds
+        )
+        for job_id in job_ids:
+            task = self.running.get(job_id)
+            if job_id not in held and task is not None and not task.done():
+                # Another worker has it now; stop duplicating its work
+                self.lost += 1
+                task.cancel()
+    
+    async def drain(self):
+        """Wait for running jobs to finish."""
+        while self.running:
+            await asyncio.gather(*list(self.running.values()), return_exceptions=True)
+    
+    async def run(self, stop: Optional[asyncio.Event] = None):
+        """
+        Claim and run jobs until ``stop`` is set, then finish the running ones.
+        
+        Args:
+            stop: Event that ends the loop (runs until cancelled if omitted)
+        """
+        stop = stop or asyncio.Event()
+        
+        async def heartbeats():
+            delay = self.heartbeat_seconds
+            while True:
+                await asyncio.sleep(delay)
+                try:
+                    await self.heartbeat_once()
+                except Exception:
+                    self.errors += 1
+                    logger.exception("Worker %s could not renew its leases", self.worker_id)
+                    # Retry well before the leases run out
+                    delay = min(self.poll_seconds, self.heartbeat_seconds)
+                else:
+                    delay = self.heartbeat_seconds
+        
+        heartbeat_task = asyncio.create_task(heartbeats())
+        failures = 0
+        try:
+            while not stop.is_set():
+                try:
+                    started = await self.run_once()
+                    failures = 0
+                except Exception:
+                    started = 0
+                    failures += 1
+                    self.errors += 1
+                    logger.exception("Worker %s could not claim jobs", self.worker_id)
+                if started == 0:
+                    # Back off exponentially while claims keep failing
+                    wait = min(self.poll_seconds * 2 ** failures, self.max_backoff_seconds)
+                    try:
+                        await asyncio.wait_for(stop.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        pass
+            await self.drain()
+        finally:
+            heartbeat_task.cancel()
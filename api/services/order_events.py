@@ -0,0 +1,265 @@
+"""
+In-process fan-out of order progress to streaming clients.
+"""
+
+import asyncio
+import copy
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+from api.models.order import OrderStatus
+
+logger = logging.getLogger(__name__)
+
+# Statuses after which an order's stream ends
+TERMINAL_STATUSES = {
+    OrderStatus.COMPLETED.value,
+    OrderStatus.PARTIAL.value,
+    OrderStatus.FAILED.value,
+    OrderStatus.CANCELLED.value,
+}
+
+Event = Tuple[str, Dict[str, Any]]
+
+
+class OrderSubscription:
+    """One client's view of an order's events."""
+    
+    def __init__(self, order_id: int, queue: asyncio.Queue):
+        """
+        Initialize the subscription.
+        
+        Args:
+            order_id: Order ID
+            queue: Events fanned out to this client
+        """
+        self.order_id = order_id
+        self.queue = queue
+    
+    async def events(self, keepalive_seconds: Optional[float] = None) -> AsyncIterator[Event]:
+        """
+        Yield ``(event, data)`` pairs until the order reaches a final status.
+        
+        The first event is always a ``snapshot`` of the whole order; ``status``
+        and ``item`` events follow as the order progresses.
+        
+        Args:
+            keepalive_seconds: Yield ``(None, None)`` after this long without events
+            
+        Yields:
+            Event name and its data
+        """
+        while True:
+            try:
+                event, data = await asyncio.wait_for(self.queue.get(), keepalive_seconds)
+            except asyncio.TimeoutError:
+                yield None, None
+                continue
+            yield event, data
+            if event in ("snapshot", "status") and data.get("status") in TERMINAL_STATUSES:
+                return
+
+
+class _OrderFeed:
+    """Latest state of one watched order and the clients watching it."""
+    
+    def __init__(self):
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self.pending: List[Event] = []  # Published while the snapshot loads
+        self.subscribers: Set[OrderSubscription] = set()
+        self.loading: Optional[asyncio.Future] = None
+        self.waiting = 0  # Clients waiting for the snapshot to load
+        self.poller: Optional[asyncio.Task] = None
+
+
+class OrderEventBroker:
+    """
+    Fans order status and item updates out to every client watching an order.
+    
+    An order is read from the database once, when its first client arrives;
+    later clients start from the cached snapshot, which published events keep
+    current, so many watchers of one order cost a single read. Orders processed
+    in other processes publish nothing here; with ``poll_seconds`` each watched
+    order is re-read on that interval, once for all of its watchers.
+    
+    The broker belongs to one event loop; ``publish`` may be called from other
+    threads.
+    """
+    
+    def __init__(
+        self,
+        load: Callable[[int], Optional[Dict[str, Any]]],
+        queue_size: int = 100,
+        poll_seconds: Optional[float] = None,
+    ):
+        """
+        Initialize the broker.
+        
+        Args:
+            load: Blocking function returning an order as a JSON-ready dict, or None
+            queue_size: Events buffered per client before it is resynchronized
+            poll_seconds: Re-read watched orders on this interval (None disables)
+        """
+        self.load = load
+        self.queue_size = queue_size
+        self.poll_seconds = poll_seconds
+        self.loads = 0
+        self.load_errors = 0
+        self._feeds: Dict[int, _OrderFeed] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def subscribe(self, order_id: int) -> Optional[OrderSubscription]:
+        """
+        Start watching an order.
+        
+        Args:
+            order_id: Order ID
+            
+        Returns:
+            Subscription whose first event is the order snapshot, or None if
+            the order does not exist
+        """
+        self._loop = asyncio.get_running_loop()
+        feed = self._feeds.get(order_id)
+        if feed is None:
+            feed = self._feeds[order_id] = _OrderFeed()
+            feed.loading = asyncio.ensure_future(self._load(order_id, feed))
+        # Shielded: one client giving up must not cancel the load for the others
+        feed.waiting += 1
+        try:
+            await asyncio.shield(feed.loading)
+        except BaseException:
+            feed.waiting -= 1
+            self._release(order_id, feed)
+            raise
+        feed.waiting -= 1
+        if feed.snapshot is None:
+            return None
+        
+        subscription = OrderSubscription(order_id, asyncio.Queue(maxsize=self.queue_size))
+        subscription.queue.put_nowait(("snapshot", copy.deepcopy(feed.snapshot)))
+        feed.subscribers.add(subscription)
+        if self.poll_seconds and feed.poller is None:
+            feed.poller = asyncio.ensure_future(self._poll(order_id, feed))
+        return subscription
+    
+    def unsubscribe(self, subscription: OrderSubscription):
+        """
+        Stop watching; the order's cached state is dropped with its last client.
+        
+        Args:
+            subscription: Subscription returned by ``subscribe``
+        """
+        feed = self._feeds.get(subscription.order_id)
+        if feed is not None:
+            feed.subscribers.discard(subscription)
+            self._release(subscription.order_id, feed)
+    
+    def publish(self, order_id: int, event: str, data: Dict[str, Any]):
+        """
+        Send an event to an order's watchers; a no-op for unwatched orders.
+        
+        Args:
+            order_id: Order ID
+            event: ``status`` (changed order fields; None values are left out) or
+                ``item`` (changed fields of the item at ``data["index"]``)
+            data: Event data
+        """
+        loop = self._loop
+        if loop is None or order_id not in self._feeds or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._publish(order_id, event, data)
+        else:
+            loop.call_soon_threadsafe(self._publish, order_id, event, data)
+    
+    def stats(self) -> Dict[str, int]:
+        """Watched orders, their clients and the database reads made for them."""
+        return {
+            "orders": len(self._feeds),
+            "subscribers": sum(len(feed.subscribers) for feed in self._feeds.values()),
+            "loads": self.loads,
+        }
+    
+    async def _load(self, order_id: int, feed: _OrderFeed):
+        """Read an order's snapshot and apply events published meanwhile."""
+        snapshot = None
+        try:
+            snapshot = await asyncio.to_thread(self.load, order_id)
+        finally:
+            self.loads += 1
+            if snapshot is None and self._feeds.get(order_id) is feed:
+                # Missing order, or failed read: the next client reads again
+                del self._feeds[order_id]
+        if snapshot is None:
+            return
+        for event, data in feed.pending:
+            _apply(snapshot, event, data)
+        feed.pending = []
+        feed.snapshot = snapshot
+    
+    def _release(self, order_id: int, feed: _OrderFeed):
+        """Forget an order once no client is watching or waiting for it."""
+        if feed.subscribers or feed.waiting or self._feeds.get(order_id) is not feed:
+            return
+        del self._feeds[order_id]
+        if feed.poller is not None:
+            feed.poller.cancel()
+    
+    async def _poll(self, order_id: int, feed: _OrderFeed):
+        """
+        Re-read a watched order and send it to its watchers when it changed.
+        
+        A failed read is logged and retried on the next interval, so watchers
+        keep waiting for the order rather than for a poller that has died.
+        """
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                snapshot = await asyncio.to_thread(self.load, order_id)
+            except Exception:
+                self.load_errors += 1
+                logger.warning("Polling order %s failed", order_id, exc_info=True)
+                continue
+            self.loads += 1
+            if snapshot is not None and snapshot != feed.snapshot:
+                self._publish(order_id, "snapshot", snapshot)
+    
+    def _publish(self, order_id: int, event: str, data: Dict[str, Any]):
+        """Apply an event to the cached snapshot and fan it out, on the broker's loop."""
+        feed = self._feeds.get(order_id)
+        if feed is None:
+            return
+        if feed.snapshot is None:
+            feed.pending.append((event, data))
+            return
+        
+        if event == "snapshot":
+            feed.snapshot = data
+        else:
+            _apply(feed.snapshot, event, data)
+        for subscription in feed.subscribers:
+            try:
+                subscription.queue.put_nowait((event, copy.deepcopy(data)))
+            except asyncio.QueueFull:
+                # A client that fell behind skips to the current state
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                subscription.queue.put_nowait(("snapshot", copy.deepcopy(feed.snapshot)))
+
+
+def _apply(snapshot: Dict[str, Any], event: str, data: Dict[str, Any]):
+    """Apply a ``status``, ``item`` or ``snapshot`` event to an order snapshot."""
+    if event == "snapshot":
+        snapshot.clear()
+        snapshot.update(copy.deepcopy(data))
+    elif event == "status":
+        snapshot.update({key: value for key, value in data.items() if value is not None})
+    elif event == "item":
+        items = snapshot.get("items", [])
+        index = data["index"]
+        if 0 <= index < len(items):
+            items[index].update({key: value for key, value in data.items() if key != "index"})
@@ -2,10 +2,20 @@
 Order service for business logic.
 """
 
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from collections import defaultdict
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session, selectinload
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
 from api.models.order import Order, OrderStatus
-from api.schemas.order import OrderStatusUpdate
+from api.models.order_item import OrderItem
+from api.schemas.order import OrderItemResponse, OrderResponse, OrderStatusUpdate
+from api.schemas.procurement import ProcurementRequest
+from api.services.pagination import Cursor, keyset_page
+
+# Columns selected by the projection path, kept in step with the response schemas
+_ORDER_COLUMNS = [getattr(Order, name) for name in OrderResponse.model_fields if name != "items"]
+_ITEM_COLUMNS = [getattr(OrderItem, name) for name in OrderItemResponse.model_fields]
 
 
 class OrderService:
@@ -18,6 +28,8 @@ class OrderService:
         items: List[str],
         budget_limit: Optional[float] = None,
         notes: Optional[str] = None,
+        quantity_per_item: Optional[Dict[str, int]] = None,
+        commit: bool = True,
     ) -> Order:
         """
         Create a new order.
@@ -28,12 +40,13 @@ class OrderService:
             items: List of item names
             budget_limit: Budget limit
             notes: Order notes
-            
+            quantity_per_item: Requested quantity per item name (default 1)
+            commit: If False, the order is only flushed, so the caller can
+                commit it together with related rows (e.g. its procurement job)
+                
         Returns:
             Created order
         """
-        from api.models.order_item import OrderItem
-        
         order = Order(
             customer_id=customer_id,
             status=OrderStatus.PENDING,
@@ -43,19 +56,101 @@ class OrderService:
         db.add(order)
         db.flush()
         
-        # Create order items
-        for item_name in items:
-            order_item = OrderItem(
-                order_id=order.id,
-                item_name=item_name,
-                requested_quantity=1,
-            )
-            db.add(order_item)
+        # Create order items in one executemany INSERT
+        OrderService._insert_items(
+            db, OrderService._item_rows(order.id, items, quantity_per_item)
+        )
         
-        db.commit()
-        db.refresh(order)
+        if commit:
+            db.commit()
+            db.refresh(order)
         return order
     
+    @staticmethod
+    def create_orders(
+        db: Session, requests: List[ProcurementRequest], commit: bool = True
+    ) -> List[Tuple[int, datetime]]:
+        """
+        Create many orders and their items in a single transaction.
+        
+        Orders are written with one multi-row ``INSERT ... RETURNING`` and
+        their items with one more bulk ``INSERT``; no ORM objects are built,
+        flushed or refreshed. Customers are not checked here.
+        
+        Args:
+            db: Database session
+            requests: Procurement requests to create orders for
+            commit: If False, the transaction is left open for the caller to commit
+            
+        Returns:
+            (order ID, created at) for each request, in request order
+        """
+        if not requests:
+            return []
+        
+        now = datetime.utcnow()
+        # Core insert so every row renders the same columns (NULLs included) and
+        # the batch goes out as multi-row VALUES. A single INSERT assigns
+        # autoincrement IDs in VALUES order, so sorting the returned IDs lines
+        # them up with the requests; sort_by_parameter_order would instead fall
+        # back to one statement per row on SQLite.
+        order_ids = sorted(db.scalars(
+            insert(Order.__table__).returning(Order.id),
+            [
+                {
+                    "customer_id": request.customer_id,
+                    "status": OrderStatus.PENDING,
+                    "total_amount": 0.0,
+                    "budget_limit": request.budget_limit,
+                    "notes": request.notes,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for request in requests
+            ],
+        ))
+        
+        OrderService._insert_items(db, [
+            row
+            for order_id, request in zip(order_ids, requests)
+            for row in OrderService._item_rows(
+                order_id, request.items, request.quantity_per_item, now
+            )
+        ])
+        
+        if commit:
+            db.commit()
+        return [(order_id, now) for order_id in order_ids]
+    
+    @staticmethod
+    def _item_rows(
+        order_id: int,
+        items: List[str],
+        quantity_per_item: Optional[Dict[str, int]] = None,
+        now: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """Build the insert parameters for an order's items."""
+        quantities = quantity_per_item or {}
+        now = now or datetime.utcnow()
+        return [
+            {
+                "order_id": order_id,
+                "item_name": item_name,
+                "requested_quantity": quantities.get(item_name, 1),
+                "quantity_purchased": 0,
+                "status": "pending",
+                "created_at": now,
+                "updated_at": now,
+            }
+            for item_name in items
+        ]
+    
+    @staticmethod
+    def _insert_items(db: Session, rows: List[Dict[str, Any]]):
+        """Insert order item rows with a single executemany statement."""
+        if rows:
+            db.execute(insert(OrderItem.__table__), rows)
+    
     @staticmethod
     def get_order(db: Session, order_id: int) -> Optional[Order]:
         """
@@ -68,7 +163,12 @@ class OrderService:
         Returns:
             Order or None
         """
-        return db.query(Order).filter(Order.id == order_id).first()
+        return (
+            db.query(Order)
+            .options(selectinload(Order.items))
+            .filter(Order.id == order_id)
+            .first()
+        )
     
     @staticmethod
     def list_orders(
@@ -76,23 +176,146 @@ class OrderService:
         customer_id: Optional[int] = None,
         skip: int = 0,
         limit: int = 100,
+        after: Optional[Cursor] = None,
     ) -> List[Order]:
         """
-        List orders.
+        List orders, oldest first.
+        
+        Items are loaded for the whole page with one extra ``SELECT ... IN``
+        rather than lazily per order.
         
         Args:
             db: Database session
             customer_id: Optional customer ID filter
-            skip: Number of records to skip
+            skip: Number of records to skip (legacy; ignored with ``after``)
             limit: Maximum number of records to return
+            after: Keyset cursor position of the last order already returned
             
         Returns:
             List of orders
         """
-        query = db.query(Order)
+        query = db.query(Order).options(selectinload(Order.items))
         if customer_id:
             query = query.filter(Order.customer_id == customer_id)
-        return query.offset(skip).limit(limit).all()
+        return keyset_page(query, Order, after, skip, limit).all()
+    
+    @staticmethod
+    def list_order_rows(
+        db: Session,
+        customer_id: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Cursor] = None,
+        status: Optional[OrderStatus] = None,
+    ) -> List[OrderResponse]:
+        """
+        List orders as response rows, oldest first, without loading ORM objects.
+        
+        Selects only the response columns, as plain tuples, in two statements:
+        one for the page of orders and one for all of their items.
+        
+        Args:
+            db: Database session
+            customer_id: Optional customer ID filter
+            skip: Number of records to skip (legacy; ignored with ``after``)
+            limit: Maximum number of records to return
+            after: Keyset cursor position of the last order already returned
+            status: Optional status filter
+            
+        Returns:
+            List of order responses with their items
+        """
+        query = select(*_ORDER_COLUMNS)
+        if customer_id:
+            query = query.where(Order.customer_id == customer_id)
+        if status:
+            query = query.where(Order.status == status)
+        return OrderService._with_items(
+            db, db.execute(keyset_page(query, Order, after, skip, limit)).all()
+        )
+    
+    @staticmethod
+    def list_orders_by_status(
+        db: Session, status: OrderStatus, limit: int = 100
+    ) -> List[OrderResponse]:
+        """
+        List orders in a status, least recently updated first.
+        
+        Served from the ``(status, updated_at)`` index, so finding e.g. the
+        oldest pending work does not scan the table.
+        
+        Args:
+            db: Database session
+            status: Order status
+            limit: Maximum number of records to return
+            
+        Returns:
+            List of order responses with their items
+        """
+        orders = db.execute(
+            select(*_ORDER_COLUMNS)
+            .where(Order.status == status)
+            .order_by(Order.updated_at, Order.id)
+            .limit(limit)
+        ).all()
+        return OrderService._with_items(db, orders)
+    
+    @staticmethod
+    def list_items_by_vendor(
+        db: Session,
+        vendor: str,
+        product_id: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> List[OrderItemResponse]:
+        """
+        List order items bought from a vendor.
+        
+        Served from the ``(vendor, product_id)`` index.
+        
+        Args:
+            db: Database session
+            vendor: Vendor name
+            product_id: Optional vendor product ID filter
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            
+        Returns:
+            List of order item responses, by product then oldest first
+        """
+        query = select(*_ITEM_COLUMNS).where(OrderItem.vendor == vendor)
+        if product_id:
+            query = query.where(OrderItem.product_id == product_id)
+        rows = db.execute(
+            query.order_by(OrderItem.product_id, OrderItem.id).offset(skip).limit(limit)
+        )
+        return [OrderItemResponse(**dict(zip(OrderItemResponse.model_fields, row))) for row in rows]
+    
+    @staticmethod
+    def _with_items(db: Session, orders: List[Any]) -> List[OrderResponse]:
+        """
+        Build order responses from projected order rows, loading all of their
+        items with one more statement.
+        """
+        items: Dict[int, List[OrderItemResponse]] = defaultdict(list)
+        if orders:
+            item_rows = db.execute(
+                select(OrderItem.order_id, *_ITEM_COLUMNS)
+                .where(OrderItem.order_id.in_([order.id for order in orders]))
+                .order_by(OrderItem.id)
+            )
+            for order_id, *values in item_rows:
+                items[order_id].append(
+                    OrderItemResponse(**dict(zip(OrderItemResponse.model_fields, values)))
+                )
+        
+        return [
+            OrderResponse(
+                **dict(zip(OrderResponse.model_fields, order)),
+                items=items[order.id],
+            )
+            for order in orders
+        ]
     
     @staticmethod
     def update_order_status(
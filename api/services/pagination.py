@@ -0,0 +1,89 @@
+"""
+Keyset (cursor) pagination on ``(created_at, id)``.
+"""
+
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, Optional, Sequence, Tuple
+from sqlalchemy import tuple_
+
+# Position of the last row of a page: (created_at, id)
+Cursor = Tuple[datetime, int]
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """
+    Encode a row position as an opaque cursor.
+    
+    Args:
+        created_at: Row creation time
+        row_id: Row ID
+        
+    Returns:
+        URL-safe cursor string
+    """
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+    
+    Args:
+        cursor: Cursor string
+        
+    Returns:
+        (created_at, id) of the last row already returned
+        
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def keyset_page(query, model, after: Optional[Cursor], skip: int, limit: int):
+    """
+    Order a query by ``(created_at, id)`` and select one page of it.
+    
+    With a cursor, rows after it are selected through the composite index and
+    ``skip`` is ignored; without one, the legacy offset is applied.
+    
+    Args:
+        query: ORM query or ``select()`` over ``model``
+        model: Model with ``created_at`` and ``id`` columns
+        after: Position of the last row of the previous page, if any
+        skip: Rows to skip when no cursor is given
+        limit: Page size
+        
+    Returns:
+        The query restricted to the page
+    """
+    if after is not None:
+        query = query.filter(tuple_(model.created_at, model.id) > tuple_(*after))
+    query = query.order_by(model.created_at, model.id)
+    if after is None and skip:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+
+def next_cursor(rows: Sequence[Any], limit: int) -> Optional[str]:
+    """
+    Build the cursor for the page after ``rows``.
+    
+    Args:
+        rows: A page, each row with ``created_at`` and ``id``
+        limit: Page size the rows were fetched with
+        
+    Returns:
+        Cursor after the last row, or None when the page was not full
+    """
+    if not rows or len(rows) < limit:
+        return None
+    return encode_cursor(rows[-1].created_at, rows[-1].id)
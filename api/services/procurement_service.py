@@ -3,15 +3,34 @@ Procurement service for orchestrating agent.
 """
 
 import asyncio
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Tuple
 from api.models.order import Order, OrderStatus
 from api.schemas.procurement import ProcurementRequest
+from api.schemas.order import OrderResponse
+from api.services.catalog_service import CatalogRefresher, CatalogStore
+from api.services.order_events import OrderEventBroker
 from api.services.order_service import OrderService
-from workflows.procure_office_essentials import procure_office_essentials
-from agent.schemas import ProcurementRequest as AgentProcurementRequest, Vendor
+from api.models.order_item import OrderItem
+from workflows.procure_office_essentials import procure_office_essentials_async
+from workflows.procure_streaming import procure_office_essentials_streaming
+from agent.cache import SearchCache
+from agent.offload import OptimizationPool
+from agent.optimizer import PriceOptimizer
+from agent.price_history import PriceHistory
+from agent.schemas import (
+    ItemStatus,
+    ItemUpdate,
+    ProcurementRequest as AgentProcurementRequest,
+    PurchaseResult,
+    Vendor,
+)
+from agent.search import ProductSearcher
 from integrations.base import VendorInterface
+from integrations.circuit import CircuitBreakerRegistry
 from integrations.mock_vendor import MockVendor
+from integrations.ratelimit import RateLimiterRegistry
 
 
 class ProcurementService:
@@ -21,6 +40,18 @@ class ProcurementService:
         """Initialize procurement service."""
         self.vendors: list[VendorInterface] = []
         self._initialize_vendors()
+        self.search_cache = self._create_search_cache()
+        self.rate_limits = self._create_rate_limits()
+        self.breakers = self._create_breakers()
+        self.price_history = self._create_price_history()
+        self.catalog = self._create_catalog()
+        # Shared across requests so repeated items are served from the cache
+        # and every request draws on the same per-vendor limits and breakers
+        self.searcher = self._create_searcher()
+        self.catalog_refresher = self._create_catalog_refresher()
+        self.optimizer = self._create_optimizer()
+        # Pushes order progress to clients watching /orders/{id}/events
+        self.order_events = self._create_order_events()
     
     def _initialize_vendors(self):
         """Initialize vendor integrations."""
@@ -28,73 +59,446 @@ class ProcurementService:
         # In production, initialize real vendors based on config
         self.vendors.append(MockVendor())
     
-    async     def process_procurement_async(
+    def _create_search_cache(self) -> SearchCache:
+        """Create the search cache from settings."""
+        from api.config import settings
+        
+        vendor_ttls = {
+            Vendor(vendor): ttl
+            for vendor, ttl in settings.search_cache_vendor_ttls_map.items()
+        }
+        return SearchCache(
+            max_entries=settings.search_cache_max_entries,
+            default_ttl=settings.search_cache_ttl_seconds,
+            vendor_ttls=vendor_ttls,
+        )
+    
+    def _create_rate_limits(self) -> RateLimiterRegistry:
+        """Create per-vendor rate limiters from settings."""
+        from api.config import settings
+        
+        return RateLimiterRegistry(
+            rates=settings.vendor_rate_limits_map,
+            initial_limit=settings.vendor_initial_concurrency,
+            max_limit=settings.vendor_max_concurrency,
+            latency_target=settings.vendor_latency_target_seconds,
+        )
+    
+    def _create_breakers(self) -> CircuitBreakerRegistry:
+        """Create per-vendor circuit breakers from settings."""
+        from api.config import settings
+        
+        return CircuitBreakerRegistry(
+            failure_threshold=settings.vendor_failure_threshold,
+            recovery_timeout=settings.vendor_recovery_seconds,
+        )
+    
+    def _create_catalog(self) -> Optional[CatalogStore]:
+        """Create the persistent catalog store, if enabled."""
+        from api.config import settings
+        from api.database import SessionLocal
+        
+        if not settings.catalog_enabled:
+            return None
+        return CatalogStore(
+            SessionLocal,
+            max_age=settings.catalog_max_age_seconds,
+            history=self.price_history,
+            hit_flush_size=settings.catalog_hit_flush_size,
+        )
+    
+    def _create_price_history(self) -> PriceHistory:
+        """Open the price history store from settings."""
+        from api.config import settings
+        
+        return PriceHistory(settings.price_history_dir)
+    
+    def _create_catalog_refresher(self) -> Optional[CatalogRefresher]:
+        """Create the background catalog refresher, if the catalog is enabled."""
+        from api.config import settings
+        from api.database import SessionLocal
+        
+        if self.catalog is None:
+            return None
+        return CatalogRefresher(
+            self.searcher,
+            SessionLocal,
+            refresh_after=settings.catalog_refresh_after_seconds,
+            min_hits=settings.catalog_refresh_min_hits,
+            batch_size=settings.catalog_refresh_batch_size,
+        )
+    
+    def _create_optimizer(self) -> PriceOptimizer:
+        """
+        Create the shared optimizer, measuring savings against price history and
+        with a process pool for large optimizations if configured.
+        """
+        from api.config import settings
+        
+        pool = None
+        if settings.optimizer_processes > 0:
+            pool = OptimizationPool(
+                max_workers=settings.optimizer_processes,
+                min_candidates=settings.optimizer_process_min_candidates,
+            )
+        return PriceOptimizer(
+            price_history=self.price_history,
+            savings_window_days=settings.price_history_savings_days,
+            pool=pool,
+        )
+    
+    def _create_order_events(self) -> OrderEventBroker:
+        """
+        Create the order event broker; when orders run in worker processes it
+        re-reads watched orders instead, as their progress is not published here.
+        """
+        from api.config import settings
+        
+        poll_seconds = None
+        if settings.procurement_queue == "database":
+            poll_seconds = settings.order_events_poll_seconds
+        return OrderEventBroker(
+            self._load_order_snapshot,
+            queue_size=settings.order_events_queue_size,
+            poll_seconds=poll_seconds,
+        )
+    
+    def _create_searcher(self) -> ProductSearcher:
+        """Create the shared product searcher from settings."""
+        from api.config import settings
+        
+        return ProductSearcher(
+            self.vendors,
+            cache=self.search_cache,
+            catalog=self.catalog,
+            rate_limits=self.rate_limits,
+            breakers=self.breakers,
+            hedge_percentile=settings.search_hedge_percentile,
+        )
+    
+    async def process_procurement_async(
         self, order_id: int, request: ProcurementRequest
     ):
         """
         Process order asynchronously.
         
+        Vendor I/O runs through the async workflow and database writes run on
+        worker threads, so the event loop stays free while an order is processed.
+        An error fails the order.
+        
         Args:
             order_id: Order ID
             request: Procurement request
         """
-        from api.database import SessionLocal
-        db = SessionLocal()
         try:
-            # Update status to processing
-            order = OrderService.get_order(db, order_id)
-            if order:
-                order.status = OrderStatus.PROCESSING
-                db.commit()
-            
-            # Convert to agent request
-            preferred_vendors = None
-            if request.preferred_vendors:
-                preferred_vendors = [Vendor(v) for v in request.preferred_vendors]
-            
-            agent_request = AgentProcurementRequest(
-                items=request.items,
-                budget_limit=request.budget_limit,
-                preferred_vendors=preferred_vendors,
-                require_approval=False,  # Can be configured
-            )
+            await self._run_procurement(order_id, request)
+        except Exception as e:
+            # Update order status to failed
+            await self._update_status(order_id, OrderStatus.FAILED, f"Error: {str(e)}")
+    
+    async def process_procurement_job(self, order_id: int, request: ProcurementRequest):
+        """
+        Process a queued order for a ``JobWorker``.
+        
+        Unlike ``process_procurement_async`` an error is raised rather than
+        failing the order, so the worker can re-queue the job; the order is
+        failed with the job once its attempts run out. A purchase the workflow
+        declines (e.g. over budget) is an outcome, not an error.
+        
+        Args:
+            order_id: Order ID
+            request: Procurement request
             
-            # Run procurement workflow
-            from policies.budget import BudgetPolicy
-            from policies.approvals import ApprovalPolicy
-            from api.config import settings
+        Raises:
+            Exception: Whatever stopped the order from being processed
+        """
+        await self._run_procurement(order_id, request)
+    
+    async def _run_procurement(self, order_id: int, request: ProcurementRequest):
+        """Run the procurement workflow for an order and store its outcome."""
+        # Update status to processing
+        await self._update_status(order_id, OrderStatus.PROCESSING)
+        
+        # Convert to agent request
+        preferred_vendors = None
+        if request.preferred_vendors:
+            preferred_vendors = [Vendor(v) for v in request.preferred_vendors]
+        
+        agent_request = AgentProcurementRequest(
+            items=request.items,
+            budget_limit=request.budget_limit,
+            quantity_per_item=request.quantity_per_item,
+            preferred_vendors=preferred_vendors,
+            require_approval=False,  # Can be configured
+        )
+        
+        # Run procurement workflow
+        from policies.budget import BudgetPolicy
+        from policies.approvals import ApprovalPolicy
+        from api.config import settings
+        
+        budget_policy = BudgetPolicy(budget_limit=request.budget_limit)
+        approval_policy = ApprovalPolicy(
+            approval_threshold=settings.require_approval_above
+        )
+        
+        if settings.procurement_pipeline == "streaming":
+            # Order items are created in request order
+            item_ids = await asyncio.to_thread(self._load_item_ids, order_id)
+            writer = _ItemProgressWriter(item_ids, self._write_item_fields)
             
-            budget_policy = BudgetPolicy(budget_limit=request.budget_limit)
-            approval_policy = ApprovalPolicy(
-                approval_threshold=settings.require_approval_above
-            )
+            async def record_update(update: ItemUpdate):
+                fields = _item_fields(update)
+                # Items are created pending, so only later stages are written
+                if update.status != ItemStatus.PENDING:
+                    writer.add(update.index, fields)
+                self.order_events.publish(order_id, "item", {"index": update.index, **fields})
             
-            purchase_result = procure_office_essentials(
+            try:
+                purchase_result = await procure_office_essentials_streaming(
+                    request=agent_request,
+                    vendors=self.vendors,
+                    budget_policy=budget_policy,
+                    approval_policy=approval_policy,
+                    searcher=self.searcher,
+                    optimizer=self.optimizer,
+                    on_update=record_update,
+                )
+            finally:
+                await writer.close()
+        else:
+            purchase_result = await procure_office_essentials_async(
                 request=agent_request,
                 vendors=self.vendors,
                 budget_policy=budget_policy,
                 approval_policy=approval_policy,
+                searcher=self.searcher,
+                optimizer=self.optimizer,
             )
-            
-            # Update order with results
+        
+        # Update order with results
+        await asyncio.to_thread(self._record_result, order_id, purchase_result)
+        self.order_events.publish(order_id, "status", _result_fields(purchase_result))
+    
+    async def process_procurement_batch_async(
+        self, orders: List[Tuple[int, ProcurementRequest]], max_concurrency: int = 8
+    ):
+        """
+        Process a batch of orders, a bounded number at a time.
+        
+        Args:
+            orders: (order ID, procurement request) pairs
+            max_concurrency: Orders processed at the same time
+        """
+        semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+        
+        async def process(order_id: int, request: ProcurementRequest):
+            async with semaphore:
+                await self.process_procurement_async(order_id, request)
+        
+        await asyncio.gather(*(process(order_id, request) for order_id, request in orders))
+    
+    async def _update_status(
+        self, order_id: int, status: OrderStatus, notes: Optional[str] = None
+    ):
+        """Store an order's new status on a worker thread and publish it."""
+        await asyncio.to_thread(self._set_order_status, order_id, status, notes)
+        self.order_events.publish(order_id, "status", {"status": status.value, "notes": notes})
+    
+    def _set_order_status(
+        self, order_id: int, status: OrderStatus, notes: Optional[str] = None
+    ):
+        """
+        Update an order's status in its own session.
+        
+        Args:
+            order_id: Order ID
+            status: New order status
+            notes: Optional notes to store on the order
+        """
+        from api.database import SessionLocal
+        db = SessionLocal()
+        try:
             order = OrderService.get_order(db, order_id)
             if order:
-                if purchase_result.success:
-                    order.status = OrderStatus.COMPLETED
-                    order.total_amount = purchase_result.total_cost
-                else:
-                    order.status = OrderStatus.FAILED
-                    order.notes = purchase_result.error_message or "Purchase failed"
-                
+                order.status = status
+                if notes:
+                    order.notes = notes
                 db.commit()
+        finally:
+            db.close()
+    
+    @staticmethod
+    def _load_item_ids(order_id: int) -> List[int]:
+        """
+        Get an order's item IDs.
         
-        except Exception as e:
-            # Update order status to failed
+        Args:
+            order_id: Order ID
+            
+        Returns:
+            Order item IDs, in the order the items were created
+        """
+        from api.database import SessionLocal
+        db = SessionLocal()
+        try:
+            return list(db.scalars(
+                select(OrderItem.id).where(OrderItem.order_id == order_id).order_by(OrderItem.id)
+            ))
+        finally:
+            db.close()
+    
+    @staticmethod
+    def _write_item_fields(changes: Dict[int, dict]):
+        """
+        Store line items' progress on their order items in one transaction.
+        
+        Args:
+            changes: Columns to set, by order item ID
+        """
+        from api.database import SessionLocal
+        db = SessionLocal()
+        try:
+            for item_id, fields in changes.items():
+                db.execute(update(OrderItem).where(OrderItem.id == item_id).values(**fields))
+            db.commit()
+        finally:
+            db.close()
+    
+    def _record_result(self, order_id: int, purchase_result: PurchaseResult):
+        """
+        Store the outcome of a procurement run on its order.
+        
+        Args:
+            order_id: Order ID
+            purchase_result: Result returned by the workflow
+        """
+        from api.database import SessionLocal
+        db = SessionLocal()
+        try:
             order = OrderService.get_order(db, order_id)
             if order:
-                order.status = OrderStatus.FAILED
-                order.notes = f"Error: {str(e)}"
+                for column, value in _result_fields(purchase_result).items():
+                    if value is not None:
+                        setattr(order, column, value)
                 db.commit()
         finally:
             db.close()
+    
+    @staticmethod
+    def _load_order_snapshot(order_id: int) -> Optional[dict]:
+        """
+        Read an order with its items, for the order event broker.
+        
+        Args:
+            order_id: Order ID
+            
+        Returns:
+            The order as a JSON-ready dict, or None if it does not exist
+        """
+        from api.database import SessionLocal
+        db = SessionLocal()
+        try:
+            order = OrderService.get_order(db, order_id)
+            if order is None:
+                return None
+            return OrderResponse.model_validate(order).model_dump(mode="json")
+        finally:
+            db.close()
+
 
+class _ItemProgressWriter:
+    """
+    Writes line items' progress to the database behind the pipeline.
+    
+    Updates are merged per item while a write is in flight and the next write
+    takes all of them, so the pipeline never waits on a commit and a burst of
+    stage changes costs one transaction rather than one each.
+    """
+    
+    def __init__(self, item_ids: List[int], write: Callable[[Dict[int, dict]], None]):
+        """
+        Initialize the writer.
+        
+        Args:
+            item_ids: Order item IDs, by line item index
+            write: Stores changes (columns by order item ID); run on a worker thread
+        """
+        self.item_ids = item_ids
+        self.write = write
+        self._pending: Dict[int, dict] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._error: Optional[Exception] = None
+    
+    def add(self, index: int, fields: dict):
+        """Queue a line item's changed columns for writing."""
+        if index >= len(self.item_ids):
+            return
+        self._pending.setdefault(self.item_ids[index], {}).update(fields)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush())
+    
+    async def _flush(self):
+        """Write queued changes until none are left; the first error stops writing."""
+        while self._pending and self._error is None:
+            changes, self._pending = self._pending, {}
+            try:
+                await asyncio.to_thread(self.write, changes)
+            except Exception as e:
+                self._error = e
+    
+    async def close(self):
+        """
+        Wait for queued changes to be written.
+        
+        Raises:
+            Exception: The error that stopped a write, if any
+        """
+        if self._task is not None:
+            await self._task
+        if self._error is not None:
+            raise self._error
+
+
+def _item_fields(update: ItemUpdate) -> dict:
+    """OrderItem columns that change with a line item's progress."""
+    fields = {"status": update.status.value}
+    if update.products:
+        product = update.products[0]
+        fields.update(
+            product_id=product.id,
+            product_name=product.name,
+            vendor=product.vendor.value,
+            price=product.price,
+        )
+    if update.status == ItemStatus.PURCHASED:
+        fields["quantity_purchased"] = sum(update.quantities) or len(update.products)
+    if update.error:
+        fields["notes"] = update.error
+    return fields
+
+
+def _result_fields(purchase_result: PurchaseResult) -> dict:
+    """
+    Order columns set from a procurement run's outcome; None leaves a column as is.
+    
+    A run that bought some items but not others is partial, and records what
+    was spent along with why the rest were not bought.
+    """
+    if purchase_result.success:
+        return {
+            "status": OrderStatus.COMPLETED.value,
+            "total_amount": purchase_result.total_cost,
+            "notes": None,
+        }
+    if purchase_result.products_purchased:
+        return {
+            "status": OrderStatus.PARTIAL.value,
+            "total_amount": purchase_result.total_cost,
+            "notes": purchase_result.error_message or "Some items were not purchased",
+        }
+    return {
+        "status": OrderStatus.FAILED.value,
+        "total_amount": None,
+        "notes": purchase_result.error_message or "Purchase failed",
+    }
@@ -16,19 +16,19 @@ async function apiRequest(endpoint, options = {}) {
         },
         ...options,
     };
-
+    
     if (config.body && typeof config.body === 'object') {
         config.body = JSON.stringify(config.body);
     }
-
+    
     try {
         const response = await fetch(url, config);
         const data = await response.json();
-
+        
         if (!response.ok) {
             throw new Error(data.detail || `HTTP error! status: ${response.status}`);
         }
-
+        
         return data;
     } catch (error) {
         console.error('API request failed:', error);
@@ -65,6 +65,11 @@ const procurementAPI = {
     }),
 };
 
+/**
+ * Order statuses after which an order's event stream ends.
+ */
+const FINAL_ORDER_STATUSES = ['completed', 'partial', 'failed', 'cancelled'];
+
 /**
  * Order API methods.
  */
@@ -78,6 +83,26 @@ const orderAPI = {
         method: 'PATCH',
         body: { status },
     }),
+    /**
+     * Follow an order's progress over Server-Sent Events instead of polling.
+     * Handlers: snapshot(order), status(fields), item(fields with index),
+     * done(order fields); returns the EventSource.
+     */
+    watch: (orderId, handlers = {}) => {
+        const source = new EventSource(`${API_BASE_URL}/orders/${orderId}/events`);
+        ['snapshot', 'status', 'item'].forEach((event) => {
+            source.addEventListener(event, (e) => {
+                const data = JSON.parse(e.data);
+                if (handlers[event]) handlers[event](data);
+                // Close before the server does, or EventSource would reconnect
+                if (event !== 'item' && FINAL_ORDER_STATUSES.includes(data.status)) {
+                    source.close();
+                    if (handlers.done) handlers.done(data);
+                }
+            });
+        });
+        return source;
+    },
 };
 
 /**
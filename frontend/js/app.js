@@ -43,18 +43,54 @@ document.getElementById('procurement-form').addEventListener('submit', async (e)
         const result = await procurementAPI.create(requestData);
         showResult('procurement-result', 
             `Procurement request created! Order ID: ${result.order_id}, Status: ${result.status}`, 
-            'success');
+            'info');
         document.getElementById('procurement-form').reset();
         
-        // Reload orders after a delay
-        setTimeout(() => {
-            loadOrders();
-        }, 1000);
+        // Follow the order as it is processed, then refresh the list
+        watchOrder(result.order_id);
     } catch (error) {
         showResult('procurement-result', `Error: ${error.message}`, 'error');
     }
 });
 
+/**
+ * Show an order's progress as it streams in.
+ */
+function watchOrder(orderId) {
+    let order = null;
+    const render = () => {
+        const element = document.getElementById('procurement-result');
+        element.className = `result ${order.status === 'failed' ? 'error' : 'info'}`;
+        element.style.display = 'block';
+        element.innerHTML = `
+            <div>Order #${order.id}: <span class="status ${order.status}">${order.status}</span></div>
+            <ul style="margin-top: 5px; margin-left: 20px;">
+                ${order.items.map(item => `
+                    <li>${item.item_name} - ${item.status}${item.price ? ` (${formatCurrency(item.price)})` : ''}</li>
+                `).join('')}
+            </ul>
+        `;
+    };
+
+    orderAPI.watch(orderId, {
+        snapshot: (data) => {
+            order = data;
+            render();
+        },
+        status: (data) => {
+            Object.entries(data).forEach(([key, value]) => {
+                if (value !== null) order[key] = value;
+            });
+            render();
+        },
+        item: ({ index, ...fields }) => {
+            Object.assign(order.items[index], fields);
+            render();
+        },
+        done: () => loadOrders(),
+    });
+}
+
 // Load orders handler
 document.getElementById('load-orders').addEventListener('click', () => {
     loadOrders();
@@ -2,8 +2,21 @@
 External vendor and system integrations.
 """
 
-from integrations.base import VendorInterface
+from integrations.base import (
+    VendorInterface,
+    AsyncVendorInterface,
+    SyncVendorAdapter,
+    as_async_vendor,
+)
 from integrations.mock_vendor import MockVendor
+from integrations.local_catalog import LocalCatalogVendor
 
-__all__ = ["VendorInterface", "MockVendor"]
+__all__ = [
+    "VendorInterface",
+    "AsyncVendorInterface",
+    "SyncVendorAdapter",
+    "as_async_vendor",
+    "MockVendor",
+    "LocalCatalogVendor",
+]
 
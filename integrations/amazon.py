@@ -2,15 +2,25 @@
 Amazon Product Advertising API integration.
 """
 
-from typing import List
+from typing import List, Optional
 from agent.schemas import Product, Vendor
 from integrations.base import VendorInterface
+from integrations.transport import RequestSigner, VendorTransport, get_transport
+
+AMAZON_API_URL = "https://webservices.amazon.com/paapi5"
 
 
 class AmazonVendor(VendorInterface):
     """Amazon vendor integration."""
     
-    def __init__(self, access_key: str, secret_key: str, associate_tag: str):
+    def __init__(
+        self,
+        access_key: str,
+        secret_key: str,
+        associate_tag: str,
+        base_url: str = AMAZON_API_URL,
+        transport: Optional[VendorTransport] = None,
+    ):
         """
         Initialize Amazon vendor.
         
@@ -18,10 +28,15 @@ class AmazonVendor(VendorInterface):
             access_key: Amazon API access key
             secret_key: Amazon API secret key
             associate_tag: Amazon Associate tag
+            base_url: API base URL
+            transport: Optional transport; defaults to the shared pool for ``base_url``
         """
         self.access_key = access_key
         self.secret_key = secret_key
         self.associate_tag = associate_tag
+        self.signer = RequestSigner(access_key, secret_key, service="ProductAdvertisingAPI")
+        # Shared per host, so every instance reuses the same keep-alive pool
+        self.transport = transport or get_transport(Vendor.AMAZON, base_url)
     
     def get_name(self) -> str:
         """Get the vendor name."""
@@ -43,6 +58,7 @@ class AmazonVendor(VendorInterface):
             List of Product objects
         """
         # TODO: Implement Amazon Product Advertising API integration
+        # (call self.transport.get_json(..., signer=self.signer))
         # This is a placeholder implementation
         raise NotImplementedError("Amazon API integration not yet implemented")
     
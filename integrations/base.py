@@ -2,6 +2,7 @@
 Base vendor interface for all vendor integrations.
 """
 
+import asyncio
 from abc import ABC, abstractmethod
 from typing import List
 from agent.schemas import Product, Vendor
@@ -60,4 +61,196 @@ class VendorInterface(ABC):
             Dictionary with purchase result (order_id, status, etc.)
         """
         pass
+    
+    # Vendors whose API serves several searches in one request override
+    # ``search_batch`` and set this; ProductSearcher then batches their searches
+    supports_batch_search: bool = False
+    # Queries (or product IDs) sent in one batch request
+    max_batch_size: int = 50
+    
+    def search_batch(self, queries: List[str], max_results: int = 10) -> List[List[Product]]:
+        """
+        Search for several queries at once.
+        
+        The default runs ``search`` once per query; vendors with a batch API
+        override it to answer all of them in one round trip.
+        
+        Args:
+            queries: Search query strings, at most ``max_batch_size``
+            max_results: Maximum number of results per query
+            
+        Returns:
+            One list of Product objects per query, in query order
+        """
+        return [self.search(query, max_results=max_results) for query in queries]
+    
+    def get_products(self, product_ids: List[str]) -> List[Product]:
+        """
+        Get several products by ID.
+        
+        The default calls ``get_product`` once per ID; vendors with a batch
+        lookup override it.
+        
+        Args:
+            product_ids: Product IDs, at most ``max_batch_size``
+            
+        Returns:
+            Product objects in ID order
+        """
+        return [self.get_product(product_id) for product_id in product_ids]
+
+
+class AsyncVendorInterface(ABC):
+    """Abstract base class for vendor integrations with native async I/O."""
+    
+    @abstractmethod
+    def get_name(self) -> str:
+        """Get the vendor name."""
+        pass
+    
+    @abstractmethod
+    def get_vendor_type(self) -> Vendor:
+        """Get the vendor type enum."""
+        pass
+    
+    @abstractmethod
+    async def asearch(self, query: str, max_results: int = 10) -> List[Product]:
+        """
+        Search for products.
+        
+        Args:
+            query: Search query string
+            max_results: Maximum number of results to return
+            
+        Returns:
+            List of Product objects
+        """
+        pass
+    
+    @abstractmethod
+    async def aget_product(self, product_id: str) -> Product:
+        """
+        Get a specific product by ID.
+        
+        Args:
+            product_id: The product ID
+            
+        Returns:
+            Product object
+        """
+        pass
+    
+    @abstractmethod
+    async def apurchase(self, product_id: str, quantity: int = 1) -> dict:
+        """
+        Purchase a product.
+        
+        Args:
+            product_id: The product ID to purchase
+            quantity: Quantity to purchase
+            
+        Returns:
+            Dictionary with purchase result (order_id, status, etc.)
+        """
+        pass
+    
+    # See VendorInterface.supports_batch_search
+    supports_batch_search: bool = False
+    max_batch_size: int = 50
+    
+    async def asearch_batch(
+        self, queries: List[str], max_results: int = 10
+    ) -> List[List[Product]]:
+        """
+        Search for several queries at once.
+        
+        The default runs ``asearch`` for every query concurrently; vendors with
+        a batch API override it to answer all of them in one round trip.
+        
+        Args:
+            queries: Search query strings, at most ``max_batch_size``
+            max_results: Maximum number of results per query
+            
+        Returns:
+            One list of Product objects per query, in query order
+        """
+        return list(await asyncio.gather(
+            *(self.asearch(query, max_results=max_results) for query in queries)
+        ))
+    
+    async def aget_products(self, product_ids: List[str]) -> List[Product]:
+        """
+        Get several products by ID.
+        
+        The default runs ``aget_product`` for every ID concurrently; vendors
+        with a batch lookup override it.
+        
+        Args:
+            product_ids: Product IDs, at most ``max_batch_size``
+            
+        Returns:
+            Product objects in ID order
+        """
+        return list(await asyncio.gather(
+            *(self.aget_product(product_id) for product_id in product_ids)
+        ))
+
+
+class SyncVendorAdapter(AsyncVendorInterface):
+    """Exposes a synchronous vendor through the async interface using worker threads."""
+    
+    def __init__(self, vendor: VendorInterface):
+        """
+        Initialize the adapter.
+        
+        Args:
+            vendor: The synchronous vendor to wrap
+        """
+        self.vendor = vendor
+        self.supports_batch_search = vendor.supports_batch_search
+        self.max_batch_size = vendor.max_batch_size
+    
+    def get_name(self) -> str:
+        """Get the vendor name."""
+        return self.vendor.get_name()
+    
+    def get_vendor_type(self) -> Vendor:
+        """Get the vendor type enum."""
+        return self.vendor.get_vendor_type()
+    
+    async def asearch(self, query: str, max_results: int = 10) -> List[Product]:
+        """Search for products without blocking the event loop."""
+        return await asyncio.to_thread(self.vendor.search, query, max_results=max_results)
+    
+    async def aget_product(self, product_id: str) -> Product:
+        """Get a specific product by ID without blocking the event loop."""
+        return await asyncio.to_thread(self.vendor.get_product, product_id)
+    
+    async def apurchase(self, product_id: str, quantity: int = 1) -> dict:
+        """Purchase a product without blocking the event loop."""
+        return await asyncio.to_thread(self.vendor.purchase, product_id, quantity=quantity)
+    
+    async def asearch_batch(
+        self, queries: List[str], max_results: int = 10
+    ) -> List[List[Product]]:
+        """Search for several queries in one call on a worker thread."""
+        return await asyncio.to_thread(self.vendor.search_batch, queries, max_results=max_results)
+    
+    async def aget_products(self, product_ids: List[str]) -> List[Product]:
+        """Get several products in one call on a worker thread."""
+        return await asyncio.to_thread(self.vendor.get_products, product_ids)
 
+
+def as_async_vendor(vendor) -> AsyncVendorInterface:
+    """
+    Get an async view of a vendor.
+    
+    Args:
+        vendor: A VendorInterface or AsyncVendorInterface
+        
+    Returns:
+        The vendor itself if it is already async, otherwise a SyncVendorAdapter
+    """
+    if isinstance(vendor, AsyncVendorInterface):
+        return vendor
+    return SyncVendorAdapter(vendor)
@@ -0,0 +1,136 @@
+"""
+In-memory inverted index over a product catalog.
+"""
+
+import re
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from agent.schemas import Product
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Maximum number of memoized prefix expansions kept per index
+_PREFIX_CACHE_SIZE = 4096
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Split text into lower-case alphanumeric tokens.
+    
+    Args:
+        text: Text to tokenize
+        
+    Returns:
+        List of tokens in order of appearance
+    """
+    if not text:
+        return []
+    return _TOKEN_RE.findall(text.lower())
+
+
+class CatalogIndex:
+    """
+    Tokenized inverted index with an id -> product map, built once at load time.
+    
+    A product matches a query when every query token is a prefix of some
+    token in the product's name or description, so "pen" matches "Pens".
+    Matches are returned in catalog order.
+    """
+    
+    def __init__(self, products: Iterable[Product]):
+        """
+        Build the index.
+        
+        Args:
+            products: Catalog products, in the order results should be ranked
+        """
+        self.products: List[Product] = list(products)
+        self.by_id: Dict[str, Product] = {}
+        postings: Dict[str, List[int]] = {}
+        
+        for position, product in enumerate(self.products):
+            self.by_id.setdefault(product.id, product)
+            tokens = set(tokenize(product.name)) | set(tokenize(product.description))
+            for token in tokens:
+                postings.setdefault(token, []).append(position)
+        
+        self._postings = postings
+        self._vocabulary = sorted(postings)
+        self._prefix_cache: Dict[str, Tuple[List[int], Set[int]]] = {}
+    
+    def __len__(self) -> int:
+        return len(self.products)
+    
+    def get(self, product_id: str) -> Optional[Product]:
+        """
+        Look up a product by ID.
+        
+        Args:
+            product_id: The product ID
+            
+        Returns:
+            Product or None if not in the catalog
+        """
+        return self.by_id.get(product_id)
+    
+    def search(self, query: str, max_results: int = 10) -> List[Product]:
+        """
+        Find products matching every token of a query.
+        
+        Args:
+            query: Search query string
+            max_results: Maximum number of results
+            
+        Returns:
+            Matching products in catalog order
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return self.products[:max_results]
+        
+        # Walk the most selective token's positions in catalog order and stop
+        # as soon as enough of them match every other token
+        matches = sorted(
+            (self._match_prefix(token) for token in set(tokens)), key=lambda m: len(m[0])
+        )
+        ordered, _ = matches[0]
+        others = [positions for _, positions in matches[1:]]
+        
+        results: List[Product] = []
+        for position in ordered:
+            if all(position in other for other in others):
+                results.append(self.products[position])
+                if len(results) >= max_results:
+                    break
+        return results
+    
+    def _match_prefix(self, prefix: str) -> Tuple[List[int], Set[int]]:
+        """
+        Positions of products with a token starting with ``prefix``.
+        
+        Returns the positions both sorted (for ordered scans) and as a set
+        (for membership checks).
+        """
+        cached = self._prefix_cache.get(prefix)
+        if cached is not None:
+            return cached
+        
+        vocabulary = self._vocabulary
+        index = bisect_left(vocabulary, prefix)
+        expansions = []
+        while index < len(vocabulary) and vocabulary[index].startswith(prefix):
+            expansions.append(self._postings[vocabulary[index]])
+            index += 1
+        
+        if len(expansions) == 1:
+            ordered = expansions[0]
+            positions = set(ordered)
+        else:
+            positions = set().union(*expansions)
+            ordered = sorted(positions)
+        
+        # The index is immutable, so prefix expansions can be memoized
+        if len(self._prefix_cache) >= _PREFIX_CACHE_SIZE:
+            self._prefix_cache.clear()
+        self._prefix_cache[prefix] = (ordered, positions)
+        return ordered, positions
@@ -0,0 +1,203 @@
+"""
+Per-vendor circuit breakers.
+
+A vendor that keeps failing is skipped immediately instead of making every
+search wait out its timeout; after a cool-down a trial call decides whether
+it is healthy again.
+"""
+
+import threading
+import time
+from enum import Enum
+from typing import Any, Dict, Optional
+from integrations.ratelimit import is_throttle_error, is_vendor_failure
+
+
+class CircuitState(str, Enum):
+    """Circuit breaker states."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a vendor whose circuit is open."""
+    
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"Circuit open for {name}; retrying in {retry_in:.1f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker for one vendor.
+    
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail fast with ``CircuitOpenError``. Once ``recovery_timeout`` has
+    passed it lets ``half_open_max_calls`` trial calls through: a success
+    closes it, a failure opens it again. Only transport errors, timeouts and
+    5xx responses count as failures; throttling is left to the rate limiter.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock=time.monotonic,
+    ):
+        """
+        Initialize the breaker.
+        
+        Args:
+            name: Vendor name used in errors and metrics
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_timeout: Seconds to stay open before allowing a trial call
+            half_open_max_calls: Trial calls allowed at once while half-open
+            clock: Monotonic clock, injectable for tests
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.clock = clock
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trials = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.opened = 0
+    
+    @property
+    def state(self) -> CircuitState:
+        """Current state, moving from open to half-open once the cool-down has passed."""
+        with self._lock:
+            return self._current_state()
+    
+    def before_call(self):
+        """
+        Check that a call may proceed.
+        
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with all
+                trial slots taken
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CircuitState.CLOSED:
+                return
+            if state == CircuitState.HALF_OPEN and self._trials < self.half_open_max_calls:
+                self._trials += 1
+                return
+            self.rejected += 1
+            retry_in = max(0.0, self._opened_at + self.recovery_timeout - self.clock())
+        raise CircuitOpenError(self.name, retry_in)
+    
+    def record_success(self):
+        """Record a successful call, closing the circuit."""
+        with self._lock:
+            self._failures = 0
+            self._trials = 0
+            self._state = CircuitState.CLOSED
+    
+    def record_failure(self, error: Optional[BaseException] = None):
+        """
+        Record a failed call.
+        
+        Args:
+            error: The exception raised, if any; throttles and errors that are
+                not vendor failures (see ``is_vendor_failure``) are ignored
+        """
+        with self._lock:
+            state = self._current_state()
+            if error is not None and (is_throttle_error(error) or not is_vendor_failure(error)):
+                # Says nothing about health; hand back the trial slot
+                self._trials = max(0, self._trials - 1)
+                return
+            self._failures += 1
+            if state == CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._open()
+    
+    def record_cancelled(self):
+        """Record a call abandoned before it finished, freeing its half-open trial slot."""
+        with self._lock:
+            self._trials = max(0, self._trials - 1)
+    
+    def _current_state(self) -> CircuitState:
+        """Resolve the state, assuming the lock is held."""
+        if (
+            self._state == CircuitState.OPEN
+            and self.clock() - self._opened_at >= self.recovery_timeout
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._trials = 0
+        return self._state
+    
+    def _open(self):
+        """Open the circuit, assuming the lock is held."""
+        self._state = CircuitState.OPEN
+        self._opened_at = self.clock()
+        self._trials = 0
+        self.opened += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get breaker state and counters.
+        
+        Returns:
+            Dictionary with state, consecutive failures, times opened and
+            calls rejected while open
+        """
+        with self._lock:
+            return {
+                "vendor": self.name,
+                "state": self._current_state().value,
+                "consecutive_failures": self._failures,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
+
+
+class CircuitBreakerRegistry:
+    """Lazily created ``CircuitBreaker`` per vendor, with shared settings."""
+    
+    def __init__(self, **breaker_kwargs):
+        """
+        Initialize the registry.
+        
+        Args:
+            **breaker_kwargs: Passed to each ``CircuitBreaker``
+        """
+        self.breaker_kwargs = breaker_kwargs
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, name: str) -> CircuitBreaker:
+        """
+        Get the breaker for a vendor, creating it on first use.
+        
+        Args:
+            name: Vendor name (e.g. ``Vendor.value``)
+            
+        Returns:
+            The vendor's breaker
+        """
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = self._breakers[name] = CircuitBreaker(name, **self.breaker_kwargs)
+            return breaker
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get state for every vendor seen so far.
+        
+        Returns:
+            Mapping of vendor name to ``CircuitBreaker.stats()``
+        """
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.name: breaker.stats() for breaker in breakers}
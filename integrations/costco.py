@@ -2,24 +2,38 @@
 Costco API integration.
 """
 
-from typing import List
+from typing import List, Optional
 from agent.schemas import Product, Vendor
 from integrations.base import VendorInterface
+from integrations.transport import RequestSigner, VendorTransport, get_transport
+
+COSTCO_API_URL = "https://api.costco.com/v1"
 
 
 class CostcoVendor(VendorInterface):
     """Costco vendor integration."""
     
-    def __init__(self, api_key: str, api_secret: str):
+    def __init__(
+        self,
+        api_key: str,
+        api_secret: str,
+        base_url: str = COSTCO_API_URL,
+        transport: Optional[VendorTransport] = None,
+    ):
         """
         Initialize Costco vendor.
         
         Args:
             api_key: Costco API key
             api_secret: Costco API secret
+            base_url: API base URL
+            transport: Optional transport; defaults to the shared pool for ``base_url``
         """
         self.api_key = api_key
         self.api_secret = api_secret
+        self.signer = RequestSigner(api_key, api_secret, service="costco")
+        # Shared per host, so every instance reuses the same keep-alive pool
+        self.transport = transport or get_transport(Vendor.COSTCO, base_url)
     
     def get_name(self) -> str:
         """Get the vendor name."""
@@ -41,6 +55,7 @@ class CostcoVendor(VendorInterface):
             List of Product objects
         """
         # TODO: Implement Costco API integration
+        # (call self.transport.get_json(..., signer=self.signer))
         raise NotImplementedError("Costco API integration not yet implemented")
     
     def get_product(self, product_id: str) -> Product:
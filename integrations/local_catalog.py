@@ -0,0 +1,157 @@
+"""
+Local catalog vendor backed by a product file, for offline and load testing.
+"""
+
+import csv
+import json
+from pathlib import Path
+from typing import Iterable, List, Union
+from agent.schemas import Product, Vendor
+from integrations.base import VendorInterface
+from integrations.catalog_index import CatalogIndex
+
+
+class LocalCatalogVendor(VendorInterface):
+    """Vendor that serves searches from an indexed in-memory catalog."""
+    
+    supports_batch_search = True
+    
+    def __init__(
+        self,
+        products: Iterable[Product],
+        name: str = "Local Catalog",
+        vendor_type: Vendor = Vendor.MOCK,
+    ):
+        """
+        Initialize the local catalog vendor.
+        
+        Args:
+            products: Catalog products, in ranking order
+            name: Vendor display name
+            vendor_type: Vendor type reported to the rest of the agent
+        """
+        self.name = name
+        self.vendor_type = vendor_type
+        self._index = CatalogIndex(products)
+    
+    @classmethod
+    def from_file(cls, path: Union[str, Path], **kwargs) -> "LocalCatalogVendor":
+        """
+        Load a catalog from a JSON Lines, JSON array or CSV file.
+        
+        Each record uses the ``Product`` field names; CSV cells that are empty
+        are treated as missing.
+        
+        Args:
+            path: Path to a .jsonl, .json or .csv file
+            **kwargs: Passed through to the constructor
+            
+        Returns:
+            LocalCatalogVendor serving the file's products
+        """
+        path = Path(path)
+        suffix = path.suffix.lower()
+        
+        with path.open(newline="" if suffix == ".csv" else None) as f:
+            if suffix == ".jsonl":
+                records = (json.loads(line) for line in f if line.strip())
+                products = [Product.model_validate(record) for record in records]
+            elif suffix == ".json":
+                products = [Product.model_validate(record) for record in json.load(f)]
+            elif suffix == ".csv":
+                products = [
+                    Product.model_validate({k: v for k, v in row.items() if v != ""})
+                    for row in csv.DictReader(f)
+                ]
+            else:
+                raise ValueError(f"Unsupported catalog format: {path.suffix}")
+        
+        return cls(products, **kwargs)
+    
+    def __len__(self) -> int:
+        return len(self._index)
+    
+    def get_name(self) -> str:
+        """Get the vendor name."""
+        return self.name
+    
+    def get_vendor_type(self) -> Vendor:
+        """Get the vendor type."""
+        return self.vendor_type
+    
+    def search(self, query: str, max_results: int = 10) -> List[Product]:
+        """
+        Search the catalog index.
+        
+        Args:
+            query: Search query string
+            max_results: Maximum number of results
+            
+        Returns:
+            List of matching products
+        """
+        return self._index.search(query, max_results=max_results)
+    
+    def get_product(self, product_id: str) -> Product:
+        """
+        Get a specific product by ID.
+        
+        Args:
+            product_id: The product ID
+            
+        Returns:
+            Product object
+        """
+        product = self._index.get(product_id)
+        if product is None:
+            raise ValueError(f"Product {product_id} not found")
+        return product
+    
+    def search_batch(self, queries: List[str], max_results: int = 10) -> List[List[Product]]:
+        """
+        Answer several searches from the index in one call.
+        
+        Args:
+            queries: Search query strings
+            max_results: Maximum number of results per query
+            
+        Returns:
+            One list of matching products per query
+        """
+        return [self._index.search(query, max_results=max_results) for query in queries]
+    
+    def get_products(self, product_ids: List[str]) -> List[Product]:
+        """
+        Get several products by ID in one call.
+        
+        Args:
+            product_ids: The product IDs
+            
+        Returns:
+            Product objects in ID order
+        """
+        products = [self._index.get(product_id) for product_id in product_ids]
+        missing = [pid for pid, product in zip(product_ids, products) if product is None]
+        if missing:
+            raise ValueError(f"Products not found: {', '.join(missing)}")
+        return products
+    
+    def purchase(self, product_id: str, quantity: int = 1) -> dict:
+        """
+        Simulated purchase against the local catalog.
+        
+        Args:
+            product_id: The product ID to purchase
+            quantity: Quantity to purchase
+            
+        Returns:
+            Dictionary with simulated purchase result
+        """
+        product = self.get_product(product_id)
+        return {
+            "order_id": f"LOCAL-ORDER-{product_id}-{quantity}",
+            "status": "success",
+            "product_id": product_id,
+            "quantity": quantity,
+            "total_cost": product.price * quantity,
+        }
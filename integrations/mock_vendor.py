@@ -5,6 +5,7 @@ Mock vendor for testing without real API keys.
 from typing import List
 from agent.schemas import Product, Vendor
 from integrations.base import VendorInterface
+from integrations.catalog_index import CatalogIndex
 
 
 class MockVendor(VendorInterface):
@@ -13,6 +14,7 @@ class MockVendor(VendorInterface):
     def __init__(self):
         """Initialize the mock vendor."""
         self._products = self._generate_mock_products()
+        self._index = CatalogIndex(self._products)
     
     def get_name(self) -> str:
         """Get the vendor name."""
@@ -74,12 +76,7 @@ class MockVendor(VendorInterface):
         Returns:
             List of matching products
         """
-        query_lower = query.lower()
-        matching = [
-            p for p in self._products
-            if query_lower in p.name.lower() or query_lower in (p.description or "").lower()
-        ]
-        return matching[:max_results]
+        return self._index.search(query, max_results=max_results)
     
     def get_product(self, product_id: str) -> Product:
         """
@@ -91,10 +88,10 @@ class MockVendor(VendorInterface):
         Returns:
             Product object
         """
-        for product in self._products:
-            if product.id == product_id:
-                return product
-        raise ValueError(f"Product {product_id} not found")
+        product = self._index.get(product_id)
+        if product is None:
+            raise ValueError(f"Product {product_id} not found")
+        return product
     
     def purchase(self, product_id: str, quantity: int = 1) -> dict:
         """
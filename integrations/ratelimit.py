@@ -0,0 +1,458 @@
+"""
+Per-vendor rate limiting: token buckets plus AIMD adaptive concurrency.
+
+Callers over the limit are queued rather than failed, so bursts turn into
+latency instead of 429s and retries.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Deque, Dict, Optional
+import httpx
+
+
+class ThrottledError(Exception):
+    """Raised by a vendor integration when the upstream API throttles a request."""
+    
+    def __init__(self, message: str = "Throttled by vendor", retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_throttle_error(error: BaseException) -> bool:
+    """
+    Check whether an exception means the vendor throttled the request.
+    
+    Args:
+        error: Exception raised by a vendor call
+        
+    Returns:
+        True for ``ThrottledError`` and HTTP 429 responses
+    """
+    if isinstance(error, ThrottledError):
+        return True
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) == 429
+
+
+def is_vendor_failure(error: BaseException) -> bool:
+    """
+    Check whether an exception means the vendor itself is failing.
+    
+    Only transport errors, timeouts and 5xx responses count. Errors raised
+    for a request the vendor answered (e.g. a ``ValueError`` for an unknown
+    product) say nothing about its health.
+    
+    Args:
+        error: Exception raised by a vendor call
+        
+    Returns:
+        True for connection and timeout errors and HTTP 5xx responses
+    """
+    if isinstance(
+        error, (TimeoutError, asyncio.TimeoutError, ConnectionError, httpx.TransportError)
+    ):
+        return True
+    response = getattr(error, "response", None)
+    status_code = getattr(response, "status_code", None)
+    return isinstance(status_code, int) and status_code >= 500
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Seconds the vendor asked callers to back off, if it said."""
+    if isinstance(error, ThrottledError):
+        return error.retry_after
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that hands out reservations.
+    
+    ``reserve`` always succeeds and returns how long the caller must wait
+    before its token is valid, so callers queue in arrival order and no
+    request is rejected.
+    """
+    
+    def __init__(self, rate: float, burst: Optional[float] = None, clock=time.monotonic):
+        """
+        Initialize the bucket.
+        
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity (defaults to one second of tokens, at least 1)
+            clock: Monotonic clock, injectable for tests
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        self.clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+    
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens, borrowing against future refills if needed.
+        
+        Args:
+            tokens: Tokens to take
+            
+        Returns:
+            Seconds to wait before proceeding (0 if tokens were available)
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+    
+    def pause(self, seconds: float):
+        """
+        Make the bucket empty for ``seconds`` (e.g. to honour ``Retry-After``).
+        
+        Args:
+            seconds: How long no new tokens should be available
+        """
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, -seconds * self.rate)
+    
+    def _refill(self):
+        """Add tokens for the time elapsed since the last update."""
+        now = self.clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class AIMDLimiter:
+    """
+    Adaptive concurrency limit with additive increase, multiplicative decrease.
+    
+    Each successful call under the latency target raises the limit by
+    ``increase / limit`` (about ``increase`` per window of calls); a throttle,
+    error or slow call multiplies it by ``decrease_factor``, at most once per
+    window so a burst of failures from one window only counts once. Callers
+    above the limit wait in FIFO order, from threads or coroutines.
+    """
+    
+    def __init__(
+        self,
+        initial_limit: float = 4,
+        min_limit: float = 1,
+        max_limit: float = 64,
+        increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        latency_target: Optional[float] = None,
+        clock=time.monotonic,
+    ):
+        """
+        Initialize the limiter.
+        
+        Args:
+            initial_limit: Starting concurrency limit
+            min_limit: Lowest the limit may fall
+            max_limit: Highest the limit may rise
+            increase: Additive increase per window of successful calls
+            decrease_factor: Multiplier applied on throttling, errors or slow calls
+            latency_target: Calls slower than this many seconds count as congestion
+            clock: Monotonic clock, injectable for tests
+        """
+        self.limit = float(initial_limit)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_target = latency_target
+        self.clock = clock
+        self.in_flight = 0
+        self._last_decrease = float("-inf")
+        self._waiters: Deque[Any] = deque()
+        self._lock = threading.Lock()
+    
+    @property
+    def queued(self) -> int:
+        """Number of callers waiting for a slot."""
+        return len(self._waiters)
+    
+    def acquire(self, timeout: Optional[float] = None) -> float:
+        """
+        Wait for a slot.
+        
+        Args:
+            timeout: Maximum seconds to wait, or None to wait indefinitely
+            
+        Returns:
+            Monotonic time the slot was granted (pass it to ``release``)
+        """
+        with self._lock:
+            if not self._waiters and self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return self.clock()
+            granted = threading.Event()
+            self._waiters.append(granted)
+        
+        if not granted.wait(timeout):
+            with self._lock:
+                if granted in self._waiters:
+                    self._waiters.remove(granted)
+                    raise TimeoutError("Timed out waiting for a vendor slot")
+        return self.clock()
+    
+    async def aacquire(self) -> float:
+        """
+        Wait for a slot without blocking the event loop.
+        
+        Returns:
+            Monotonic time the slot was granted (pass it to ``release``)
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if not self._waiters and self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return self.clock()
+            granted = loop.create_future()
+            self._waiters.append(granted)
+        
+        try:
+            await granted
+        except asyncio.CancelledError:
+            with self._lock:
+                if granted in self._waiters:
+                    self._waiters.remove(granted)
+                    raise
+            if not granted.cancelled():
+                # The slot was handed over just as we were cancelled; give it back.
+                # (If the future itself was cancelled, ``_grant`` returns the slot.)
+                self._release_slot()
+            raise
+        return self.clock()
+    
+    def release(self, started: float, ok: bool = True, throttled: bool = False):
+        """
+        Give back a slot and adapt the limit to how the call went.
+        
+        Args:
+            started: Value returned by ``acquire``
+            ok: Whether the call succeeded
+            throttled: Whether the vendor throttled the call
+        """
+        now = self.clock()
+        latency = now - started
+        congested = throttled or not ok or (
+            self.latency_target is not None and latency > self.latency_target
+        )
+        with self._lock:
+            if congested:
+                # Only calls started after the last decrease can trigger another
+                if started >= self._last_decrease:
+                    self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                    self._last_decrease = now
+            else:
+                self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+        self._release_slot()
+    
+    def _release_slot(self):
+        """Free one slot and hand free slots to waiters in FIFO order."""
+        with self._lock:
+            self.in_flight -= 1
+            while self._waiters and self.in_flight < int(self.limit):
+                waiter = self._waiters.popleft()
+                self.in_flight += 1
+                if isinstance(waiter, threading.Event):
+                    waiter.set()
+                else:
+                    waiter.get_loop().call_soon_threadsafe(_grant, waiter, self)
+
+
+def _grant(future: asyncio.Future, limiter: AIMDLimiter):
+    """Resolve an async waiter on its own loop, returning the slot if it was cancelled."""
+    if future.cancelled():
+        limiter._release_slot()
+    else:
+        future.set_result(None)
+
+
+class VendorRateLimiter:
+    """
+    Rate limit and adaptive concurrency limit for one vendor, with metrics.
+    
+    Use ``slot()`` (or ``aslot()``) around each upstream call: it waits for a
+    token and a concurrency slot, then classifies the outcome so the limit
+    adapts. Throttles that carry ``Retry-After`` pause the token bucket.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        concurrency: Optional[AIMDLimiter] = None,
+        clock=time.monotonic,
+    ):
+        """
+        Initialize the vendor limiter.
+        
+        Args:
+            name: Vendor name used in metrics
+            rate: Requests per second allowed, or None for no rate limit
+            burst: Token bucket capacity
+            concurrency: Adaptive concurrency limiter (a default AIMDLimiter if None)
+            clock: Monotonic clock, injectable for tests
+        """
+        self.name = name
+        self.clock = clock
+        self.bucket = TokenBucket(rate, burst, clock=clock) if rate else None
+        self.concurrency = concurrency or AIMDLimiter(clock=clock)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+    
+    @contextmanager
+    def slot(self):
+        """Hold a rate-limited, concurrency-limited slot for one upstream call."""
+        queued_at = self.clock()
+        delay = self.bucket.reserve() if self.bucket else 0.0
+        if delay > 0:
+            time.sleep(delay)
+        started = self.concurrency.acquire()
+        self._record_wait(started - queued_at)
+        try:
+            yield
+        except BaseException as e:
+            self._finish(started, e)
+            raise
+        self._finish(started, None)
+    
+    @asynccontextmanager
+    async def aslot(self):
+        """Async version of ``slot``."""
+        queued_at = self.clock()
+        delay = self.bucket.reserve() if self.bucket else 0.0
+        if delay > 0:
+            await asyncio.sleep(delay)
+        started = await self.concurrency.aacquire()
+        self._record_wait(started - queued_at)
+        try:
+            yield
+        except BaseException as e:
+            self._finish(started, e)
+            raise
+        self._finish(started, None)
+    
+    def _record_wait(self, waited: float):
+        """Count a request and the time it spent queued."""
+        with self._lock:
+            self.requests += 1
+            self.queue_wait_total += waited
+            self.queue_wait_max = max(self.queue_wait_max, waited)
+    
+    def _finish(self, started: float, error: Optional[BaseException]):
+        """Classify the call's outcome and release its slot."""
+        throttled = error is not None and is_throttle_error(error)
+        # Only vendor failures shrink the limit; cancellation on our side and
+        # errors for requests the vendor answered say nothing about its load
+        failed = error is not None and not throttled and is_vendor_failure(error)
+        ours = isinstance(error, (asyncio.CancelledError, GeneratorExit))
+        if throttled:
+            retry_after = retry_after_seconds(error)
+            if retry_after and self.bucket:
+                self.bucket.pause(retry_after)
+        with self._lock:
+            if throttled:
+                self.throttled += 1
+            elif error is not None and not ours:
+                self.errors += 1
+        self.concurrency.release(started, ok=not failed, throttled=throttled)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get limiter metrics.
+        
+        Returns:
+            Dictionary with request, throttle and error counts, queue wait
+            totals, and the current concurrency limit, in-flight and queued calls
+        """
+        with self._lock:
+            requests = self.requests
+            return {
+                "vendor": self.name,
+                "requests": requests,
+                "throttled": self.throttled,
+                "errors": self.errors,
+                "queue_wait_total": round(self.queue_wait_total, 6),
+                "queue_wait_avg": round(self.queue_wait_total / requests, 6) if requests else 0.0,
+                "queue_wait_max": round(self.queue_wait_max, 6),
+                "concurrency_limit": round(self.concurrency.limit, 3),
+                "in_flight": self.concurrency.in_flight,
+                "queued": self.concurrency.queued,
+                "rate": self.bucket.rate if self.bucket else None,
+            }
+
+
+class RateLimiterRegistry:
+    """Lazily created ``VendorRateLimiter`` per vendor, with shared defaults."""
+    
+    def __init__(
+        self,
+        rates: Optional[Dict[str, float]] = None,
+        default_rate: Optional[float] = None,
+        **limiter_kwargs,
+    ):
+        """
+        Initialize the registry.
+        
+        Args:
+            rates: Requests per second per vendor name
+            default_rate: Rate for vendors not in ``rates`` (None for no rate limit)
+            **limiter_kwargs: Passed to each ``AIMDLimiter``
+        """
+        self.rates = rates or {}
+        self.default_rate = default_rate
+        self.limiter_kwargs = limiter_kwargs
+        self._limiters: Dict[str, VendorRateLimiter] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, name: str) -> VendorRateLimiter:
+        """
+        Get the limiter for a vendor, creating it on first use.
+        
+        Args:
+            name: Vendor name (e.g. ``Vendor.value``)
+            
+        Returns:
+            The vendor's limiter
+        """
+        with self._lock:
+            limiter = self._limiters.get(name)
+            if limiter is None:
+                limiter = self._limiters[name] = VendorRateLimiter(
+                    name,
+                    rate=self.rates.get(name, self.default_rate),
+                    concurrency=AIMDLimiter(**self.limiter_kwargs),
+                )
+            return limiter
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get metrics for every vendor seen so far.
+        
+        Returns:
+            Mapping of vendor name to ``VendorRateLimiter.stats()``
+        """
+        with self._lock:
+            limiters = list(self._limiters.values())
+        return {limiter.name: limiter.stats() for limiter in limiters}
@@ -0,0 +1,421 @@
+"""
+Shared HTTP transport for vendor integrations.
+
+Every vendor host gets one long-lived, keep-alive connection pool (HTTP/2 when
+the optional ``h2`` package is installed), a cap on concurrent requests, and a
+request signer whose derived key is computed once per credential set.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import threading
+import time
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+import httpx
+from agent.schemas import Vendor
+from integrations.ratelimit import VendorRateLimiter
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on installed extras
+    HTTP2_AVAILABLE = False
+
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE = 10
+DEFAULT_KEEPALIVE_EXPIRY = 60.0
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+@lru_cache(maxsize=64)
+def _derive_signing_key(secret: str, scope: str) -> bytes:
+    """Derive the signing key for a credential and scope (cached)."""
+    key = secret.encode()
+    for part in scope.split("/"):
+        key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+    return key
+
+
+class RequestSigner:
+    """
+    HMAC-SHA256 request signer.
+    
+    Like AWS SigV4, the secret is first hashed down to a key scoped to the day
+    and service. That derivation is cached per credential set, so signing a
+    request is a single HMAC over its canonical form.
+    """
+    
+    def __init__(self, access_key: str, secret_key: str, service: str, clock=time.time):
+        """
+        Initialize the signer.
+        
+        Args:
+            access_key: Public key identifying the credential
+            secret_key: Secret used to derive signing keys
+            service: Service name included in the signing scope
+            clock: Wall clock returning seconds since the epoch (for tests)
+        """
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.service = service
+        self.clock = clock
+    
+    def signing_key(self, date: str) -> bytes:
+        """
+        Get the derived signing key for a day.
+        
+        Args:
+            date: Day in YYYYMMDD form
+            
+        Returns:
+            Derived key bytes
+        """
+        return _derive_signing_key(self.secret_key, f"{date}/{self.service}/request")
+    
+    @staticmethod
+    def canonical_request(
+        method: str, path: str, params: Dict[str, Any], body: bytes, timestamp: str
+    ) -> str:
+        """
+        Build the canonical form of a request that gets signed.
+        
+        Args:
+            method: HTTP method
+            path: URL path
+            params: Query parameters
+            body: Request body bytes
+            timestamp: Request timestamp (YYYYMMDDTHHMMSSZ)
+            
+        Returns:
+            Canonical request string
+        """
+        query = urlencode(sorted((str(k), str(v)) for k, v in params.items()))
+        return "\n".join([
+            method.upper(), path, query, timestamp, hashlib.sha256(body).hexdigest()
+        ])
+    
+    def sign(
+        self, method: str, path: str, params: Optional[Dict[str, Any]] = None, body: bytes = b""
+    ) -> Dict[str, str]:
+        """
+        Sign a request.
+        
+        Args:
+            method: HTTP method
+            path: URL path
+            params: Query parameters
+            body: Request body bytes
+            
+        Returns:
+            Headers to send with the request
+        """
+        timestamp = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime(self.clock()))
+        canonical = self.canonical_request(method, path, params or {}, body, timestamp)
+        signature = hmac.new(
+            self.signing_key(timestamp[:8]), canonical.encode(), hashlib.sha256
+        ).hexdigest()
+        return {
+            "X-Api-Key": self.access_key,
+            "X-Timestamp": timestamp,
+            "X-Signature": signature,
+        }
+
+
+class VendorTransport:
+    """
+    Connection-pooled HTTP client for one vendor host.
+    
+    Sync and async clients are created lazily and reused for the life of the
+    transport, so connections (and their TLS sessions) are kept alive across
+    searches. At most ``max_concurrency`` requests are in flight at once;
+    further callers wait for a slot.
+    """
+    
+    def __init__(
+        self,
+        vendor: Vendor,
+        base_url: str,
+        signer: Optional[RequestSigner] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive: int = DEFAULT_MAX_KEEPALIVE,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+        timeout: float = DEFAULT_TIMEOUT,
+        http2: Optional[bool] = None,
+        transport: Optional[httpx.BaseTransport] = None,
+        limiter: Optional[VendorRateLimiter] = None,
+    ):
+        """
+        Initialize the vendor transport.
+        
+        Args:
+            vendor: Vendor this transport talks to
+            base_url: Vendor API base URL
+            signer: Optional signer applied to every request
+            max_concurrency: Maximum requests in flight at once
+            max_connections: Maximum pooled connections
+            max_keepalive: Maximum idle keep-alive connections
+            keepalive_expiry: Seconds an idle connection is kept
+            timeout: Request timeout in seconds
+            http2: Use HTTP/2; defaults to whether ``h2`` is installed
+            transport: Optional httpx transport for the sync client (for tests)
+            limiter: Optional rate limiter; requests queue for it and 429s feed it
+        """
+        self.vendor = vendor
+        self.base_url = base_url.rstrip("/")
+        self.signer = signer
+        self.max_concurrency = max_concurrency
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = timeout
+        self.http2 = HTTP2_AVAILABLE if http2 is None else http2
+        self._transport = transport
+        self.limiter = limiter
+        self._client: Optional[httpx.Client] = None
+        self._aclient: Optional[httpx.AsyncClient] = None
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._aslots: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+    
+    @property
+    def client(self) -> httpx.Client:
+        """Pooled sync client, created on first use."""
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    base_url=self.base_url,
+                    http2=self.http2,
+                    limits=self.limits,
+                    timeout=self.timeout,
+                    transport=self._transport,
+                )
+            return self._client
+    
+    @property
+    def aclient(self) -> httpx.AsyncClient:
+        """Pooled async client, created on first use and bound to that event loop."""
+        with self._lock:
+            if self._aclient is None:
+                self._aclient = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    http2=self.http2,
+                    limits=self.limits,
+                    timeout=self.timeout,
+                )
+                self._aslots = asyncio.Semaphore(self.max_concurrency)
+            return self._aclient
+    
+    def _sign(self, request: httpx.Request, signer: Optional[RequestSigner]):
+        """Add signature headers for exactly what will be sent."""
+        signer = signer or self.signer
+        if signer:
+            request.headers.update(signer.sign(
+                request.method, request.url.path, dict(request.url.params), request.content
+            ))
+    
+    def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Any = None,
+        signer: Optional[RequestSigner] = None,
+    ) -> httpx.Response:
+        """
+        Send a request through the pooled sync client.
+        
+        Args:
+            method: HTTP method
+            path: Path relative to the base URL
+            params: Query parameters
+            json: JSON body
+            signer: Signer for this request, overriding the transport's own
+            
+        Returns:
+            The response; raises ``httpx.HTTPStatusError`` on 4xx/5xx
+        """
+        client = self.client
+        request = client.build_request(method, path, params=params, json=json)
+        with self.limiter.slot() if self.limiter else nullcontext():
+            # Sign after any rate-limit wait so the timestamp is fresh
+            self._sign(request, signer)
+            with self._slots:
+                self._track(1)
+                try:
+                    response = client.send(request)
+                finally:
+                    self._track(-1)
+            response.raise_for_status()
+        return response
+    
+    async def arequest(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Any = None,
+        signer: Optional[RequestSigner] = None,
+    ) -> httpx.Response:
+        """
+        Send a request through the pooled async client.
+        
+        Args:
+            method: HTTP method
+            path: Path relative to the base URL
+            params: Query parameters
+            json: JSON body
+            signer: Signer for this request, overriding the transport's own
+            
+        Returns:
+            The response; raises ``httpx.HTTPStatusError`` on 4xx/5xx
+        """
+        client = self.aclient
+        request = client.build_request(method, path, params=params, json=json)
+        async with self.limiter.aslot() if self.limiter else nullcontext():
+            self._sign(request, signer)
+            async with self._aslots:
+                self._track(1)
+                try:
+                    response = await client.send(request)
+                finally:
+                    self._track(-1)
+            response.raise_for_status()
+        return response
+    
+    def get_json(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        signer: Optional[RequestSigner] = None,
+    ) -> Any:
+        """
+        GET a path and decode the JSON response.
+        
+        Args:
+            path: Path relative to the base URL
+            params: Query parameters
+            signer: Signer for this request, overriding the transport's own
+            
+        Returns:
+            Decoded JSON
+        """
+        return self.request("GET", path, params=params, signer=signer).json()
+    
+    async def aget_json(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        signer: Optional[RequestSigner] = None,
+    ) -> Any:
+        """
+        GET a path asynchronously and decode the JSON response.
+        
+        Args:
+            path: Path relative to the base URL
+            params: Query parameters
+            signer: Signer for this request, overriding the transport's own
+            
+        Returns:
+            Decoded JSON
+        """
+        response = await self.arequest("GET", path, params=params, signer=signer)
+        return response.json()
+    
+    def _track(self, delta: int):
+        """Update request counters."""
+        with self._lock:
+            self.in_flight += delta
+            if delta > 0:
+                self.requests += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get transport counters.
+        
+        Returns:
+            Dictionary with vendor, requests, in_flight and http2
+        """
+        with self._lock:
+            return {
+                "vendor": self.vendor.value,
+                "requests": self.requests,
+                "in_flight": self.in_flight,
+                "http2": self.http2,
+            }
+    
+    def close(self):
+        """Close the sync client's connections."""
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
+    
+    async def aclose(self):
+        """Close both clients' connections."""
+        with self._lock:
+            aclient, self._aclient = self._aclient, None
+        if aclient is not None:
+            await aclient.aclose()
+        self.close()
+
+
+_transports: Dict[Tuple[Vendor, str], VendorTransport] = {}
+_transports_lock = threading.Lock()
+
+
+def get_transport(vendor: Vendor, base_url: str, **kwargs) -> VendorTransport:
+    """
+    Get the shared transport for a vendor host, creating it on first use.
+    
+    All integrations for the same vendor and base URL share one connection pool
+    and concurrency cap. Keyword arguments only apply when the transport is
+    created.
+    
+    Args:
+        vendor: Vendor type
+        base_url: Vendor API base URL
+        **kwargs: Passed to ``VendorTransport``
+        
+    Returns:
+        The shared VendorTransport
+    """
+    key = (vendor, base_url.rstrip("/"))
+    with _transports_lock:
+        transport = _transports.get(key)
+        if transport is None:
+            transport = _transports[key] = VendorTransport(vendor, base_url, **kwargs)
+        return transport
+
+
+def close_transports():
+    """
+    Close and forget every shared transport's sync client, for code without an
+    event loop; use ``aclose_transports`` where async clients may be open.
+    """
+    with _transports_lock:
+        transports = list(_transports.values())
+        _transports.clear()
+    for transport in transports:
+        transport.close()
+
+
+async def aclose_transports():
+    """
+    Close and forget every shared transport, sync and async clients alike (e.g.
+    at shutdown). Call it on the event loop the async clients were used on.
+    """
+    with _transports_lock:
+        transports = list(_transports.values())
+        _transports.clear()
+    for transport in transports:
+        await transport.aclose()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic product catalog and benchmark LocalCatalogVendor searches.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agent.schemas import Product, Vendor
+from integrations.local_catalog import LocalCatalogVendor
+
+ITEMS = [
+    "pens", "pencils", "markers", "highlighters", "copy paper", "notebooks", "sticky notes",
+    "stapler", "staples", "paper clips", "binder clips", "folders", "binders", "envelopes",
+    "scissors", "tape", "toner", "ink cartridge", "desk organizer", "whiteboard",
+]
+ADJECTIVES = ["premium", "economy", "heavy duty", "recycled", "colored", "black", "blue"]
+BRANDS = ["Acme", "OfficePro", "Paperline", "Inkwell", "Deskmate"]
+PACKS = ["Single", "Pack of 6", "Pack of 12", "Box of 24", "Case of 100"]
+
+
+def generate_products(count: int, seed: int = 0) -> list[Product]:
+    """Build a reproducible synthetic catalog."""
+    rng = random.Random(seed)
+    products = []
+    for i in range(count):
+        item = rng.choice(ITEMS)
+        brand = rng.choice(BRANDS)
+        products.append(Product(
+            id=f"sku-{i}",
+            name=f"{brand} {rng.choice(ADJECTIVES).title()} {item.title()} - {rng.choice(PACKS)}",
+            description=f"{rng.choice(ADJECTIVES)} {item} from {brand}",
+            price=round(rng.uniform(0.5, 150.0), 2),
+            vendor=Vendor.MOCK,
+            rating=round(rng.uniform(1.0, 5.0), 1),
+            review_count=rng.randint(0, 5000),
+            in_stock=rng.random() > 0.1,
+            category="Office Supplies",
+            brand=brand,
+        ))
+    return products
+
+
+def write_catalog(products: list[Product], path: Path):
+    """Write products as JSON Lines for LocalCatalogVendor.from_file."""
+    with path.open("w") as f:
+        for product in products:
+            f.write(json.dumps(product.model_dump(mode="json")) + "\n")
+
+
+def run_benchmark(size: int, rounds: int, output: Path | None):
+    """Build the catalog, then time repeated searches."""
+    products = generate_products(size)
+    if output:
+        write_catalog(products, output)
+        print(f"Wrote {size} products to {output}")
+    
+    started = time.perf_counter()
+    vendor = LocalCatalogVendor(products)
+    print(f"Indexed {size} products in {time.perf_counter() - started:.2f}s")
+    
+    queries = ["pens", "copy paper", "heavy duty stapler", "acme blue markers", "toner", "p"]
+    for query in queries:
+        vendor.search(query)  # warm the prefix cache once
+        started = time.perf_counter()
+        for _ in range(rounds):
+            results = vendor.search(query)
+        per_search = (time.perf_counter() - started) / rounds * 1000
+        print(f"{query!r:>24}: {per_search:.3f}ms per search ({len(results)} results)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--output", type=Path, help="Also write the catalog as JSON Lines")
+    args = parser.parse_args()
+    
+    run_benchmark(args.size, args.rounds, args.output)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark the loop optimizer against the vectorized NumPy optimizer.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agent.candidates import CandidateArrays
+from agent.optimizer import PriceOptimizer
+from agent.schemas import Product, SearchResult, Vendor
+
+
+def generate_results(items: int, per_vendor: int, seed: int = 0) -> list[SearchResult]:
+    """Build search results with ``per_vendor`` products from every vendor per item."""
+    rng = random.Random(seed)
+    results = []
+    for i in range(items):
+        products = [
+            Product(
+                id=f"{i}-{vendor.value}-{j}",
+                name=f"Item {i} option {j}",
+                price=round(rng.uniform(0.5, 50.0), 2),
+                vendor=vendor,
+                rating=rng.choice([None, round(rng.uniform(1, 5), 1)]),
+                in_stock=rng.random() > 0.1,
+            )
+            for vendor in Vendor
+            for j in range(per_vendor)
+        ]
+        results.append(
+            SearchResult(query=f"item {i}", products=products, total_found=len(products))
+        )
+    return results
+
+
+def best_of(fn, rounds: int) -> float:
+    """Best wall time in seconds over several rounds."""
+    times = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def run_benchmark(item_counts: list[int], per_vendor: int, rounds: int):
+    """Print a timing table and check both paths agree."""
+    loop = PriceOptimizer()
+    vectorized = PriceOptimizer(vectorized=True)
+    
+    print(f"{len(Vendor)} vendors x {per_vendor} results per item, best of {rounds}")
+    print("vectorized = pack + select; select = selection on already packed arrays")
+    print(
+        f"{'items':>6} {'candidates':>11} {'loop':>10} {'vectorized':>11} "
+        f"{'select':>10} {'select speedup':>15}"
+    )
+    
+    for items in item_counts:
+        results = generate_results(items, per_vendor)
+        expected = [p.id for p in loop.optimize(results).selected_products]
+        actual = [p.id for p in vectorized.optimize(results).selected_products]
+        assert actual == expected, "vectorized selection differs from loop selection"
+        
+        packed, products = CandidateArrays.from_search_results(results)
+        loop_time = best_of(lambda: loop.optimize(results), rounds)
+        vec_time = best_of(lambda: vectorized.optimize(results), rounds)
+        select_time = best_of(lambda: vectorized.optimize_packed(packed, products), rounds)
+        print(
+            f"{items:>6} {len(products):>11} {loop_time * 1000:>8.2f}ms "
+            f"{vec_time * 1000:>9.2f}ms {select_time * 1000:>8.2f}ms "
+            f"{loop_time / select_time:>14.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--per-vendor", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    
+    run_benchmark(args.items, args.per_vendor, args.rounds)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark offset against keyset (cursor) pagination of the customer listing.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from api.models import Base, Customer
+from api.services.customer_service import CustomerService
+
+
+def seed_customers(session_factory, count: int, chunk_size: int = 50_000):
+    """Insert ``count`` customers, several sharing each ``created_at``."""
+    started = datetime(2024, 1, 1)
+    db = session_factory()
+    try:
+        for start in range(0, count, chunk_size):
+            db.execute(insert(Customer.__table__), [
+                {
+                    "name": f"Customer {i}",
+                    "email": f"customer{i}@example.com",
+                    "created_at": started + timedelta(seconds=i // 4),
+                    "updated_at": started,
+                }
+                for i in range(start, min(start + chunk_size, count))
+            ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def best_of(fn, rounds: int) -> float:
+    """Best wall time in seconds over several rounds."""
+    times = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def run_benchmark(rows: int, depths: list[int], limit: int, rounds: int):
+    """Print page latency at increasing depths for both modes and check they agree."""
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{directory}/pagination.db")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        
+        started = time.perf_counter()
+        seed_customers(session_factory, rows)
+        print(f"seeded {rows} customers in {time.perf_counter() - started:.1f}s")
+        print(f"page size {limit}, best of {rounds}")
+        print(f"{'depth':>10} {'offset':>10} {'keyset':>10} {'speedup':>9}")
+        
+        db = session_factory()
+        try:
+            for depth in depths:
+                if depth >= rows:
+                    continue
+                # The cursor a client would hold after reading ``depth`` rows
+                after = None
+                if depth:
+                    last = CustomerService.list_customers(db, skip=depth - 1, limit=1)[0]
+                    after = (last.created_at, last.id)
+                
+                by_offset = CustomerService.list_customers(db, skip=depth, limit=limit)
+                by_cursor = CustomerService.list_customers(db, limit=limit, after=after)
+                assert [c.id for c in by_offset] == [c.id for c in by_cursor], (
+                    "keyset page differs from offset page"
+                )
+                db.expunge_all()
+                
+                offset_time = best_of(
+                    lambda: CustomerService.list_customers(db, skip=depth, limit=limit), rounds
+                )
+                keyset_time = best_of(
+                    lambda: CustomerService.list_customers(db, limit=limit, after=after), rounds
+                )
+                db.expunge_all()
+                print(
+                    f"{depth:>10} {offset_time * 1000:>8.2f}ms {keyset_time * 1000:>8.2f}ms "
+                    f"{offset_time / keyset_time:>8.1f}x"
+                )
+        finally:
+            db.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument(
+        "--depths", type=int, nargs="+", default=[0, 1_000, 10_000, 100_000, 500_000, 999_000]
+    )
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    
+    run_benchmark(args.rows, args.depths, args.limit, args.rounds)
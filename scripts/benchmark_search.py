@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark sequential vs bounded-concurrency multi-query search.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agent.schemas import SearchQuery
+from agent.search import ProductSearcher
+from integrations.mock_vendor import MockVendor
+
+
+class LatencyVendor(MockVendor):
+    """Mock vendor that simulates a fixed network round trip per search."""
+    
+    def __init__(self, name: str, latency: float):
+        super().__init__()
+        self.name = name
+        self.latency = latency
+    
+    def get_name(self) -> str:
+        return self.name
+    
+    def search(self, query: str, max_results: int = 10):
+        time.sleep(self.latency)
+        return super().search(query, max_results=max_results)
+
+
+def time_search(searcher: ProductSearcher, queries: list[SearchQuery]) -> float:
+    """Return wall time in seconds for one search_multiple call."""
+    started = time.perf_counter()
+    searcher.search_multiple(queries)
+    return time.perf_counter() - started
+
+
+def run_benchmark(item_counts: list[int], vendor_count: int, latency: float, max_in_flight: int):
+    """Print a wall-time table for each item count."""
+    vendors = [LatencyVendor(f"vendor-{i}", latency) for i in range(vendor_count)]
+    sequential = ProductSearcher(vendors, concurrent=False)
+    concurrent = ProductSearcher(vendors, max_in_flight=max_in_flight)
+    catalog = ["pens", "paper", "stapler"]
+    
+    print(f"{vendor_count} vendors, {latency * 1000:.0f}ms per call, max_in_flight={max_in_flight}")
+    print(f"{'items':>6} {'sequential':>12} {'concurrent':>12} {'speedup':>8}")
+    
+    for count in item_counts:
+        queries = [SearchQuery(query=catalog[i % len(catalog)]) for i in range(count)]
+        seq_time = time_search(sequential, queries)
+        con_time = time_search(concurrent, queries)
+        print(f"{count:>6} {seq_time:>11.3f}s {con_time:>11.3f}s {seq_time / con_time:>7.1f}x")
+    
+    concurrent.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--vendors", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.01, help="Seconds per vendor call")
+    parser.add_argument("--max-in-flight", type=int, default=32)
+    args = parser.parse_args()
+    
+    run_benchmark(args.items, args.vendors, args.latency, args.max_in_flight)
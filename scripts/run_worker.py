@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Procurement worker: runs orders queued with PROCUREMENT_QUEUE=database.
+
+Start as many as needed, on any host that can reach the database; each
+process claims jobs with renewable leases, so a crashed worker's jobs are
+picked up by the others once their leases expire.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import signal
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.config import settings
+from api.database import Base, SessionLocal, engine
+from api.services.job_service import JobWorker
+from api.services.procurement_service import ProcurementService
+from integrations.transport import aclose_transports
+
+
+async def run_worker(concurrency: int):
+    """Run one worker until SIGINT/SIGTERM, then finish its running jobs."""
+    Base.metadata.create_all(bind=engine)
+    service = ProcurementService()
+    worker = JobWorker(
+        service.process_procurement_job,
+        SessionLocal,
+        concurrency=concurrency,
+        lease_seconds=settings.job_lease_seconds,
+        heartbeat_seconds=settings.job_heartbeat_seconds,
+        poll_seconds=settings.job_poll_seconds,
+        max_attempts=settings.job_max_attempts,
+    )
+    
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    
+    print(f"Worker {worker.worker_id} running up to {worker.concurrency} orders at once")
+    await worker.run(stop)
+    if service.optimizer.pool is not None:
+        service.optimizer.pool.shutdown()
+    await aclose_transports()
+    print(
+        f"Worker {worker.worker_id} stopped: {worker.completed} completed, "
+        f"{worker.failed} failed, {worker.lost} lost"
+    )
+
+
+def main(concurrency: int):
+    """Process entry point."""
+    asyncio.run(run_worker(concurrency))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes to start")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.job_worker_concurrency,
+        help="Orders each process runs at once",
+    )
+    args = parser.parse_args()
+    
+    if args.processes <= 1:
+        main(args.concurrency)
+    else:
+        processes = [
+            multiprocessing.Process(target=main, args=(args.concurrency,))
+            for _ in range(args.processes)
+        ]
+        for process in processes:
+            process.start()
+        # Ctrl-C reaches every process; the workers drain and exit on their own
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        for process in processes:
+            process.join()
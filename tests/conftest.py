@@ -0,0 +1,11 @@
+"""
+Shared test configuration.
+"""
+
+import os
+import tempfile
+
+# Point the API at a throwaway database before any api module reads settings
+_db_dir = tempfile.mkdtemp(prefix="office-agent-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_db_dir, 'test.db')}")
+os.environ.setdefault("PRICE_HISTORY_DIR", os.path.join(_db_dir, "price_history"))
@@ -0,0 +1,238 @@
+"""
+Tests for budget-constrained basket optimization.
+"""
+
+import itertools
+import random
+import time
+from agent.basket import BasketOptimizer
+from agent.optimizer import PriceOptimizer
+from agent.purchaser import Purchaser
+from agent.schemas import ProcurementRequest, Product, SearchResult, Vendor
+from policies import ApprovalPolicy, BudgetPolicy, PreferencesPolicy
+from workflows.procure_office_essentials import (
+    procure_office_essentials,
+    procure_office_essentials_async,
+)
+
+
+def make_product(product_id: str, price: float, rating=None, in_stock=True, vendor=Vendor.MOCK,
+                 brand=None):
+    """Build a minimal product."""
+    return Product(
+        id=product_id,
+        name=f"Product {product_id}",
+        price=price,
+        rating=rating,
+        in_stock=in_stock,
+        vendor=vendor,
+        brand=brand,
+    )
+
+
+def make_result(query: str, products: list) -> SearchResult:
+    """Wrap products in a search result."""
+    return SearchResult(query=query, products=products, total_found=len(products))
+
+
+def random_results(seed: int, items: int, per_item: int) -> list[SearchResult]:
+    """Random search results with varied prices and ratings."""
+    rng = random.Random(seed)
+    return [
+        make_result(f"item {i}", [
+            make_product(
+                f"{i}-{j}",
+                price=round(rng.uniform(1, 30), 2),
+                rating=round(rng.uniform(1, 5), 1),
+                in_stock=rng.random() > 0.2,
+            )
+            for j in range(per_item)
+        ])
+        for i in range(items)
+    ]
+
+
+def test_upgrades_when_budget_allows():
+    """Spare budget buys better-rated products; the cheapest basket is only the floor."""
+    results = [
+        make_result("pens", [
+            make_product("cheap-pen", 2.0, 2.0),
+            make_product("good-pen", 5.0, 5.0),
+        ]),
+        make_result("paper", [
+            make_product("cheap-paper", 4.0, 2.0),
+            make_product("good-paper", 9.0, 5.0),
+        ]),
+    ]
+    optimizer = BasketOptimizer()
+    
+    assert [p.id for p in optimizer.optimize(results, 6.0).selected_products] == [
+        "cheap-pen", "cheap-paper"
+    ]
+    assert [p.id for p in optimizer.optimize(results, 9.0).selected_products] == [
+        "good-pen", "cheap-paper"
+    ]
+    result = optimizer.optimize(results, 14.0)
+    assert [p.id for p in result.selected_products] == ["good-pen", "good-paper"]
+    assert result.total_cost == 14.0
+    assert result.alternatives_considered == 4
+
+
+def test_over_budget_returns_cheapest_basket():
+    """If nothing fits, the cheapest basket is returned so the purchaser can report it."""
+    results = [make_result("toner", [make_product("a", 80.0, 5.0), make_product("b", 60.0, 1.0)])]
+    
+    result = BasketOptimizer().optimize(results, 50.0)
+    
+    assert [p.id for p in result.selected_products] == ["b"]
+
+
+def test_no_budget_picks_best_score_and_skips_empty_results():
+    """Without a budget each item gets its best-scoring product; empty results are skipped."""
+    results = [
+        make_result("pens", [make_product("a", 1.0, 3.0), make_product("b", 3.0, 5.0)]),
+        make_result("nothing", []),
+    ]
+    
+    result = BasketOptimizer().optimize(results, None)
+    
+    assert [p.id for p in result.selected_products] == ["b"]
+
+
+def test_spare_budget_is_not_spent_on_marginal_upgrades():
+    """A slightly better rating does not justify a much higher price, even under the cap."""
+    results = [
+        make_result("pens", [
+            make_product("luxury-pen", 400.0, 5.0),
+            make_product("pen", 1.0, 4.8),
+        ]),
+        make_result("paper", [
+            make_product("paper", 5.0, 4.5),
+            make_product("same-paper", 7.0, 4.5),
+        ]),
+    ]
+    optimizer = BasketOptimizer()
+    
+    result = optimizer.optimize(results, 500.0)
+    assert [p.id for p in result.selected_products] == ["pen", "paper"]
+    assert result.total_cost == 6.0
+    assert [p.id for p in optimizer.optimize(results, None).selected_products] == ["pen", "paper"]
+
+
+def test_preferences_score_and_exclude():
+    """Preferred vendors and brands score higher; excluded ones are avoided when possible."""
+    preferences = PreferencesPolicy(
+        preferred_vendors=[Vendor.STAPLES],
+        preferred_brands=["Acme"],
+        excluded_vendors=[Vendor.COSTCO],
+    )
+    results = [
+        make_result("pens", [
+            make_product("plain", 3.0, 4.0),
+            make_product("staples", 3.5, 4.0, vendor=Vendor.STAPLES),
+        ]),
+        make_result("paper", [
+            make_product("costco", 1.0, 5.0, vendor=Vendor.COSTCO),
+            make_product("acme", 6.0, 4.0, brand="acme"),
+        ]),
+        make_result("only-costco", [make_product("forced", 2.0, vendor=Vendor.COSTCO)]),
+    ]
+    
+    result = BasketOptimizer(preferences=preferences).optimize(results, 100.0)
+    
+    assert [p.id for p in result.selected_products] == ["staples", "acme", "forced"]
+
+
+def test_matches_exhaustive_search_on_small_baskets():
+    """On small random baskets the solver stays in budget and lands near the optimum."""
+    optimizer = BasketOptimizer(time_limit=1.0)
+    for seed in range(25):
+        results = random_results(seed, items=4, per_item=4)
+        cheapest = sum(min(p.price for p in r.products) for r in results)
+        budget = cheapest * random.Random(seed).uniform(1.0, 2.0)
+        
+        best = max(
+            sum(optimizer.score(p) for p in combo)
+            for combo in itertools.product(*(r.products for r in results))
+            if sum(p.price for p in combo) <= budget
+        )
+        result = optimizer.optimize(results, budget)
+        
+        assert result.total_cost <= budget
+        score = sum(optimizer.score(p) for p in result.selected_products)
+        # Greedy plus local search is a heuristic; it should land very close to optimal.
+        # Price penalties can make scores negative, so the margin is on the magnitude
+        assert score >= best - abs(best) * 0.02
+
+
+def test_large_basket_stays_fast_and_within_budget():
+    """Hundreds of line items solve well within the time limit plus the greedy pass."""
+    results = random_results(0, items=500, per_item=50)
+    cheapest = sum(min(p.price for p in r.products) for r in results)
+    
+    started = time.perf_counter()
+    result = BasketOptimizer(time_limit=0.2).optimize(results, cheapest * 1.5)
+    elapsed = time.perf_counter() - started
+    
+    assert len(result.selected_products) == 500
+    assert result.total_cost <= cheapest * 1.5
+    assert elapsed < 2.0
+
+
+def test_price_optimizer_optimize_basket():
+    """PriceOptimizer exposes the basket solver."""
+    results = [make_result("pens", [make_product("a", 1.0, 1.0), make_product("b", 2.0, 5.0)])]
+    
+    result = PriceOptimizer().optimize_basket(results, 1.5)
+    
+    assert [p.id for p in result.selected_products] == ["a"]
+
+
+def test_spending_limit_combines_budget_and_approval():
+    """The spending limit is the tighter of remaining budget and approval threshold."""
+    budget = BudgetPolicy(budget_limit=100.0)
+    budget.record_purchase(30.0)
+    
+    assert Purchaser().get_spending_limit() is None
+    assert Purchaser(budget_policy=budget).get_spending_limit() == 70.0
+    assert Purchaser(
+        budget_policy=budget, approval_policy=ApprovalPolicy(approval_threshold=50.0)
+    ).get_spending_limit() == 50.0
+    assert Purchaser(
+        budget_policy=budget,
+        approval_policy=ApprovalPolicy(approval_threshold=50.0, auto_approve=True),
+    ).get_spending_limit() == 70.0
+
+
+class StubSearcher:
+    """Searcher returning fixed results."""
+    
+    def __init__(self, results):
+        self.results = results
+    
+    def search_multiple(self, queries):
+        return self.results
+    
+    async def asearch_multiple(self, queries):
+        return self.results
+
+
+async def test_workflows_use_the_basket_only_with_a_budget():
+    """Test that default orders, capped only by approval, buy the cheapest product per item."""
+    searcher = StubSearcher([make_result("pens", [
+        make_product("cheap-pen", 2.0, 2.0),
+        make_product("good-pen", 5.0, 5.0),
+    ])])
+    request = ProcurementRequest(items=["pens"])
+    
+    def bought(result):
+        return [p.id for p in result.products_purchased]
+    
+    for budget, expected in [(None, ["cheap-pen"]), (100.0, ["good-pen"])]:
+        policies = {
+            "budget_policy": BudgetPolicy(budget_limit=budget),
+            "approval_policy": ApprovalPolicy(approval_threshold=500),
+            "searcher": searcher,
+        }
+        assert bought(procure_office_essentials(request, [], **policies)) == expected
+        assert bought(await procure_office_essentials_async(request, [], **policies)) == expected
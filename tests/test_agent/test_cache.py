@@ -0,0 +1,104 @@
+"""
+Tests for search result caching.
+"""
+
+from agent.cache import SearchCache, normalize_query
+from agent.schemas import SearchQuery, Vendor
+from agent.search import ProductSearcher
+from integrations.mock_vendor import MockVendor
+
+
+class FakeClock:
+    """Manually advanced clock."""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingMockVendor(MockVendor):
+    """Mock vendor that counts search calls."""
+    
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+    
+    def search(self, query: str, max_results: int = 10):
+        self.calls += 1
+        return super().search(query, max_results=max_results)
+
+
+def test_normalize_query():
+    """Test that case and whitespace differences share a key."""
+    assert normalize_query("  Copy   PAPER ") == "copy paper"
+
+
+def test_cache_hit_and_ttl_expiry():
+    """Test hits within the TTL and expiry afterwards."""
+    clock = FakeClock()
+    cache = SearchCache(default_ttl=10, vendor_ttls={Vendor.AMAZON: 60}, clock=clock)
+    products = MockVendor().search("pens")
+    cache.put(Vendor.MOCK, "pens", 10, products)
+    cache.put(Vendor.AMAZON, "pens", 10, products)
+    
+    assert cache.get(Vendor.MOCK, "Pens ", 10) == products
+    clock.now = 11
+    assert cache.get(Vendor.MOCK, "pens", 10) is None
+    assert cache.get(Vendor.AMAZON, "pens", 10) == products
+    
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["expirations"] == 1
+
+
+def test_cache_lru_eviction():
+    """Test that the least recently used entry is evicted when full."""
+    cache = SearchCache(max_entries=2)
+    cache.put(Vendor.MOCK, "pens", 10, [])
+    cache.put(Vendor.MOCK, "paper", 10, [])
+    cache.get(Vendor.MOCK, "pens", 10)
+    cache.put(Vendor.MOCK, "stapler", 10, [])
+    
+    assert cache.get(Vendor.MOCK, "paper", 10) is None
+    assert cache.get(Vendor.MOCK, "pens", 10) == []
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_invalidate_product():
+    """Test that a price change drops every search containing the product."""
+    cache = SearchCache()
+    vendor = MockVendor()
+    cache.put(Vendor.MOCK, "pens", 10, vendor.search("pens"))
+    cache.put(Vendor.MOCK, "office", 10, vendor.search("office"))
+    cache.put(Vendor.MOCK, "paper", 10, vendor.search("paper"))
+    
+    assert cache.invalidate_product(Vendor.MOCK, "mock-1") == 2
+    assert cache.get(Vendor.MOCK, "pens", 10) is None
+    assert cache.get(Vendor.MOCK, "paper", 10) is not None
+
+
+def test_searcher_uses_cache():
+    """Test that repeated searches skip the vendor round trip."""
+    vendor = CountingMockVendor()
+    searcher = ProductSearcher([vendor], cache=SearchCache())
+    
+    first = searcher.search(SearchQuery(query="pens"))
+    second = searcher.search(SearchQuery(query="PENS"))
+    
+    assert vendor.calls == 1
+    assert [p.id for p in first.products] == [p.id for p in second.products]
+
+
+async def test_async_searcher_uses_cache():
+    """Test that the async path shares the same cache."""
+    vendor = CountingMockVendor()
+    searcher = ProductSearcher([vendor], cache=SearchCache())
+    
+    searcher.search(SearchQuery(query="pens"))
+    result = await searcher.asearch(SearchQuery(query="pens"))
+    
+    assert vendor.calls == 1
+    assert result.total_found == 1
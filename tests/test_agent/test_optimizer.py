@@ -0,0 +1,241 @@
+"""
+Tests for price optimization.
+"""
+
+import random
+import pytest
+from agent.offload import OptimizationPool
+from agent.optimizer import PriceOptimizer
+from agent.schemas import Product, SearchResult, Vendor
+
+
+def make_product(product_id: str, price: float, rating=None, in_stock=True, vendor=Vendor.MOCK):
+    """Build a minimal product."""
+    return Product(
+        id=product_id,
+        name=f"Product {product_id}",
+        price=price,
+        rating=rating,
+        in_stock=in_stock,
+        vendor=vendor,
+    )
+
+
+def make_result(query: str, products: list) -> SearchResult:
+    """Wrap products in a search result."""
+    return SearchResult(query=query, products=products, total_found=len(products))
+
+
+def random_results(seed: int, count: int) -> list[SearchResult]:
+    """Random search results with plenty of price and rating ties."""
+    rng = random.Random(seed)
+    vendors = list(Vendor)
+    results = []
+    for i in range(count):
+        products = [
+            make_product(
+                f"{i}-{j}",
+                price=rng.choice([1.0, 2.5, 2.5, 4.99, 10.0]),
+                rating=rng.choice([None, 3.0, 4.5, 4.5]),
+                in_stock=rng.random() > 0.3,
+                vendor=rng.choice(vendors),
+            )
+            for j in range(rng.randint(0, 8))
+        ]
+        results.append(make_result(f"item {i}", products))
+    return results
+
+
+def test_optimize_prefers_in_stock_then_price_then_rating():
+    """Test the selection rules of the loop optimizer."""
+    result = make_result("pens", [
+        make_product("a", 1.0, in_stock=False),
+        make_product("b", 3.0, rating=4.0),
+        make_product("c", 3.0, rating=5.0),
+    ])
+    optimization = PriceOptimizer().optimize([result])
+    
+    assert [p.id for p in optimization.selected_products] == ["c"]
+    assert optimization.alternatives_considered == 3
+
+
+def test_optimize_falls_back_to_out_of_stock():
+    """Test that out-of-stock products are used when nothing is in stock."""
+    result = make_result("pens", [
+        make_product("a", 2.0, in_stock=False),
+        make_product("b", 1.0, in_stock=False),
+    ])
+    assert PriceOptimizer().optimize([result]).selected_products[0].id == "b"
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_vectorized_matches_loop(seed):
+    """Test that the NumPy path makes exactly the same picks, ties included."""
+    results = random_results(seed, 60)
+    
+    loop = PriceOptimizer().optimize(results)
+    vectorized = PriceOptimizer(vectorized=True).optimize(results)
+    
+    assert [p.id for p in vectorized.selected_products] == [p.id for p in loop.selected_products]
+    assert vectorized.total_cost == loop.total_cost
+    assert vectorized.alternatives_considered == loop.alternatives_considered
+
+
+def test_vectorized_handles_no_candidates():
+    """Test the NumPy path with empty search results."""
+    optimization = PriceOptimizer(vectorized=True).optimize([make_result("pens", [])])
+    assert optimization.selected_products == []
+    assert optimization.total_cost == 0
+
+
+def test_consolidated_moves_items_onto_fewer_vendors():
+    """Test that a vendor is dropped when its fixed cost outweighs the price difference."""
+    results = [
+        make_result("pens", [
+            make_product("pens-amazon", 2.0, vendor=Vendor.AMAZON),
+            make_product("pens-staples", 2.5, vendor=Vendor.STAPLES),
+        ]),
+        make_result("paper", [make_product("paper-staples", 5.0, vendor=Vendor.STAPLES)]),
+        make_result("tape", [
+            make_product("tape-costco", 1.0, vendor=Vendor.COSTCO),
+            make_product("tape-staples", 1.2, vendor=Vendor.STAPLES),
+        ]),
+    ]
+    optimizer = PriceOptimizer(vendor_fixed_costs={vendor: 3.0 for vendor in Vendor})
+    
+    optimization = optimizer.optimize_consolidated(results)
+    
+    assert [p.id for p in optimization.selected_products] == [
+        "pens-staples", "paper-staples", "tape-staples"
+    ]
+    assert optimization.total_cost == pytest.approx(8.7)
+    report = optimization.consolidation
+    assert (report.vendors_before, report.vendors_after, report.vendor_calls_saved) == (3, 1, 2)
+    assert report.landed_cost_before == pytest.approx(17.0)
+    assert report.landed_cost_after == pytest.approx(11.7)
+    assert report.cost_saved == pytest.approx(5.3)
+
+
+def test_consolidated_keeps_split_when_cheaper():
+    """Test that items stay put when moving them costs more than the vendor saves."""
+    results = [
+        make_result("toner", [
+            make_product("toner-amazon", 20.0, vendor=Vendor.AMAZON),
+            make_product("toner-staples", 40.0, vendor=Vendor.STAPLES),
+        ]),
+        make_result("paper", [make_product("paper-staples", 5.0, vendor=Vendor.STAPLES)]),
+    ]
+    optimizer = PriceOptimizer(vendor_fixed_costs={Vendor.AMAZON: 5.0, Vendor.STAPLES: 5.0})
+    
+    optimization = optimizer.optimize_consolidated(results)
+    
+    assert [p.id for p in optimization.selected_products] == ["toner-amazon", "paper-staples"]
+    assert optimization.consolidation.vendor_calls_saved == 0
+    assert optimization.consolidation.cost_saved == 0
+
+
+def test_consolidated_honors_minimum_orders_and_stock():
+    """Test that minimum-order shortfalls drive consolidation, never onto out-of-stock items."""
+    results = [
+        make_result("pens", [
+            make_product("pens-costco", 3.0, vendor=Vendor.COSTCO),
+            make_product("pens-amazon", 4.0, vendor=Vendor.AMAZON),
+        ]),
+        make_result("paper", [
+            make_product("paper-amazon", 30.0, vendor=Vendor.AMAZON),
+            make_product("paper-costco", 25.0, vendor=Vendor.COSTCO, in_stock=False),
+        ]),
+    ]
+    optimizer = PriceOptimizer(vendor_minimum_orders={Vendor.COSTCO: 25.0})
+    
+    optimization = optimizer.optimize_consolidated(results)
+    
+    assert [p.id for p in optimization.selected_products] == ["pens-amazon", "paper-amazon"]
+    assert optimizer.landed_cost(optimization.selected_products) == pytest.approx(34.0)
+    assert optimization.consolidation.cost_saved == pytest.approx(21.0)
+
+
+def test_consolidated_leaves_split_items_and_moves_the_rest():
+    """Test that items split across listings stay put while the other items still move."""
+    results = [
+        make_result("pens", [
+            make_product("pens-amazon", 2.0, vendor=Vendor.AMAZON),
+            make_product("pens-staples", 2.5, vendor=Vendor.STAPLES),
+        ]),
+        SearchResult(query="paper", quantity=13, total_found=2, products=[
+            make_product("paper-12-pack", 10.0, vendor=Vendor.STAPLES),
+            make_product("paper-ream", 1.0, vendor=Vendor.STAPLES),
+        ]),
+        SearchResult(query="tape", quantity=25, total_found=3, products=[
+            make_product("tape-12-pack", 5.0, vendor=Vendor.COSTCO),
+            make_product("tape-roll", 0.6, vendor=Vendor.COSTCO),
+            make_product("tape-staples", 1.0, vendor=Vendor.STAPLES),
+        ]),
+    ]
+    optimizer = PriceOptimizer(vendor_fixed_costs={vendor: 3.0 for vendor in Vendor})
+    
+    optimization = optimizer.optimize_consolidated(results)
+    
+    assert [(p.id, n) for p, n in zip(optimization.selected_products, optimization.quantities)] == [
+        ("pens-staples", 1),
+        ("paper-12-pack", 1), ("paper-ream", 1),
+        ("tape-12-pack", 2), ("tape-roll", 1),
+    ]
+    assert optimization.consolidation.vendor_calls_saved == 1
+    assert optimization.consolidation.cost_saved == pytest.approx(2.5)
+
+
+@pytest.fixture(scope="module")
+def pool():
+    """A one-process pool that takes every non-trivial step."""
+    pool = OptimizationPool(max_workers=1, min_candidates=10)
+    yield pool
+    pool.shutdown()
+
+
+def test_pool_selection_matches_in_process(pool):
+    """Test that selections computed in a worker process match the loop optimizer."""
+    results = random_results(3, 40)
+    expected = PriceOptimizer().optimize(results)
+    offloaded = pool.offloaded
+    
+    actual = PriceOptimizer(pool=pool).optimize(results)
+    
+    assert pool.offloaded == offloaded + 1
+    assert [p.id for p in actual.selected_products] == [
+        p.id for p in expected.selected_products
+    ]
+    assert actual.total_cost == pytest.approx(expected.total_cost)
+
+
+async def test_pool_async_paths_match_in_process(pool):
+    """Test that the async selection and basket paths return in-process results."""
+    results = random_results(4, 40)
+    in_process = PriceOptimizer()
+    pooled = PriceOptimizer(pool=pool)
+    offloaded = pool.offloaded
+    
+    selection = await pooled.aoptimize(results)
+    basket = await pooled.aoptimize_basket(results, budget=60.0, time_limit=5.0)
+    
+    assert pool.offloaded == offloaded + 2
+    assert [p.id for p in selection.selected_products] == [
+        p.id for p in in_process.optimize(results).selected_products
+    ]
+    expected = in_process.optimize_basket(results, budget=60.0, time_limit=5.0)
+    assert [p.id for p in basket.selected_products] == [
+        p.id for p in expected.selected_products
+    ]
+    assert basket.quantities == expected.quantities
+
+
+def test_pool_threshold_keeps_small_requests_in_process():
+    """Test that requests under the threshold never start worker processes."""
+    pool = OptimizationPool(max_workers=1, min_candidates=10_000)
+    optimizer = PriceOptimizer(pool=pool)
+    results = random_results(5, 20)
+    
+    optimizer.optimize(results)
+    optimizer.optimize_basket(results, budget=50.0)
+    
+    assert pool.stats() == {"offloaded": 0, "min_candidates": 10_000, "started": False}
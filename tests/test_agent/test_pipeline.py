@@ -0,0 +1,114 @@
+"""
+Tests for the streaming procurement pipeline.
+"""
+
+import asyncio
+from typing import List
+import pytest
+from agent.schemas import ItemStatus, ProcurementRequest, Product, Vendor
+from integrations.base import AsyncVendorInterface
+from integrations.mock_vendor import MockVendor
+from policies import ApprovalPolicy, BudgetPolicy
+from workflows import procure_office_essentials_streaming
+
+
+class GatedVendor(AsyncVendorInterface):
+    """Vendor whose searches for some queries wait until released."""
+    
+    def __init__(self, gates: dict):
+        self.gates = gates
+    
+    def get_name(self) -> str:
+        return "Gated"
+    
+    def get_vendor_type(self) -> Vendor:
+        return Vendor.MOCK
+    
+    async def asearch(self, query: str, max_results: int = 10) -> List[Product]:
+        if query in self.gates:
+            await self.gates[query].wait()
+        return [Product(id=f"{query}-1", name=query, price=5.0, vendor=Vendor.MOCK)]
+    
+    async def aget_product(self, product_id: str) -> Product:
+        raise NotImplementedError
+    
+    async def apurchase(self, product_id: str, quantity: int = 1) -> dict:
+        raise NotImplementedError
+
+
+async def run(items, **kwargs):
+    """Run the pipeline over MockVendor and collect every update."""
+    updates = []
+    
+    async def on_update(update):
+        updates.append(update)
+    
+    kwargs.setdefault("vendors", [MockVendor()])
+    result = await procure_office_essentials_streaming(
+        ProcurementRequest(items=items), on_update=on_update, **kwargs
+    )
+    return result, updates
+
+
+async def test_items_move_through_every_stage():
+    """Test that each item is reported at every stage and the order succeeds."""
+    result, updates = await run(["pens", "paper"])
+    
+    assert result.success
+    assert result.total_cost == pytest.approx(8.99 + 6.99)
+    for index in (0, 1):
+        assert [u.status for u in updates if u.index == index] == [
+            ItemStatus.PENDING,
+            ItemStatus.SEARCHING,
+            ItemStatus.OPTIMIZING,
+            ItemStatus.CHECKING,
+            ItemStatus.PURCHASING,
+            ItemStatus.PURCHASED,
+        ]
+    assert updates[-1].products and updates[-1].cost is not None
+
+
+async def test_missing_item_does_not_stop_the_others():
+    """Test that an item with no products is reported without blocking the rest."""
+    result, updates = await run(["pens", "unobtainium widget"])
+    
+    final = {u.index: u for u in updates}
+    assert final[0].status == ItemStatus.PURCHASED
+    assert final[1].status == ItemStatus.NOT_FOUND
+    assert not result.success
+    assert result.total_cost == pytest.approx(8.99)
+    assert "unobtainium widget" in result.error_message
+
+
+async def test_policies_apply_to_the_running_total():
+    """Test that items are admitted until the next one would cross the budget."""
+    budget = BudgetPolicy(budget_limit=10)
+    result, updates = await run(
+        ["pens", "paper"], budget_policy=budget, approval_policy=ApprovalPolicy()
+    )
+    
+    statuses = sorted(u.status for u in updates if u.status in (
+        ItemStatus.PURCHASED, ItemStatus.REJECTED
+    ))
+    assert statuses == [ItemStatus.PURCHASED, ItemStatus.REJECTED]
+    assert not result.success
+    assert budget.spent == pytest.approx(result.total_cost)
+
+
+async def test_first_item_is_bought_while_later_ones_search():
+    """Test that an item is purchased without waiting for slower searches."""
+    paper_released = asyncio.Event()
+    vendor = GatedVendor({"paper": paper_released})
+    
+    async def on_update(update):
+        if update.item == "pens" and update.status == ItemStatus.PURCHASED:
+            paper_released.set()
+    
+    result = await asyncio.wait_for(
+        procure_office_essentials_streaming(
+            ProcurementRequest(items=["paper", "pens"]), [vendor], on_update=on_update
+        ),
+        timeout=5,
+    )
+    assert result.success
+    assert len(result.products_purchased) == 2
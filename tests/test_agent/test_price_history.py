@@ -0,0 +1,114 @@
+"""
+Tests for the memory-mapped price history.
+"""
+
+import pytest
+from agent.optimizer import PriceOptimizer
+from agent.price_history import RECORD_DTYPE, PriceHistory
+from agent.schemas import Product, SearchResult, Vendor
+
+DAY = 86400.0
+
+
+def test_only_price_changes_are_appended(tmp_path):
+    """Test that unchanged prices are not stored and series survive reopening."""
+    history = PriceHistory(tmp_path)
+    
+    assert history.record(Vendor.AMAZON, "pen/1", 4.99, ts=100)
+    assert not history.record(Vendor.AMAZON, "pen/1", 4.99, ts=200)
+    assert history.record(Vendor.AMAZON, "pen/1", 3.99, ts=300)
+    # Late observations keep the series sorted
+    assert history.record(Vendor.AMAZON, "pen/1", 4.49, ts=250)
+    
+    reopened = PriceHistory(tmp_path)
+    series = reopened.series(Vendor.AMAZON, "pen/1")
+    assert series.tolist() == [(100, 499), (300, 399), (300, 449)]
+    assert (tmp_path / "amazon" / "pen%2F1.bin").stat().st_size == 3 * RECORD_DTYPE.itemsize
+    assert not reopened.record(Vendor.AMAZON, "pen/1", 4.49)
+    assert len(reopened.series(Vendor.STAPLES, "pen/1")) == 0
+
+
+def test_reads_see_appends(tmp_path):
+    """Test that a mapped series is refreshed after an append."""
+    history = PriceHistory(tmp_path)
+    history.record(Vendor.STAPLES, "paper", 9.99, ts=0)
+    assert len(history.series(Vendor.STAPLES, "paper")) == 1
+    
+    history.record(Vendor.STAPLES, "paper", 8.99, ts=10)
+    assert history.series(Vendor.STAPLES, "paper")["cents"].tolist() == [999, 899]
+    assert history.price_at(Vendor.STAPLES, "paper", 5) == 9.99
+    assert history.price_at(Vendor.STAPLES, "paper", 10) == 8.99
+    assert history.price_at(Vendor.STAPLES, "paper", -1) is None
+
+
+def test_processes_sharing_a_directory_keep_series_sorted(tmp_path):
+    """Test that appends check the file, not what this process last wrote."""
+    api, worker = PriceHistory(tmp_path), PriceHistory(tmp_path)
+    
+    assert api.record(Vendor.AMAZON, "pen", 4.99, ts=100)
+    assert worker.record(Vendor.AMAZON, "pen", 3.99, ts=200)
+    # The API process last wrote 4.99; the file says 3.99
+    assert not api.record(Vendor.AMAZON, "pen", 3.99, ts=150)
+    assert api.record(Vendor.AMAZON, "pen", 4.99, ts=120)
+    
+    series = PriceHistory(tmp_path).series(Vendor.AMAZON, "pen")
+    assert series.tolist() == [(100, 499), (200, 399), (200, 499)]
+
+
+def test_torn_records_are_cut_before_appending(tmp_path):
+    """Test that an interrupted write does not misalign later records."""
+    history = PriceHistory(tmp_path)
+    history.record(Vendor.AMAZON, "pen", 4.99, ts=100)
+    with (tmp_path / "amazon" / "pen.bin").open("ab") as f:
+        f.write(b"\x01\x02\x03")
+    
+    assert history.record(Vendor.AMAZON, "pen", 3.99, ts=200)
+    assert PriceHistory(tmp_path).series(Vendor.AMAZON, "pen").tolist() == [(100, 499), (200, 399)]
+
+
+def test_remembered_last_records_are_bounded(tmp_path):
+    """Test that only the most recently recorded series are remembered."""
+    history = PriceHistory(tmp_path, max_tracked=2)
+    for product_id in ["a", "b", "c"]:
+        history.record(Vendor.AMAZON, product_id, 1.0, ts=0)
+    
+    assert list(history._last) == [(Vendor.AMAZON, "b"), (Vendor.AMAZON, "c")]
+    assert not history.record(Vendor.AMAZON, "a", 1.0, ts=10)
+
+
+
+def test_range_stats_are_time_weighted(tmp_path):
+    """Test min/max/avg over a window that starts between price changes."""
+    history = PriceHistory(tmp_path)
+    for day, price in ((0, 10.0), (10, 20.0), (20, 15.0)):
+        history.record(Vendor.COSTCO, "toner", price, ts=day * DAY)
+    
+    stats = history.stats(Vendor.COSTCO, "toner", start=5 * DAY, end=25 * DAY)
+    
+    # 5 days at 10, 10 days at 20, 5 days at 15
+    assert stats.avg_price == pytest.approx(16.25)
+    assert (stats.min_price, stats.max_price) == (10.0, 20.0)
+    assert (stats.first_price, stats.last_price) == (10.0, 15.0)
+    assert stats.observations == 3
+    assert history.stats(Vendor.COSTCO, "toner", start=-10 * DAY, end=-DAY) is None
+    assert history.average_price(Vendor.COSTCO, "toner", days=5, now=25 * DAY) == 15.0
+
+
+def test_optimizer_reports_savings_against_history(tmp_path):
+    """Test that savings compare selected prices to their recent average."""
+    history = PriceHistory(tmp_path)
+    history.record(Vendor.AMAZON, "pens", 6.0, ts=0)
+    optimizer = PriceOptimizer(price_history=history)
+    
+    pens = Product(id="pens", name="Pens", price=5.0, vendor=Vendor.AMAZON)
+    paper = Product(id="paper", name="Paper", price=9.0, vendor=Vendor.AMAZON)
+    result = optimizer.optimize([
+        SearchResult(query="pens", products=[pens], total_found=1, quantity=3),
+        SearchResult(query="paper", products=[paper], total_found=1),
+    ])
+    
+    # Paper has no history and is left out
+    assert result.savings == pytest.approx(3.0)
+    assert PriceOptimizer().optimize([
+        SearchResult(query="paper", products=[paper], total_found=1)
+    ]).savings is None
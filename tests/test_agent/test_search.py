@@ -2,9 +2,13 @@
 Tests for product search functionality.
 """
 
+import asyncio
+import threading
+import time
 import pytest
+from agent.cache import SearchCache
 from agent.search import ProductSearcher
-from agent.schemas import SearchQuery
+from agent.schemas import SearchQuery, Vendor
 from integrations.mock_vendor import MockVendor
 
 
@@ -31,3 +35,378 @@ def test_search_multiple():
     assert len(results) == 2
     assert all(r.total_found > 0 for r in results)
 
+
+
+class SlowVendor(MockVendor):
+    """Mock vendor that takes a fixed time to answer."""
+    
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+    
+    def get_name(self) -> str:
+        return f"Slow Vendor ({self.delay}s)"
+    
+    def search(self, query: str, max_results: int = 10):
+        time.sleep(self.delay)
+        return super().search(query, max_results=max_results)
+
+
+class FailingVendor(MockVendor):
+    """Mock vendor whose search always fails."""
+    
+    def get_name(self) -> str:
+        return "Failing Vendor"
+    
+    def search(self, query: str, max_results: int = 10):
+        raise RuntimeError("vendor unavailable")
+
+
+def test_search_collects_vendor_errors():
+    """Test that vendor failures are reported on the result."""
+    searcher = ProductSearcher([FailingVendor(), MockVendor()])
+    result = searcher.search(SearchQuery(query="pens"))
+    
+    assert result.total_found > 0
+    assert len(result.errors) == 1
+    assert result.errors[0].vendor == "Failing Vendor"
+    assert not result.errors[0].timed_out
+
+
+def test_search_queries_vendors_concurrently():
+    """Test that latency is bounded by the slowest vendor, not the sum."""
+    searcher = ProductSearcher([SlowVendor(0.2) for _ in range(4)])
+    
+    started = time.monotonic()
+    result = searcher.search(SearchQuery(query="pens"))
+    elapsed = time.monotonic() - started
+    
+    assert len(result.products) == 4
+    assert elapsed < 0.6
+
+
+def test_search_returns_partial_results_on_timeout():
+    """Test that slow vendors are dropped once the timeout passes."""
+    searcher = ProductSearcher([MockVendor(), SlowVendor(1.0)], vendor_timeout=0.1)
+    
+    started = time.monotonic()
+    result = searcher.search(SearchQuery(query="pens"))
+    elapsed = time.monotonic() - started
+    
+    assert result.total_found == 1
+    assert [e.timed_out for e in result.errors] == [True]
+    assert elapsed < 0.5
+    searcher.close()
+
+
+class CountingVendor(SlowVendor):
+    """Slow mock vendor that records its peak number of concurrent calls."""
+    
+    def __init__(self, delay: float):
+        super().__init__(delay)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+    
+    def search(self, query: str, max_results: int = 10):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            return super().search(query, max_results=max_results)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def test_search_multiple_preserves_query_order():
+    """Test that results line up with the queries regardless of finish order."""
+    searcher = ProductSearcher([MockVendor(), SlowVendor(0.05)], max_in_flight=4)
+    items = ["stapler", "pens", "paper", "pens", "stapler", "paper"]
+    results = searcher.search_multiple([SearchQuery(query=item) for item in items])
+    
+    assert [r.query for r in results] == items
+    assert all(r.total_found == 2 for r in results)
+
+
+def test_search_multiple_respects_max_in_flight():
+    """Test that no more than max_in_flight vendor calls run at once."""
+    vendor = CountingVendor(0.02)
+    searcher = ProductSearcher([vendor], max_in_flight=3)
+    results = searcher.search_multiple([SearchQuery(query=f"pens {i}") for i in range(12)])
+    
+    assert len(results) == 12
+    assert vendor.peak <= 3
+    assert vendor.peak > 1
+
+
+async def test_asearch_multiple_matches_sync_search():
+    """Test that the async search path returns the same products in order."""
+    searcher = ProductSearcher([MockVendor(), SlowVendor(0.05)])
+    queries = [SearchQuery(query="pens"), SearchQuery(query="stapler")]
+    
+    async_results = await searcher.asearch_multiple(queries)
+    sync_results = searcher.search_multiple(queries)
+    
+    assert [r.query for r in async_results] == ["pens", "stapler"]
+    for a, s in zip(async_results, sync_results):
+        assert [p.id for p in a.products] == [p.id for p in s.products]
+
+
+async def test_asearch_times_out_slow_vendor():
+    """Test that the async path drops vendors that exceed the timeout."""
+    searcher = ProductSearcher([MockVendor(), SlowVendor(1.0)], vendor_timeout=0.1)
+    result = await searcher.asearch(SearchQuery(query="pens"))
+    
+    assert result.total_found == 1
+    assert [e.timed_out for e in result.errors] == [True]
+
+
+class TimingOutVendor(MockVendor):
+    """Mock vendor whose own client times out."""
+    
+    supports_batch_search = True
+    
+    def get_name(self) -> str:
+        return "Timing Out Vendor"
+    
+    def search(self, query: str, max_results: int = 10):
+        raise TimeoutError("read timed out")
+    
+    def search_batch(self, queries, max_results: int = 10):
+        raise TimeoutError("read timed out")
+
+
+async def test_asearch_reports_vendor_timeouts_without_a_deadline():
+    """Test that a vendor's own timeout is reported when no vendor_timeout is set."""
+    searcher = ProductSearcher([TimingOutVendor(), SlowVendor(0.0)])
+    results = await searcher.asearch_multiple(
+        [SearchQuery(query="pens"), SearchQuery(query="paper")]
+    )
+    
+    for result in results:
+        assert result.total_found == 1
+        [error] = result.errors
+        assert (error.error, error.timed_out) == ("read timed out", True)
+    searcher.close()
+
+
+class GatedVendor(MockVendor):
+    """Mock vendor that blocks until released and counts upstream calls."""
+    
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.calls = 0
+    
+    def search(self, query: str, max_results: int = 10):
+        self.calls += 1
+        self.release.wait(1.0)
+        return super().search(query, max_results=max_results)
+    
+    def get_product(self, product_id: str):
+        self.calls += 1
+        self.release.wait(1.0)
+        return super().get_product(product_id)
+
+
+def test_concurrent_identical_searches_share_one_call():
+    """Test that identical in-flight searches are coalesced."""
+    vendor = GatedVendor()
+    searcher = ProductSearcher([vendor])
+    
+    threads = [
+        threading.Thread(target=searcher.search, args=(SearchQuery(query="Pens"),))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    vendor.release.set()
+    for thread in threads:
+        thread.join()
+    
+    assert vendor.calls == 1
+    assert searcher.flights.stats()["shared"] == 4
+
+
+async def test_concurrent_identical_product_lookups_share_one_call():
+    """Test that identical in-flight get_product lookups are coalesced."""
+    vendor = GatedVendor()
+    searcher = ProductSearcher([vendor])
+    
+    lookups = [
+        asyncio.create_task(searcher.aget_product(Vendor.MOCK, "mock-2")) for _ in range(5)
+    ]
+    await asyncio.sleep(0.1)
+    vendor.release.set()
+    products = await asyncio.gather(*lookups)
+    
+    assert vendor.calls == 1
+    assert {p.id for p in products} == {"mock-2"}
+
+
+
+class PrefixedVendor(MockVendor):
+    """Mock vendor whose product IDs carry a prefix, counting searches."""
+    
+    def __init__(self, prefix: str):
+        super().__init__()
+        self.prefix = prefix
+        self.calls = 0
+    
+    def search(self, query: str, max_results: int = 10):
+        self.calls += 1
+        return [
+            p.model_copy(update={"id": f"{self.prefix}-{p.id}"})
+            for p in super().search(query, max_results=max_results)
+        ]
+
+
+async def test_vendors_of_one_type_keep_separate_calls_and_cache_entries():
+    """Test that two vendors reporting the same type are each searched and cached."""
+    vendors = [PrefixedVendor("a"), PrefixedVendor("b")]
+    searcher = ProductSearcher(vendors, cache=SearchCache())
+    
+    first = searcher.search(SearchQuery(query="pens"))
+    assert {p.id.split("-")[0] for p in first.products} == {"a", "b"}
+    
+    # Both entries are found again through the async path's adapters
+    second = await searcher.asearch(SearchQuery(query="Pens"))
+    assert sorted(p.id for p in second.products) == sorted(p.id for p in first.products)
+    assert [vendor.calls for vendor in vendors] == [1, 1]
+
+class BatchVendor(MockVendor):
+    """Mock vendor with a batch search API that records every request."""
+    
+    supports_batch_search = True
+    max_batch_size = 4
+    
+    def __init__(self, delay: float = 0.0, fail: bool = False, short: bool = False):
+        super().__init__()
+        self.delay = delay
+        self.fail = fail
+        self.short = short
+        self.batches = []
+        self.searches = 0
+    
+    def search(self, query: str, max_results: int = 10):
+        self.searches += 1
+        return super().search(query, max_results=max_results)
+    
+    def search_batch(self, queries, max_results: int = 10):
+        self.batches.append(list(queries))
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("batch endpoint down")
+        results = [MockVendor.search(self, query, max_results=max_results) for query in queries]
+        return results[:-1] if self.short else results
+
+
+ITEMS = ["pens", "paper", "stapler", "pens", "notebook", "folders", "tape", "paper", "clips"]
+
+
+def test_search_multiple_batches_per_vendor():
+    """Test that batch-capable vendors get one request per max_batch_size distinct queries."""
+    vendor = BatchVendor()
+    searcher = ProductSearcher([vendor, SlowVendor(0.0)])
+    results = searcher.search_multiple([SearchQuery(query=item) for item in ITEMS])
+    expected = ProductSearcher([MockVendor(), SlowVendor(0.0)]).search_multiple(
+        [SearchQuery(query=item) for item in ITEMS]
+    )
+    
+    # 7 distinct queries: batches of 4 and 3, each query asked once
+    assert [len(batch) for batch in vendor.batches] == [4, 3]
+    assert vendor.searches == 0
+    assert [[p.id for p in r.products] for r in results] == [
+        [p.id for p in r.products] for r in expected
+    ]
+
+
+async def test_asearch_multiple_batches_per_vendor():
+    """Test that the async path sends the same batches and returns the same products."""
+    vendor = BatchVendor()
+    searcher = ProductSearcher([vendor])
+    results = await searcher.asearch_multiple([SearchQuery(query=item) for item in ITEMS])
+    
+    assert sorted(len(batch) for batch in vendor.batches) == [3, 4]
+    assert vendor.searches == 0
+    assert [r.query for r in results] == ITEMS
+    assert [p.id for p in results[3].products] == [p.id for p in results[0].products]
+
+
+async def test_batches_skip_cached_queries():
+    """Test that only cache misses are batched, and a lone miss is searched on its own."""
+    vendor = BatchVendor()
+    searcher = ProductSearcher([vendor], cache=SearchCache())
+    searcher.search_multiple([SearchQuery(query=item) for item in ITEMS[:3]])
+    assert vendor.batches == [["pens", "paper", "stapler"]]
+    
+    await searcher.asearch_multiple([SearchQuery(query=item) for item in ITEMS[:5]])
+    assert vendor.batches == [["pens", "paper", "stapler"]]
+    assert vendor.searches == 1  # "notebook"
+
+
+def test_batch_failure_and_timeout_reach_every_query():
+    """Test that a failed or slow batch is reported on each of its queries."""
+    queries = [SearchQuery(query=item) for item in ITEMS[:3]]
+    failing = ProductSearcher([BatchVendor(fail=True)]).search_multiple(queries)
+    assert all(r.errors[0].error == "batch endpoint down" for r in failing)
+    
+    searcher = ProductSearcher([BatchVendor(delay=1.0)], vendor_timeout=0.1)
+    started = time.monotonic()
+    slow = searcher.search_multiple(queries)
+    assert time.monotonic() - started < 0.5
+    assert all(r.errors[0].timed_out for r in slow)
+    searcher.close()
+
+
+class SlowCatalog:
+    """Catalog that finds nothing, slowly."""
+    
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.lookups = 0
+    
+    def get(self, vendor, query, max_results):
+        self.lookups += 1
+        time.sleep(self.delay)
+        return None
+    
+    def put(self, vendor, query, max_results, products):
+        pass
+
+
+async def test_batch_lookups_run_together():
+    """Test that the cache and catalog are consulted for all batched queries at once."""
+    catalog = SlowCatalog(0.1)
+    searcher = ProductSearcher([BatchVendor()], catalog=catalog)
+    
+    started = time.monotonic()
+    results = await searcher.asearch_multiple([SearchQuery(query=item) for item in ITEMS])
+    
+    # 7 distinct queries looked up once each, in about one lookup's time
+    assert catalog.lookups == 7
+    assert time.monotonic() - started < 0.4
+    assert all(not r.errors for r in results)
+
+
+async def test_short_batch_results_are_vendor_errors():
+    """Test that a batch answering fewer queries than it was sent fails each of them."""
+    queries = [SearchQuery(query=item) for item in ITEMS[:3]]
+    message = "Batch search returned 2 results for 3 queries"
+    
+    results = ProductSearcher([BatchVendor(short=True)]).search_multiple(queries)
+    assert all(r.errors[0].error == message for r in results)
+    results = await ProductSearcher([BatchVendor(short=True)]).asearch_multiple(queries)
+    assert all(r.errors[0].error == message for r in results)
+
+
+
+async def test_get_products_batches_and_falls_back():
+    """Test batched product lookups, one call per ID for vendors without a batch API."""
+    searcher = ProductSearcher([MockVendor()])
+    ids = ["mock-1", "mock-2", "mock-3"]
+    
+    assert [p.id for p in searcher.get_products(Vendor.MOCK, ids)] == ids
+    assert [p.id for p in await searcher.aget_products(Vendor.MOCK, ids)] == ids
@@ -0,0 +1,112 @@
+"""
+Tests for pack-size parsing and quantity covering.
+"""
+
+import math
+import pytest
+from agent.optimizer import PriceOptimizer
+from agent.schemas import Product, SearchResult, Vendor
+from agent.units import cheapest_cover, pack_size, parse_pack_size, unit_price
+
+
+def make_product(product_id: str, name: str, price: float, rating=None, in_stock=True):
+    """Build a minimal product."""
+    return Product(
+        id=product_id, name=name, price=price, rating=rating, in_stock=in_stock, vendor=Vendor.MOCK
+    )
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("Office Pens - Pack of 12", 12),
+    ("Gel Pens, 24-Pack", 24),
+    ("Sticky Notes 100 ct", 100),
+    ("Binder Clips Box of 36", 36),
+    ("Pencils (2 Dozen)", 24),
+    ("Copy Paper - 500 Sheets", 1),
+    ("Stapler - Heavy Duty", 1),
+    (None, 1),
+])
+def test_parse_pack_size(text, expected):
+    """Test pack sizes parsed from listing names."""
+    assert parse_pack_size(text) == expected
+
+
+def test_pack_size_falls_back_to_description():
+    """Test that the description is used when the name has no pack size."""
+    product = make_product("a", "Markers", 6.0)
+    product.description = "Assorted colors, 6 count"
+    
+    assert pack_size(product) == 6
+    assert unit_price(product) == pytest.approx(1.0)
+
+
+def test_cheapest_cover_combines_pack_sizes():
+    """Test that the cheapest mix of packs covering the quantity is chosen."""
+    products = [
+        make_product("single", "Pen", 1.0),
+        make_product("twelve", "Pens - Pack of 12", 8.99),
+        make_product("six", "Pens 6-Pack", 5.0),
+    ]
+    
+    def cover(quantity):
+        return [(p.id, count) for p, count in cheapest_cover(products, quantity)]
+    
+    assert cover(1) == [("single", 1)]
+    assert cover(5) == [("single", 5)]
+    assert cover(13) == [("single", 1), ("twelve", 1)]
+    assert cover(18) == [("twelve", 1), ("six", 1)]
+    assert cover(100) == [("single", 4), ("twelve", 8)]
+
+
+def test_cheapest_cover_large_quantities_stay_optimal():
+    """Test that quantities far past the pack sizes are covered cheaply and quickly."""
+    products = [
+        make_product("ten", "Pens 10-Pack", 8.0),
+        make_product("fifteen", "Pens 15-Pack", 12.5),
+        make_product("quarter", "Pens 25 ct", 19.5),
+    ]
+    
+    def units(cover):
+        return sum(pack_size(p) * count for p, count in cover)
+    
+    for quantity in [1, 7, 29, 31, 1001]:
+        # Brute force over the smaller packs; the rest is whole 25-packs
+        best = min(
+            8.0 * ten + 12.5 * fifteen
+            + 19.5 * math.ceil(max(0, quantity - 10 * ten - 15 * fifteen) / 25)
+            for ten in range(quantity // 10 + 2)
+            for fifteen in range(quantity // 15 + 2)
+        )
+        cover = cheapest_cover(products, quantity)
+        assert units(cover) >= quantity
+        assert sum(p.price * count for p, count in cover) == pytest.approx(best)
+    
+    # Sizes share a divisor of 5 and the bulk goes to the best-value pack
+    cover = cheapest_cover(products, 10 ** 9 + 3)
+    assert units(cover) >= 10 ** 9 + 3
+    assert dict((p.id, count) for p, count in cover)["quarter"] >= 4 * 10 ** 7 - 10
+
+
+def test_optimize_covers_quantity_with_packs():
+    """Test that the optimizer compares packs by what covering the quantity costs."""
+    result = SearchResult(
+        query="pens",
+        products=[
+            make_product("single", "Pen", 0.5),
+            make_product("box", "Pens - Box of 50", 15.0, in_stock=False),
+            make_product("pack", "Pens - Pack of 12", 4.0),
+        ],
+        total_found=3,
+        quantity=24,
+    )
+    
+    optimization = PriceOptimizer().optimize([result])
+    
+    assert [p.id for p in optimization.selected_products] == ["pack"]
+    assert optimization.quantities == [2]
+    assert optimization.total_cost == pytest.approx(8.0)
+    
+    # The basket optimizer prices options the same way
+    basket = PriceOptimizer().optimize_basket([result], budget=10.0)
+    assert [p.id for p in basket.selected_products] == ["pack"]
+    assert basket.quantities == [2]
@@ -0,0 +1,237 @@
+"""
+Tests for the persistent product catalog.
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+from agent.price_history import PriceHistory
+from agent.schemas import Product, SearchQuery, Vendor
+from agent.search import ProductSearcher
+from api.database import Base, SessionLocal, engine
+from api.models.catalog import CatalogQuery
+from api.services.catalog_service import CatalogRefresher, CatalogService, CatalogStore
+from integrations.base import VendorInterface
+
+Base.metadata.create_all(bind=engine)
+
+
+class PricedVendor(VendorInterface):
+    """Vendor returning one product per query at ``price``, counting calls."""
+    
+    def __init__(self, price: float = 2.5):
+        self.price = price
+        self.calls = 0
+    
+    def get_name(self) -> str:
+        return "Priced Vendor"
+    
+    def get_vendor_type(self) -> Vendor:
+        return Vendor.COSTCO
+    
+    def search(self, query: str, max_results: int = 10):
+        self.calls += 1
+        return [Product(
+            id=f"sku-{query}", name=query.title(), price=self.price, vendor=Vendor.COSTCO
+        )]
+    
+    def get_product(self, product_id: str):
+        raise ValueError(product_id)
+    
+    def purchase(self, product_id: str, quantity: int = 1) -> dict:
+        return {}
+
+
+@pytest.fixture
+def db():
+    """Database session."""
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def query():
+    """A query no other test has searched."""
+    return f"sticky notes {uuid.uuid4().hex[:8]}"
+
+
+def test_lookup_serves_fresh_results_only(db, query):
+    """Test that stored searches are served until they go stale."""
+    products = PricedVendor().search(query)
+    fetched = datetime.utcnow() - timedelta(seconds=100)
+    CatalogService.record_search(db, Vendor.COSTCO, query, 10, products, now=fetched)
+    
+    found = CatalogService.lookup_search(db, Vendor.COSTCO, query.upper(), 10, max_age=600)
+    assert found == products
+    assert CatalogService.lookup_search(db, Vendor.COSTCO, query, 10, max_age=60) is None
+    assert CatalogService.lookup_search(db, Vendor.COSTCO, query, 5, max_age=600) is None
+    
+    entry = db.query(CatalogQuery).filter(CatalogQuery.query == query).one()
+    assert entry.hit_count == 3
+    assert [row.product_id for row in CatalogService.find_products(db, query)] == [products[0].id]
+
+
+def test_stored_prices_feed_price_history(db, query, tmp_path):
+    """Test that stored searches append price changes to the history."""
+    history = PriceHistory(tmp_path)
+    for price in (2.5, 2.5, 2.25):
+        products = PricedVendor(price).search(query)
+        CatalogService.record_search(db, Vendor.COSTCO, query, 10, products, history=history)
+    
+    series = history.series(Vendor.COSTCO, f"sku-{query}")
+    assert series["cents"].tolist() == [250, 225]
+    assert abs(series["ts"][-1] - time.time()) < 5
+
+
+def test_failed_writes_leave_price_history_alone(query, tmp_path):
+    """Test that prices are only recorded for searches that were committed."""
+    history = PriceHistory(tmp_path)
+    
+    def conflicting_session():
+        session = SessionLocal()
+        
+        def commit():
+            raise IntegrityError("INSERT", {}, Exception("UNIQUE constraint failed"))
+        
+        session.commit = commit
+        return session
+    
+    products = PricedVendor(2.5).search(query)
+    CatalogStore(conflicting_session, history=history).put(Vendor.COSTCO, query, 10, products)
+    assert len(history.series(Vendor.COSTCO, f"sku-{query}")) == 0
+    
+    CatalogStore(SessionLocal, history=history).put(Vendor.COSTCO, query, 10, products)
+    assert history.series(Vendor.COSTCO, f"sku-{query}")["cents"].tolist() == [250]
+
+
+def test_searcher_reads_through_catalog(query):
+    """Test that a new searcher with an empty memory cache is served from the catalog."""
+    store = CatalogStore(SessionLocal, max_age=600)
+    vendor = PricedVendor()
+    
+    first = ProductSearcher([vendor], concurrent=False, catalog=store).search(
+        SearchQuery(query=query)
+    )
+    second = ProductSearcher([vendor], concurrent=False, catalog=store).search(
+        SearchQuery(query=query)
+    )
+    
+    assert vendor.calls == 1
+    assert second.products == first.products
+
+
+async def test_async_searcher_reads_through_catalog(query):
+    """Test the catalog on the async search path."""
+    store = CatalogStore(SessionLocal, max_age=600)
+    vendor = PricedVendor()
+    
+    await ProductSearcher([vendor], catalog=store).asearch(SearchQuery(query=query))
+    result = await ProductSearcher([vendor], catalog=store).asearch(SearchQuery(query=query))
+    
+    assert vendor.calls == 1
+    assert len(result.products) == 1
+
+
+class BrokenStore:
+    """Catalog store whose database is unavailable."""
+    
+    def __init__(self):
+        self.threads = set()
+    
+    def get(self, vendor, query, max_results):
+        self.threads.add(threading.get_ident())
+        raise OperationalError("SELECT", {}, Exception("database is locked"))
+    
+    def put(self, vendor, query, max_results, products):
+        self.threads.add(threading.get_ident())
+        raise OperationalError("UPDATE", {}, Exception("database is locked"))
+
+
+async def test_catalog_failures_do_not_fail_searches(query):
+    """Test that catalog errors are misses, and writes stay off the event loop."""
+    store = BrokenStore()
+    searcher = ProductSearcher([PricedVendor()], catalog=store)
+    
+    results = await searcher.asearch_multiple([SearchQuery(query=query)] * 2)
+    assert all(len(result.products) == 1 and not result.errors for result in results)
+    assert threading.get_ident() not in store.threads
+    
+    result = ProductSearcher([PricedVendor()], concurrent=False, catalog=store).search(
+        SearchQuery(query=query)
+    )
+    assert len(result.products) == 1 and not result.errors
+
+
+def test_store_counts_hits_in_batches(db, query):
+    """Test that store lookups are read-only until enough hits are counted."""
+    CatalogService.record_search(db, Vendor.COSTCO, query, 10, PricedVendor().search(query))
+    store = CatalogStore(SessionLocal, max_age=600, hit_flush_size=3)
+    
+    def hit_count():
+        db.expire_all()
+        return db.query(CatalogQuery).filter(CatalogQuery.query == query).one().hit_count
+    
+    assert store.get(Vendor.COSTCO, query, 10) is not None
+    store.get(Vendor.COSTCO, query.upper(), 10)
+    store.get(Vendor.COSTCO, f"{query} refills", 10)
+    # Stored with one hit; flushed on the third lookup, skipping the unknown query
+    assert hit_count() == 3
+    
+    store.get(Vendor.COSTCO, query, 10)
+    assert hit_count() == 3
+    assert store.flush_hits() == 1
+    assert hit_count() == 4
+    assert store.flush_hits() == 0
+
+
+def test_refresher_reprices_popular_searches(db, query):
+    """Test that only popular, ageing searches are refreshed."""
+    unpopular = f"{query} refills"
+    old = datetime.utcnow() - timedelta(days=30)
+    for text in (query, unpopular):
+        products = PricedVendor().search(text)
+        CatalogService.record_search(db, Vendor.COSTCO, text, 10, products, now=old)
+    for _ in range(5):
+        CatalogService.lookup_search(db, Vendor.COSTCO, query, 10, max_age=600)
+    
+    vendor = PricedVendor(price=1.99)
+    searcher = ProductSearcher([vendor], concurrent=False, catalog=CatalogStore(SessionLocal))
+    refresher = CatalogRefresher(searcher, SessionLocal, refresh_after=60, min_hits=5)
+    
+    # Popular entries left by other tests may be refreshed too
+    assert refresher.refresh_once() >= 1
+    
+    db.expire_all()
+    assert CatalogService.lookup_search(db, Vendor.COSTCO, query, 10, max_age=600)[0].price == 1.99
+    assert CatalogService.lookup_search(db, Vendor.COSTCO, unpopular, 10, max_age=600) is None
+
+
+async def test_refresher_keeps_running_after_a_failed_pass(monkeypatch):
+    """Test that a pass that raises is logged and the next pass still runs."""
+    refresher = CatalogRefresher(ProductSearcher([PricedVendor()]), SessionLocal)
+    passes = 0
+    
+    def refresh_once():
+        nonlocal passes
+        passes += 1
+        if passes == 1:
+            raise OperationalError("SELECT", {}, Exception("database is locked"))
+        return 0
+    
+    monkeypatch.setattr(refresher, "refresh_once", refresh_once)
+    task = asyncio.create_task(refresher.run(0.01))
+    
+    async def second_pass():
+        while passes < 2:
+            await asyncio.sleep(0.01)
+    
+    try:
+        await asyncio.wait_for(second_pass(), timeout=1)
+    finally:
+        task.cancel()
+    assert refresher.errors == 1
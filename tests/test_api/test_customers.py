@@ -44,6 +44,41 @@ def test_list_customers():
     assert isinstance(response.json(), list)
 
 
+def test_list_customers_cursor_pages():
+    """Test that following cursors visits every customer exactly once, in order."""
+    for i in range(5):
+        client.post(
+            "/api/v1/customers/", json={"name": f"Page {i}", "email": f"page{i}@example.com"}
+        )
+    expected = [c["id"] for c in client.get("/api/v1/customers/?limit=1000").json()]
+    
+    seen = []
+    response = client.get("/api/v1/customers/?limit=2")
+    while True:
+        assert response.status_code == 200
+        seen.extend(c["id"] for c in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        response = client.get(f"/api/v1/customers/?limit=2&cursor={cursor}")
+    
+    assert seen == expected
+
+
+def test_list_customers_legacy_offset():
+    """Test that offset pagination still returns the same order."""
+    expected = [c["id"] for c in client.get("/api/v1/customers/?limit=1000").json()]
+    response = client.get("/api/v1/customers/?skip=1&limit=2")
+    assert response.status_code == 200
+    assert [c["id"] for c in response.json()] == expected[1:3]
+
+
+def test_list_customers_invalid_cursor():
+    """Test that a malformed cursor is rejected."""
+    response = client.get("/api/v1/customers/?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
 def test_health_check():
     """Test health check endpoint."""
     response = client.get("/api/v1/health/")
@@ -0,0 +1,379 @@
+"""
+Tests for the durable procurement job queue.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from api.config import settings
+from api.database import Base, SessionLocal
+from api.database.connection import create_db_engine
+from api.main import app
+from api.models.job import JobStatus, ProcurementJob
+from api.models.order import Order, OrderStatus
+from api.routes.procurement import procurement_service
+from api.schemas.procurement import ProcurementRequest
+from api.services.job_service import JobService, JobWorker
+from api.services.procurement_service import ProcurementService
+
+client = TestClient(app)
+
+T0 = datetime(2024, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Sessions on a private database, so queue contents are known."""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def queue_orders(session_factory, count):
+    """Create ``count`` orders and queue a job for each; returns the job IDs."""
+    db = session_factory()
+    try:
+        orders = [Order(customer_id=1, status=OrderStatus.PENDING) for _ in range(count)]
+        db.add_all(orders)
+        db.commit()
+        return JobService.enqueue(
+            db, [(order.id, ProcurementRequest(customer_id=1, items=["pens"])) for order in orders]
+        )
+    finally:
+        db.close()
+
+
+def test_claims_do_not_overlap(session_factory):
+    """Test that workers lease disjoint jobs, oldest first."""
+    job_ids = queue_orders(session_factory, 5)
+    db = session_factory()
+    try:
+        first = JobService.claim(db, "a", limit=3, lease_seconds=60, now=T0)
+        second = JobService.claim(db, "b", limit=5, lease_seconds=60, now=T0)
+        third = JobService.claim(db, "c", limit=5, lease_seconds=60, now=T0)
+    finally:
+        db.close()
+    
+    assert [job_id for job_id, _, _ in first] == job_ids[:3]
+    assert [job_id for job_id, _, _ in second] == job_ids[3:]
+    assert third == []
+    assert first[0][2].items == ["pens"]
+
+
+def test_expired_lease_is_reclaimed(session_factory):
+    """Test that a job whose worker stopped heartbeating moves to another worker."""
+    [job_id] = queue_orders(session_factory, 1)
+    db = session_factory()
+    try:
+        JobService.claim(db, "a", limit=1, lease_seconds=10, now=T0)
+        # Heartbeats keep the lease
+        held = JobService.heartbeat(db, "a", [job_id], 10, now=T0 + timedelta(seconds=8))
+        assert held == {job_id}
+        assert JobService.claim(db, "b", 1, 10, now=T0 + timedelta(seconds=15)) == []
+        
+        reclaimed = JobService.claim(db, "b", 1, 10, now=T0 + timedelta(seconds=19))
+        assert [j for j, _, _ in reclaimed] == [job_id]
+        # The first worker has lost it and cannot settle it
+        assert JobService.heartbeat(db, "a", [job_id], 10) == set()
+        assert JobService.complete(db, job_id, "a") is False
+        assert JobService.complete(db, job_id, "b") is True
+        assert db.get(ProcurementJob, job_id).attempts == 2
+    finally:
+        db.close()
+
+
+def test_exhausted_jobs_fail_with_their_orders(session_factory):
+    """Test that a job is failed once it has used all of its attempts."""
+    [job_id] = queue_orders(session_factory, 1)
+    db = session_factory()
+    try:
+        for seconds, claims in [(0, 1), (11, 1), (22, 0)]:
+            now = T0 + timedelta(seconds=seconds)
+            assert len(JobService.claim(db, "w", 1, 10, max_attempts=2, now=now)) == claims
+        
+        job = db.get(ProcurementJob, job_id)
+        assert job.status == JobStatus.FAILED
+        assert db.get(Order, job.order_id).status == OrderStatus.FAILED
+    finally:
+        db.close()
+
+
+def test_fail_requeues_until_attempts_run_out(session_factory):
+    """Test that errors re-queue a job and the last one fails it."""
+    [job_id] = queue_orders(session_factory, 1)
+    db = session_factory()
+    try:
+        JobService.claim(db, "a", 1, 60, max_attempts=2)
+        assert JobService.fail(db, job_id, "a", "boom", max_attempts=2) == JobStatus.QUEUED
+        assert db.get(ProcurementJob, job_id).last_error == "boom"
+        
+        JobService.claim(db, "a", 1, 60, max_attempts=2)
+        assert JobService.fail(db, job_id, "a", "boom", max_attempts=2) == JobStatus.FAILED
+        assert JobService.stats(db)["failed"] == 1
+    finally:
+        db.close()
+
+
+async def test_worker_runs_jobs_concurrently(session_factory):
+    """Test that a worker keeps up to ``concurrency`` jobs in flight."""
+    queue_orders(session_factory, 5)
+    in_flight = 0
+    peak = 0
+    
+    async def process(order_id, request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+    
+    worker = JobWorker(process, session_factory, concurrency=3)
+    assert await worker.run_once() == 3
+    assert await worker.run_once() == 0  # Full
+    await worker.drain()
+    assert await worker.run_once() == 2
+    await worker.drain()
+    
+    assert peak == 3
+    assert worker.completed == 5
+    db = session_factory()
+    try:
+        assert JobService.stats(db)["done"] == 5
+    finally:
+        db.close()
+
+
+async def test_worker_requeues_failed_jobs(session_factory):
+    """Test that a job whose processing raises is released for another attempt."""
+    [job_id] = queue_orders(session_factory, 1)
+    
+    async def process(order_id, request):
+        raise RuntimeError("vendor outage")
+    
+    worker = JobWorker(process, session_factory)
+    await worker.run_once()
+    await worker.drain()
+    
+    db = session_factory()
+    try:
+        job = db.get(ProcurementJob, job_id)
+        assert job.status == JobStatus.QUEUED
+        assert job.last_error == "vendor outage"
+    finally:
+        db.close()
+
+
+async def test_worker_cancels_lost_jobs(session_factory):
+    """Test that a job taken over by another worker is cancelled on the next heartbeat."""
+    [job_id] = queue_orders(session_factory, 1)
+    release = asyncio.Event()
+    
+    async def process(order_id, request):
+        await release.wait()
+    
+    worker = JobWorker(process, session_factory)
+    await worker.run_once()
+    db = session_factory()
+    try:
+        db.execute(
+            update(ProcurementJob).where(ProcurementJob.id == job_id).values(lease_owner="other")
+        )
+        db.commit()
+    finally:
+        db.close()
+    
+    await worker.heartbeat_once()
+    await worker.drain()
+    assert worker.lost == 1
+    assert worker.completed == 0
+
+
+async def test_worker_run_stops_and_drains(session_factory):
+    """Test that ``run`` processes the queue and returns once stopped."""
+    queue_orders(session_factory, 4)
+    stop = asyncio.Event()
+    worker = JobWorker(
+        lambda order_id, request: asyncio.sleep(0), session_factory, poll_seconds=0.01
+    )
+    
+    task = asyncio.create_task(worker.run(stop))
+    while worker.completed < 4:
+        await asyncio.sleep(0.01)
+    stop.set()
+    await asyncio.wait_for(task, timeout=1)
+
+
+async def test_worker_survives_database_errors(session_factory, monkeypatch):
+    """Test that failed claims and heartbeats are retried instead of stopping the worker."""
+    [job_id] = queue_orders(session_factory, 1)
+    release = asyncio.Event()
+    claim, heartbeat = JobService.claim, JobService.heartbeat
+    errors = {"claim": 2, "heartbeat": 2}
+    
+    def flaky(name, method):
+        def call(*args, **kwargs):
+            if errors[name]:
+                errors[name] -= 1
+                raise OperationalError("UPDATE", {}, Exception("database is locked"))
+            return method(*args, **kwargs)
+        return call
+    
+    monkeypatch.setattr(JobService, "claim", flaky("claim", claim))
+    monkeypatch.setattr(JobService, "heartbeat", flaky("heartbeat", heartbeat))
+    
+    async def process(order_id, request):
+        await release.wait()
+    
+    stop = asyncio.Event()
+    worker = JobWorker(
+        process, session_factory, heartbeat_seconds=0.01, poll_seconds=0.01, lease_seconds=60
+    )
+    task = asyncio.create_task(worker.run(stop))
+    
+    async def recovered():
+        while errors["heartbeat"] or not worker.running:
+            await asyncio.sleep(0.01)
+    
+    await asyncio.wait_for(recovered(), timeout=1)
+    
+    # Leases are renewed again once the database recovers
+    db = session_factory()
+    try:
+        renewed_at = db.get(ProcurementJob, job_id).updated_at
+        await asyncio.sleep(0.05)
+        db.expire_all()
+        assert db.get(ProcurementJob, job_id).updated_at > renewed_at
+    finally:
+        db.close()
+    
+    release.set()
+    stop.set()
+    await asyncio.wait_for(task, timeout=1)
+    assert worker.errors == 4
+    assert (worker.completed, worker.lost) == (1, 0)
+
+
+async def test_worker_retries_settling_finished_jobs(session_factory, monkeypatch):
+    """Test that a finished job is settled despite database errors, not left to run again."""
+    [done_id, failed_id] = queue_orders(session_factory, 2)
+    settle_errors = 4
+    
+    def flaky(method):
+        def call(*args, **kwargs):
+            nonlocal settle_errors
+            if settle_errors:
+                settle_errors -= 1
+                raise OperationalError("UPDATE", {}, Exception("database is locked"))
+            return method(*args, **kwargs)
+        return call
+    
+    monkeypatch.setattr(JobService, "complete", flaky(JobService.complete))
+    monkeypatch.setattr(JobService, "fail", flaky(JobService.fail))
+    runs = []
+    
+    async def process(order_id, request):
+        runs.append(order_id)
+        if len(runs) == 2:
+            raise RuntimeError("vendor outage")
+    
+    worker = JobWorker(process, session_factory, poll_seconds=0.01)
+    await worker.run_once()
+    await asyncio.wait_for(worker.drain(), timeout=1)
+    
+    assert len(runs) == 2 and worker.errors == 4
+    db = session_factory()
+    try:
+        assert db.get(ProcurementJob, done_id).status == JobStatus.DONE
+        assert db.get(ProcurementJob, failed_id).last_error == "vendor outage"
+    finally:
+        db.close()
+
+
+
+def test_api_queues_jobs_for_workers(monkeypatch):
+    """Test that with the database queue the API only enqueues, and a worker completes it."""
+    monkeypatch.setattr(settings, "procurement_queue", "database")
+    customer = client.post(
+        "/api/v1/customers/", json={"name": "Queue User", "email": "queue@example.com"}
+    ).json()
+    
+    response = client.post(
+        "/api/v1/procurement/batch",
+        json={"requests": [{"customer_id": customer["id"], "items": ["pens"]}] * 2},
+    )
+    assert response.status_code == 200
+    order_ids = [order["order_id"] for order in response.json()["orders"]]
+    # Nothing ran in the API process
+    for order_id in order_ids:
+        assert client.get(f"/api/v1/orders/{order_id}").json()["status"] == "pending"
+    
+    async def work():
+        worker = JobWorker(procurement_service.process_procurement_job, SessionLocal)
+        while await worker.run_once():
+            await worker.drain()
+    
+    asyncio.run(work())
+    for order_id in order_ids:
+        assert client.get(f"/api/v1/orders/{order_id}").json()["status"] == "completed"
+
+
+def test_orders_are_not_kept_without_their_jobs(monkeypatch):
+    """Test that a queued order is rolled back if its job cannot be enqueued."""
+    monkeypatch.setattr(settings, "procurement_queue", "database")
+    customer_id = client.post(
+        "/api/v1/customers/", json={"name": "Atomic User", "email": "atomic@example.com"}
+    ).json()["id"]
+    
+    def enqueue(db, orders, commit=True):
+        raise OperationalError("INSERT", {}, Exception("database is locked"))
+    
+    monkeypatch.setattr(JobService, "enqueue", enqueue)
+    request = {"customer_id": customer_id, "items": ["pens"]}
+    with pytest.raises(OperationalError):
+        client.post("/api/v1/procurement/", json=request)
+    with pytest.raises(OperationalError):
+        client.post("/api/v1/procurement/batch", json={"requests": [request] * 2})
+    
+    assert client.get("/api/v1/orders/", params={"customer_id": customer_id}).json() == []
+
+
+async def test_worker_retries_orders_the_service_could_not_process(monkeypatch):
+    """Test that a real order that errors is re-queued, and failed once attempts run out."""
+    service = ProcurementService()
+    search = service.searcher.asearch_multiple
+    outages = 1
+    
+    async def flaky_search(queries):
+        nonlocal outages
+        if outages:
+            outages -= 1
+            raise RuntimeError("vendor outage")
+        return await search(queries)
+    
+    monkeypatch.setattr(service.searcher, "asearch_multiple", flaky_search)
+    worker = JobWorker(service.process_procurement_job, SessionLocal, max_attempts=2)
+    
+    async def settle(outage_count):
+        nonlocal outages
+        outages = outage_count
+        [job_id] = queue_orders(SessionLocal, 1)
+        while await worker.run_once():
+            await worker.drain()
+        db = SessionLocal()
+        try:
+            job = db.get(ProcurementJob, job_id)
+            return job.status, job.attempts, db.get(Order, job.order_id)
+        finally:
+            db.close()
+    
+    status, attempts, order = await settle(1)
+    assert (status, attempts, order.status) == (JobStatus.DONE, 2, OrderStatus.COMPLETED)
+    
+    status, attempts, order = await settle(2)
+    assert (status, attempts, order.status) == (JobStatus.FAILED, 2, OrderStatus.FAILED)
+    assert order.notes == "Error: vendor outage"
@@ -0,0 +1,201 @@
+"""
+Tests for order progress streams.
+"""
+
+import asyncio
+import json
+from fastapi.testclient import TestClient
+from api.config import settings
+from api.database import SessionLocal
+from api.main import app
+from api.schemas.procurement import ProcurementRequest
+from api.services.order_events import OrderEventBroker
+from api.services.order_service import OrderService
+from api.services.procurement_service import ProcurementService
+
+client = TestClient(app)
+
+
+def fake_orders(**orders):
+    """Broker load function over in-memory orders, counting reads."""
+    reads = []
+    
+    def load(order_id):
+        reads.append(order_id)
+        order = orders.get(str(order_id))
+        return json.loads(json.dumps(order)) if order else None
+    
+    return load, reads
+
+
+def order(status="pending", items=("pens",)):
+    """An order snapshot as the API serializes it."""
+    return {
+        "id": 1,
+        "status": status,
+        "items": [{"item_name": name, "status": "pending"} for name in items],
+    }
+
+
+async def collect(subscription):
+    """Every event of a subscription until its order is final."""
+    return [event async for event in subscription.events()]
+
+
+async def test_watchers_share_one_read():
+    """Test that all watchers of an order start from a single database read."""
+    load, reads = fake_orders(**{"1": order()})
+    broker = OrderEventBroker(load)
+    
+    first, second = await asyncio.gather(broker.subscribe(1), broker.subscribe(1))
+    third = await broker.subscribe(1)
+    assert reads == [1]
+    assert broker.stats() == {"orders": 1, "subscribers": 3, "loads": 1}
+    
+    broker.publish(1, "item", {"index": 0, "status": "purchased", "price": 8.99})
+    broker.publish(1, "status", {"status": "completed", "total_amount": 8.99, "notes": None})
+    for subscription in (first, second, third):
+        events = await collect(subscription)
+        assert [event for event, _ in events] == ["snapshot", "item", "status"]
+        broker.unsubscribe(subscription)
+    assert broker.stats()["orders"] == 0
+    
+    # A late watcher of the order reads it again, now that nothing is cached
+    await broker.subscribe(1)
+    assert reads == [1, 1]
+
+
+async def test_snapshot_tracks_published_events():
+    """Test that a later watcher's snapshot includes events it did not see."""
+    load, reads = fake_orders(**{"1": order(items=("pens", "paper"))})
+    broker = OrderEventBroker(load)
+    await broker.subscribe(1)
+    
+    broker.publish(1, "status", {"status": "processing", "notes": None})
+    broker.publish(1, "item", {"index": 1, "status": "searching"})
+    late = await broker.subscribe(1)
+    
+    event, snapshot = await late.queue.get()
+    assert event == "snapshot"
+    assert snapshot["status"] == "processing"
+    assert [item["status"] for item in snapshot["items"]] == ["pending", "searching"]
+    assert reads == [1]
+
+
+async def test_unwatched_and_missing_orders():
+    """Test that publishing to unwatched orders is a no-op and unknown orders are not kept."""
+    load, reads = fake_orders()
+    broker = OrderEventBroker(load)
+    broker.publish(1, "status", {"status": "completed"})
+    
+    assert await broker.subscribe(1) is None
+    assert broker.stats()["orders"] == 0
+
+
+async def test_slow_watcher_resyncs_to_snapshot():
+    """Test that a watcher that falls behind is sent the current state instead."""
+    load, _ = fake_orders(**{"1": order(items=("pens", "paper"))})
+    broker = OrderEventBroker(load, queue_size=2)
+    subscription = await broker.subscribe(1)
+    
+    for status in ("searching", "optimizing", "purchased"):
+        broker.publish(1, "item", {"index": 0, "status": status})
+    broker.publish(1, "status", {"status": "completed"})
+    
+    events = await collect(subscription)
+    # Both overflows replaced the queued events with the current state
+    [(event, snapshot)] = events
+    assert event == "snapshot"
+    assert snapshot["status"] == "completed"
+    assert snapshot["items"][0]["status"] == "purchased"
+
+
+async def test_polling_picks_up_changes_from_other_processes():
+    """Test that with polling, a watched order's changes are read once per interval."""
+    orders = {"1": order()}
+    load, reads = fake_orders(**orders)
+    broker = OrderEventBroker(load, poll_seconds=0.01)
+    first = await broker.subscribe(1)
+    second = await broker.subscribe(1)
+    
+    orders["1"]["status"] = "completed"
+    events = await asyncio.wait_for(collect(first), timeout=1)
+    assert events[-1][1]["status"] == "completed"
+    assert (await asyncio.wait_for(collect(second), timeout=1))[-1][1]["status"] == "completed"
+    
+    broker.unsubscribe(first)
+    broker.unsubscribe(second)
+    reads_after_stop = len(reads)
+    await asyncio.sleep(0.05)
+    assert len(reads) == reads_after_stop
+
+
+async def test_polling_survives_failed_reads():
+    """Test that a read that raises is retried on the next interval."""
+    orders = {"1": order()}
+    load, reads = fake_orders(**orders)
+    failures = 2
+    
+    def flaky_load(order_id):
+        nonlocal failures
+        if reads and failures:
+            failures -= 1
+            raise OSError("database is locked")
+        return load(order_id)
+    
+    broker = OrderEventBroker(flaky_load, poll_seconds=0.01)
+    subscription = await broker.subscribe(1)
+    orders["1"]["status"] = "completed"
+    
+    events = await asyncio.wait_for(collect(subscription), timeout=1)
+    assert events[-1][1]["status"] == "completed"
+    assert broker.load_errors == 2
+
+
+
+def test_stream_endpoint():
+    """Test that the SSE endpoint sends a finished order's snapshot and closes."""
+    customer = client.post(
+        "/api/v1/customers/", json={"name": "Events User", "email": "events@example.com"}
+    ).json()
+    order_id = client.post(
+        "/api/v1/procurement/",
+        json={"customer_id": customer["id"], "items": ["pens"], "budget_limit": 100},
+    ).json()["order_id"]
+    
+    with client.stream("GET", f"/api/v1/orders/{order_id}/events") as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = "".join(response.iter_text())
+    event, data = body.strip().split("\n")
+    assert event == "event: snapshot"
+    assert json.loads(data.removeprefix("data: "))["status"] == "completed"
+    
+    assert client.get("/api/v1/orders/999999/events").status_code == 404
+
+
+async def test_procurement_publishes_progress(monkeypatch):
+    """Test that a procurement run streams item results and the final status."""
+    monkeypatch.setattr(settings, "procurement_pipeline", "streaming")
+    service = ProcurementService()
+    db = SessionLocal()
+    try:
+        order_id = OrderService.create_order(db, customer_id=1, items=["pens", "paper"]).id
+    finally:
+        db.close()
+    
+    subscription = await service.order_events.subscribe(order_id)
+    await service.process_procurement_async(
+        order_id, ProcurementRequest(customer_id=1, items=["pens", "paper"])
+    )
+    events = await asyncio.wait_for(collect(subscription), timeout=1)
+    
+    assert events[0][0] == "snapshot"
+    assert events[1] == ("status", {"status": "processing", "notes": None})
+    purchased = [
+        data["index"] for event, data in events
+        if event == "item" and data["status"] == "purchased"
+    ]
+    assert sorted(purchased) == [0, 1]
+    assert events[-1][1]["status"] == "completed"
+    assert service.order_events.stats()["loads"] == 1
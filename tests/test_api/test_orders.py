@@ -0,0 +1,212 @@
+"""
+Tests for order endpoints.
+"""
+
+from contextlib import contextmanager
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, update
+from api.database import SessionLocal, engine
+from api.main import app
+from api.models.order import OrderStatus
+from api.models.order_item import OrderItem
+from api.schemas.order import OrderResponse
+from api.schemas.procurement import ProcurementRequest
+from api.services.order_service import OrderService
+
+client = TestClient(app)
+
+
+@contextmanager
+def count_statements():
+    """Collect the SQL statements executed inside the block."""
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+@contextmanager
+def query_plans():
+    """Collect the SQLite query plan of every SELECT executed inside the block."""
+    executed = []
+    plans = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            executed.append((statement, parameters))
+    
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield plans
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    
+    with engine.connect() as conn:
+        for statement, parameters in executed:
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plans.append(" | ".join(row[-1] for row in rows))
+
+
+@pytest.fixture(scope="module")
+def customer_id():
+    """A customer with a page of orders, each with several items."""
+    response = client.post(
+        "/api/v1/customers/",
+        json={"name": "Orders User", "email": "orders@example.com"},
+    )
+    if response.status_code == 400:
+        customers = client.get("/api/v1/customers/").json()
+        customer_id = next(c["id"] for c in customers if c["email"] == "orders@example.com")
+    else:
+        customer_id = response.json()["id"]
+    
+    db = SessionLocal()
+    try:
+        OrderService.create_orders(db, [
+            ProcurementRequest(customer_id=customer_id, items=[f"item {i}", "pens", "paper"])
+            for i in range(20)
+        ])
+    finally:
+        db.close()
+    return customer_id
+
+
+@pytest.mark.parametrize("limit", [1, 20])
+def test_list_orders_uses_constant_queries(customer_id, limit):
+    """Test that listing orders does not lazy-load items per order."""
+    with count_statements() as statements:
+        response = client.get(f"/api/v1/orders/?customer_id={customer_id}&limit={limit}")
+    
+    assert response.status_code == 200
+    orders = response.json()
+    assert len(orders) == limit
+    assert all(len(order["items"]) == 3 for order in orders)
+    # One for the orders and one for all of their items
+    assert len(statements) <= 2
+
+
+def test_orm_listing_eager_loads_items(customer_id):
+    """Test that the ORM listing loads every page's items with one extra statement."""
+    db = SessionLocal()
+    try:
+        with count_statements() as statements:
+            orders = OrderService.list_orders(db, customer_id=customer_id, limit=20)
+            responses = [OrderResponse.model_validate(order) for order in orders]
+    finally:
+        db.close()
+    
+    assert sum(len(response.items) for response in responses) == 60
+    assert len(statements) <= 2
+
+
+def test_projection_matches_orm_listing(customer_id):
+    """Test that the projection path returns the same rows as the ORM path."""
+    db = SessionLocal()
+    try:
+        rows = OrderService.list_order_rows(db, customer_id=customer_id, limit=5)
+        orders = OrderService.list_orders(db, customer_id=customer_id, limit=5)
+        expected = [OrderResponse.model_validate(order) for order in orders]
+    finally:
+        db.close()
+    
+    assert rows == expected
+
+
+def test_list_orders_cursor_pages(customer_id):
+    """Test that cursor pages match offset pages, including ties on created_at."""
+    url = f"/api/v1/orders/?customer_id={customer_id}"
+    offset_ids = [o["id"] for o in client.get(f"{url}&limit=1000").json()]
+    url = f"{url}&limit=7"
+    
+    seen = []
+    response = client.get(url)
+    while True:
+        seen.extend(o["id"] for o in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        response = client.get(f"{url}&cursor={cursor}")
+    
+    assert seen == offset_ids
+    assert seen == sorted(seen)
+
+
+def test_customer_listing_uses_composite_index(customer_id):
+    """Test that a customer's orders are read in index order, without a sort."""
+    db = SessionLocal()
+    try:
+        with query_plans() as plans:
+            OrderService.list_order_rows(db, customer_id=customer_id, limit=5)
+    finally:
+        db.close()
+    
+    assert "ix_orders_customer_created_at_id" in plans[0]
+    assert "TEMP B-TREE" not in plans[0]
+
+
+def test_list_orders_by_status(customer_id):
+    """Test that orders by status come from the status index, oldest update first."""
+    db = SessionLocal()
+    try:
+        with query_plans() as plans:
+            orders = OrderService.list_orders_by_status(db, OrderStatus.PENDING, limit=10)
+    finally:
+        db.close()
+    
+    assert len(orders) == 10
+    assert all(order.status == OrderStatus.PENDING for order in orders)
+    assert [o.updated_at for o in orders] == sorted(o.updated_at for o in orders)
+    assert "ix_orders_status_updated_at" in plans[0]
+    assert "TEMP B-TREE" not in plans[0]
+    
+    response = client.get("/api/v1/orders/status/pending?limit=3")
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+    assert client.get("/api/v1/orders/status/unknown").status_code == 422
+
+
+def test_list_orders_status_filter(customer_id):
+    """Test filtering the order listing by status."""
+    response = client.get(f"/api/v1/orders/?customer_id={customer_id}&status=completed")
+    assert response.status_code == 200
+    assert response.json() == []
+    
+    response = client.get(f"/api/v1/orders/?customer_id={customer_id}&status=pending")
+    assert len(response.json()) >= 20
+
+
+def test_list_items_by_vendor(customer_id):
+    """Test that items by vendor are served from the vendor index."""
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(OrderItem)
+            .where(OrderItem.item_name == "pens")
+            .values(vendor="staples", product_id="pen-1")
+        )
+        db.commit()
+        with query_plans() as plans:
+            items = OrderService.list_items_by_vendor(db, "staples", product_id="pen-1")
+    finally:
+        db.close()
+    
+    assert len(items) >= 20
+    assert all(item.product_id == "pen-1" for item in items)
+    assert "ix_order_items_vendor_product_id" in plans[0]
+    
+    response = client.get("/api/v1/orders/items?vendor=staples&limit=5")
+    assert response.status_code == 200
+    assert [item["item_name"] for item in response.json()] == ["pens"] * 5
+    assert client.get("/api/v1/orders/items?vendor=nobody").json() == []
+
+
+def test_get_order_not_found():
+    """Test that a missing order is a 404."""
+    assert client.get("/api/v1/orders/999999").status_code == 404
@@ -0,0 +1,211 @@
+"""
+Tests for procurement endpoints.
+"""
+
+import time
+import pytest
+from fastapi.testclient import TestClient
+from agent.schemas import MAX_QUANTITY
+from api.config import settings
+from api.main import app
+from api.services.procurement_service import ProcurementService
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def customer_id():
+    """Create a customer to place procurement requests for."""
+    response = client.post(
+        "/api/v1/customers/",
+        json={"name": "Procurement User", "email": "procurement@example.com"},
+    )
+    if response.status_code == 400:
+        customers = client.get("/api/v1/customers/").json()
+        return next(c["id"] for c in customers if c["email"] == "procurement@example.com")
+    return response.json()["id"]
+
+
+def test_create_procurement_request(customer_id):
+    """Test that a procurement request is processed to completion."""
+    response = client.post(
+        "/api/v1/procurement/",
+        json={"customer_id": customer_id, "items": ["pens", "paper"], "budget_limit": 100},
+    )
+    assert response.status_code == 200
+    order_id = response.json()["order_id"]
+    
+    # Background tasks run before TestClient returns the response
+    order = client.get(f"/api/v1/orders/{order_id}").json()
+    assert order["status"] == "completed"
+    assert order["total_amount"] == pytest.approx(8.99 + 6.99)
+
+
+def test_create_procurement_request_unknown_customer():
+    """Test that procurement for a missing customer is rejected."""
+    response = client.post(
+        "/api/v1/procurement/",
+        json={"customer_id": 999999, "items": ["pens"]},
+    )
+    assert response.status_code == 404
+
+
+def test_procurement_request_with_quantities(customer_id):
+    """Test that requested quantities are stored and priced by pack size."""
+    response = client.post(
+        "/api/v1/procurement/",
+        json={
+            "customer_id": customer_id,
+            "items": ["pens", "paper"],
+            "quantity_per_item": {"pens": 24},
+            "budget_limit": 100,
+        },
+    )
+    assert response.status_code == 200
+    order_id = response.json()["order_id"]
+    
+    order = client.get(f"/api/v1/orders/{order_id}").json()
+    assert order["status"] == "completed"
+    # Two "Pack of 12" listings cover 24 pens
+    assert order["total_amount"] == pytest.approx(2 * 8.99 + 6.99)
+    quantities = {item["item_name"]: item["requested_quantity"] for item in order["items"]}
+    assert quantities == {"pens": 24, "paper": 1}
+
+
+@pytest.mark.parametrize("quantity", [0, -3, MAX_QUANTITY + 1])
+def test_procurement_request_rejects_out_of_range_quantities(customer_id, quantity):
+    """Test that item quantities must be between 1 and the maximum."""
+    request = {
+        "customer_id": customer_id,
+        "items": ["pens"],
+        "quantity_per_item": {"pens": quantity},
+    }
+    
+    assert client.post("/api/v1/procurement/", json=request).status_code == 422
+    assert client.post("/api/v1/procurement/batch", json={"requests": [request]}).status_code == 422
+
+
+def test_streaming_pipeline_records_item_progress(customer_id, monkeypatch):
+    """Test that the streaming pipeline stores each item's outcome on its order item."""
+    monkeypatch.setattr(settings, "procurement_pipeline", "streaming")
+    response = client.post(
+        "/api/v1/procurement/",
+        json={
+            "customer_id": customer_id,
+            "items": ["pens", "unobtainium widget", "paper"],
+            "quantity_per_item": {"pens": 24},
+        },
+    )
+    assert response.status_code == 200
+    order = client.get(f"/api/v1/orders/{response.json()['order_id']}").json()
+    
+    items = {item["item_name"]: item for item in order["items"]}
+    assert items["pens"]["status"] == "purchased"
+    assert items["pens"]["quantity_purchased"] == 2
+    assert items["pens"]["vendor"] == "mock"
+    assert items["paper"]["status"] == "purchased"
+    assert items["paper"]["product_name"]
+    assert items["unobtainium widget"]["status"] == "not_found"
+    # What was bought is still charged to the order
+    assert order["status"] == "partial"
+    assert order["total_amount"] == pytest.approx(2 * 8.99 + 6.99)
+    assert "unobtainium widget" in order["notes"]
+
+
+def test_streaming_pipeline_batches_item_writes(customer_id, monkeypatch):
+    """Test that item progress is written behind the pipeline, a batch per transaction."""
+    monkeypatch.setattr(settings, "procurement_pipeline", "streaming")
+    write = ProcurementService._write_item_fields
+    batches = []
+    
+    def slow_write(changes):
+        batches.append(changes)
+        time.sleep(0.05)
+        write(changes)
+    
+    monkeypatch.setattr(ProcurementService, "_write_item_fields", staticmethod(slow_write))
+    response = client.post(
+        "/api/v1/procurement/",
+        json={"customer_id": customer_id, "items": ["pens", "paper", "stapler"]},
+    )
+    order = client.get(f"/api/v1/orders/{response.json()['order_id']}").json()
+    
+    assert order["status"] == "completed"
+    assert [item["status"] for item in order["items"]] == ["purchased"] * 3
+    # Three items pass five stages each; updates made during a write share the next one
+    assert len(batches) < 15
+    assert all(
+        fields["status"] != "pending" for changes in batches for fields in changes.values()
+    )
+
+
+def test_vendor_metrics_after_procurement(customer_id):
+    """Test that per-vendor rate limiting metrics are exposed."""
+    client.post(
+        "/api/v1/procurement/",
+        json={"customer_id": customer_id, "items": ["stapler"], "budget_limit": 100},
+    )
+    
+    response = client.get("/api/v1/health/vendors")
+    assert response.status_code == 200
+    mock = response.json()["rate_limits"]["mock"]
+    assert mock["requests"] >= 1
+    assert {"throttled", "queue_wait_avg", "concurrency_limit", "queued"} <= set(mock)
+    assert response.json()["circuits"]["mock"]["circuit"]["state"] == "closed"
+    
+    health = client.get("/api/v1/health/").json()
+    assert health["status"] == "healthy"
+    assert health["vendors"]["mock"] == "closed"
+
+
+def test_batch_procurement(customer_id):
+    """Test that a batch creates every order and reports unknown customers."""
+    requests = [
+        {"customer_id": customer_id, "items": ["pens", "paper"], "quantity_per_item": {"pens": 24}},
+        {"customer_id": 999999, "items": ["stapler"]},
+        {"customer_id": customer_id, "items": ["stapler"], "budget_limit": 100},
+    ]
+    
+    response = client.post("/api/v1/procurement/batch", json={"requests": requests})
+    assert response.status_code == 200
+    data = response.json()
+    assert [error["index"] for error in data["errors"]] == [1]
+    assert len(data["orders"]) == 2
+    
+    first, second = (client.get(f"/api/v1/orders/{o['order_id']}").json() for o in data["orders"])
+    assert {item["item_name"]: item["requested_quantity"] for item in first["items"]} == {
+        "pens": 24,
+        "paper": 1,
+    }
+    assert [item["item_name"] for item in second["items"]] == ["stapler"]
+    assert first["status"] == second["status"] == "completed"
+    assert second["budget_limit"] == 100
+
+
+def test_bulk_order_creation_uses_few_statements(customer_id):
+    """Test that bulk order creation does not issue per-row statements."""
+    from sqlalchemy import event
+    from api.database import SessionLocal, engine
+    from api.schemas.procurement import ProcurementRequest
+    from api.services.order_service import OrderService
+    
+    requests = [
+        ProcurementRequest(customer_id=customer_id, items=["pens", "paper", "toner"])
+        for _ in range(50)
+    ]
+    statements = []
+    
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    db = SessionLocal()
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        created = OrderService.create_orders(db, requests)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+        db.close()
+    
+    assert len(created) == 50
+    assert len({order_id for order_id, _ in created}) == 50
+    assert len(statements) <= 2
@@ -0,0 +1,3 @@
+"""
+Vendor integration tests.
+"""
@@ -0,0 +1,252 @@
+"""
+Tests for vendor circuit breakers and hedged requests.
+"""
+
+import asyncio
+import threading
+import time
+import httpx
+import pytest
+from agent.hedging import Hedger
+from agent.schemas import Product, SearchQuery, Vendor
+from agent.search import ProductSearcher
+from integrations.base import VendorInterface
+from integrations.circuit import (
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    CircuitOpenError,
+    CircuitState,
+)
+from integrations.ratelimit import ThrottledError
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+class FlakyVendor(VendorInterface):
+    """Vendor that fails while ``failing`` is set and sleeps ``delays`` per call in turn."""
+    
+    def __init__(self, failing: bool = False, delays=None):
+        self.failing = failing
+        self.delays = list(delays or [])
+        self.lock = threading.Lock()
+        self.calls = 0
+    
+    def get_name(self) -> str:
+        return "Flaky Vendor"
+    
+    def get_vendor_type(self) -> Vendor:
+        return Vendor.COSTCO
+    
+    def search(self, query: str, max_results: int = 10):
+        with self.lock:
+            self.calls += 1
+            delay = self.delays.pop(0) if self.delays else 0.0
+        time.sleep(delay)
+        if self.failing:
+            raise ConnectionError("vendor down")
+        return [Product(id=query, name=query, price=1.0, vendor=Vendor.COSTCO)]
+    
+    def get_product(self, product_id: str):
+        raise ValueError(product_id)
+    
+    def purchase(self, product_id: str, quantity: int = 1) -> dict:
+        return {}
+
+
+def test_breaker_opens_after_consecutive_failures():
+    """Test closed -> open -> half-open -> closed transitions."""
+    clock = FakeClock()
+    breaker = CircuitBreaker("costco", failure_threshold=3, recovery_timeout=10, clock=clock)
+    
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure(ConnectionError())
+    breaker.before_call()
+    breaker.record_success()
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure(ConnectionError())
+    assert breaker.state == CircuitState.OPEN
+    
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.before_call()
+    assert excinfo.value.retry_in == pytest.approx(10)
+    
+    clock.now = 10.0
+    assert breaker.state == CircuitState.HALF_OPEN
+    breaker.before_call()
+    # Only one trial call at a time while half-open
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.stats()["opened"] == 1
+    assert breaker.stats()["rejected"] == 2
+
+
+def test_failed_trial_reopens_and_throttles_are_ignored():
+    """Test that a failed half-open trial reopens while throttles do not count."""
+    clock = FakeClock()
+    breaker = CircuitBreaker("costco", failure_threshold=1, recovery_timeout=5, clock=clock)
+    
+    breaker.record_failure(ThrottledError())
+    assert breaker.state == CircuitState.CLOSED
+    
+    breaker.record_failure(ConnectionError())
+    clock.now = 5.0
+    breaker.before_call()
+    breaker.record_failure(ThrottledError())
+    # The throttled trial handed back its slot
+    breaker.before_call()
+    breaker.record_failure(ConnectionError())
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.stats()["opened"] == 2
+
+
+def test_only_vendor_failures_open_the_circuit():
+    """Test that errors for requests the vendor answered do not count as failures."""
+    request = httpx.Request("GET", "http://vendor.test/")
+    breaker = CircuitBreaker("costco", failure_threshold=2)
+    
+    for _ in range(3):
+        breaker.record_failure(ValueError("Product 42 not found"))
+    assert breaker.state == CircuitState.CLOSED
+    
+    for status_code in (500, 503):
+        breaker.record_failure(httpx.HTTPStatusError(
+            "error", request=request, response=httpx.Response(status_code, request=request)
+        ))
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_searcher_skips_open_vendor():
+    """Test that a failing vendor is skipped without being called once its circuit opens."""
+    vendor = FlakyVendor(failing=True)
+    breakers = CircuitBreakerRegistry(failure_threshold=2, recovery_timeout=60)
+    searcher = ProductSearcher([vendor], concurrent=False, breakers=breakers)
+    
+    results = searcher.search_multiple([SearchQuery(query=f"item {i}") for i in range(5)])
+    
+    assert vendor.calls == 2
+    errors = [result.errors[0] for result in results]
+    assert [error.circuit_open for error in errors] == [False, False, True, True, True]
+    assert breakers.stats()["costco"]["state"] == "open"
+    assert searcher.circuit_stats()["costco"]["circuit"]["rejected"] == 3
+
+
+def test_vendor_timeouts_open_the_circuit():
+    """Test that calls abandoned at the vendor timeout count as failures."""
+    vendor = FlakyVendor(delays=[0.2, 0.2])
+    breakers = CircuitBreakerRegistry(failure_threshold=2)
+    searcher = ProductSearcher([vendor], vendor_timeout=0.05, coalesce=False, breakers=breakers)
+    
+    searcher.search_multiple([SearchQuery(query="a"), SearchQuery(query="b")])
+    result = searcher.search(SearchQuery(query="c"))
+    searcher.close()
+    
+    assert result.errors[0].circuit_open
+    assert vendor.calls == 2
+
+
+def test_abandoned_calls_count_once():
+    """Test that a timed-out call is not counted again when it finally finishes."""
+    for failing, delay in [(True, 0.2), (False, 0.2)]:
+        vendor = FlakyVendor(failing=failing, delays=[delay])
+        breakers = CircuitBreakerRegistry(failure_threshold=2)
+        searcher = ProductSearcher([vendor], vendor_timeout=0.05, breakers=breakers)
+        
+        assert searcher.search(SearchQuery(query="a")).errors[0].timed_out
+        time.sleep(delay + 0.1)  # The abandoned call finishes in the background
+        searcher.close()
+        
+        # Neither a late failure nor a late success changes the count
+        assert breakers.stats()["costco"]["consecutive_failures"] == 1
+
+
+
+async def test_async_searcher_skips_open_vendor():
+    """Test circuit breaking on the async search path."""
+    vendor = FlakyVendor(failing=True)
+    breakers = CircuitBreakerRegistry(failure_threshold=1, recovery_timeout=60)
+    searcher = ProductSearcher([vendor], breakers=breakers)
+    
+    first = await searcher.asearch(SearchQuery(query="pens"))
+    second = await searcher.asearch(SearchQuery(query="paper"))
+    
+    assert not first.errors[0].circuit_open
+    assert second.errors[0].circuit_open
+    assert vendor.calls == 1
+
+
+def test_hedger_delay_needs_samples():
+    """Test that the hedging delay is the percentile of recent latencies."""
+    hedger = Hedger(percentile=95, min_samples=20)
+    for i in range(19):
+        hedger.record(i / 100)
+    assert hedger.delay() is None
+    
+    hedger.record(0.19)
+    assert hedger.delay() == pytest.approx(0.19)
+    for _ in range(80):
+        hedger.record(0.01)
+    assert hedger.delay() == pytest.approx(0.15)
+
+
+def test_slow_call_is_hedged():
+    """Test that a call slower than p95 is re-issued and the faster attempt wins."""
+    # Twenty fast calls to learn the latency, then one stuck call and a fast retry
+    vendor = FlakyVendor(delays=[0.0] * 20 + [1.0, 0.0])
+    searcher = ProductSearcher([vendor], concurrent=False, hedge_percentile=95)
+    for i in range(20):
+        searcher.search(SearchQuery(query=f"warmup {i}"))
+    
+    started = time.monotonic()
+    result = searcher.search(SearchQuery(query="pens"))
+    elapsed = time.monotonic() - started
+    searcher.close()
+    
+    assert [p.id for p in result.products] == ["pens"]
+    assert elapsed < 0.5
+    stats = searcher.circuit_stats()["costco"]["hedging"]
+    assert stats["hedged"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+async def test_async_slow_call_is_hedged():
+    """Test hedging on the async search path."""
+    vendor = FlakyVendor(delays=[0.0] * 20 + [1.0, 0.0])
+    searcher = ProductSearcher([vendor], hedge_percentile=95)
+    for i in range(20):
+        await searcher.asearch(SearchQuery(query=f"warmup {i}"))
+    
+    started = time.monotonic()
+    result = await searcher.asearch(SearchQuery(query="pens"))
+    
+    assert [p.id for p in result.products] == ["pens"]
+    assert time.monotonic() - started < 0.5
+    assert searcher.hedgers[Vendor.COSTCO].hedge_wins == 1
+
+
+async def test_hedger_raises_when_both_attempts_fail():
+    """Test that the last error propagates when the hedge fails too."""
+    hedger = Hedger(min_samples=1)
+    hedger.record(0.0)
+    
+    names = iter(["primary", "hedge"])
+    
+    async def attempt():
+        name = next(names)
+        await asyncio.sleep(0.01 if name == "primary" else 0.02)
+        raise ConnectionError(name)
+    
+    with pytest.raises(ConnectionError, match="hedge"):
+        await hedger.acall(attempt)
+    assert hedger.hedged == 1
@@ -0,0 +1,103 @@
+"""
+Tests for the catalog index and local catalog vendor.
+"""
+
+import csv
+import json
+import pytest
+from agent.schemas import Product, Vendor
+from integrations.catalog_index import CatalogIndex, tokenize
+from integrations.local_catalog import LocalCatalogVendor
+
+
+def make_product(product_id: str, name: str, description: str = None, price: float = 1.0):
+    """Build a minimal catalog product."""
+    return Product(
+        id=product_id, name=name, description=description, price=price, vendor=Vendor.MOCK
+    )
+
+
+@pytest.fixture
+def products():
+    """Small catalog with overlapping tokens."""
+    return [
+        make_product("1", "Blue Ballpoint Pens - Pack of 12", "Smooth ink"),
+        make_product("2", "Copy Paper - 500 Sheets", "Bright white paper"),
+        make_product("3", "Red Pens", "Fine point"),
+        make_product("4", "Pencil Sharpener", "Electric"),
+    ]
+
+
+def test_tokenize():
+    """Test lower-casing and punctuation splitting."""
+    assert tokenize("Pack-of 12, Blue!") == ["pack", "of", "12", "blue"]
+    assert tokenize(None) == []
+
+
+def test_index_prefix_and_multi_token_search(products):
+    """Test prefix matching and that every token must match."""
+    index = CatalogIndex(products)
+    
+    assert [p.id for p in index.search("pen")] == ["1", "3", "4"]
+    assert [p.id for p in index.search("red pens")] == ["3"]
+    assert [p.id for p in index.search("white")] == ["2"]
+    assert index.search("stapler") == []
+    assert [p.id for p in index.search("pen", max_results=2)] == ["1", "3"]
+
+
+def test_index_get(products):
+    """Test id lookup."""
+    index = CatalogIndex(products)
+    assert index.get("2").name == "Copy Paper - 500 Sheets"
+    assert index.get("missing") is None
+
+
+def test_load_jsonl_catalog(tmp_path, products):
+    """Test loading a JSON Lines catalog."""
+    path = tmp_path / "catalog.jsonl"
+    path.write_text("\n".join(json.dumps(p.model_dump(mode="json")) for p in products))
+    
+    vendor = LocalCatalogVendor.from_file(path, vendor_type=Vendor.STAPLES)
+    
+    assert len(vendor) == 4
+    assert vendor.get_vendor_type() == Vendor.STAPLES
+    assert [p.id for p in vendor.search("paper")] == ["2"]
+    assert vendor.purchase("3", quantity=2)["status"] == "success"
+
+
+def test_load_csv_catalog(tmp_path, products):
+    """Test loading a CSV catalog with empty optional cells."""
+    path = tmp_path / "catalog.csv"
+    with path.open("w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["id", "name", "description", "price", "vendor"])
+        writer.writeheader()
+        for p in products:
+            writer.writerow({
+                "id": p.id, "name": p.name, "description": "", "price": p.price, "vendor": "mock",
+            })
+    
+    vendor = LocalCatalogVendor.from_file(path)
+    
+    assert vendor.get_product("4").description is None
+    with pytest.raises(ValueError):
+        vendor.get_product("missing")
+
+
+def test_unsupported_catalog_format(tmp_path):
+    """Test that unknown file types are rejected."""
+    path = tmp_path / "catalog.xml"
+    path.write_text("<catalog/>")
+    with pytest.raises(ValueError):
+        LocalCatalogVendor.from_file(path)
+
+
+def test_batch_search_and_lookup(products):
+    """Test that batch searches and lookups match the single-query methods."""
+    vendor = LocalCatalogVendor(products)
+    
+    assert vendor.supports_batch_search
+    batches = vendor.search_batch(["pen", "white", "stapler"], max_results=2)
+    assert batches == [vendor.search("pen", 2), vendor.search("white", 2), []]
+    assert [p.id for p in vendor.get_products(["3", "1"])] == ["3", "1"]
+    with pytest.raises(ValueError, match="missing"):
+        vendor.get_products(["1", "missing"])
@@ -0,0 +1,305 @@
+"""
+Tests for per-vendor rate limiting and adaptive concurrency.
+"""
+
+import asyncio
+import threading
+import time
+import httpx
+import pytest
+from agent.schemas import Product, SearchQuery, Vendor
+from agent.search import ProductSearcher
+from integrations.base import VendorInterface
+from integrations.ratelimit import (
+    AIMDLimiter,
+    RateLimiterRegistry,
+    ThrottledError,
+    TokenBucket,
+    VendorRateLimiter,
+)
+from integrations.transport import VendorTransport
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+class ConcurrencyVendor(VendorInterface):
+    """Vendor that records peak concurrency and throttles every ``throttle_every``-th call."""
+    
+    def __init__(self, delay: float = 0.02, throttle_every: int = 0):
+        self.delay = delay
+        self.throttle_every = throttle_every
+        self.lock = threading.Lock()
+        self.active = self.peak = self.calls = 0
+    
+    def get_name(self) -> str:
+        return "Concurrency Vendor"
+    
+    def get_vendor_type(self) -> Vendor:
+        return Vendor.STAPLES
+    
+    def search(self, query: str, max_results: int = 10):
+        with self.lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            throttle = self.throttle_every and self.calls % self.throttle_every == 0
+        try:
+            time.sleep(self.delay)
+            if throttle:
+                raise ThrottledError()
+            return [Product(id=query, name=query, price=1.0, vendor=Vendor.STAPLES)]
+        finally:
+            with self.lock:
+                self.active -= 1
+    
+    def get_product(self, product_id: str):
+        raise ValueError(product_id)
+    
+    def purchase(self, product_id: str, quantity: int = 1) -> dict:
+        return {}
+
+
+def test_token_bucket_reservations_queue_in_order():
+    """Test that requests beyond the burst are delayed, not rejected."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, burst=2, clock=clock)
+    
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+    
+    clock.now = 10.0
+    assert bucket.reserve() == 0.0
+
+
+def test_token_bucket_pause():
+    """Test that pausing empties the bucket for the given time."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1.0, burst=5, clock=clock)
+    
+    bucket.pause(3.0)
+    
+    assert bucket.reserve() == pytest.approx(4.0)
+
+
+def test_aimd_increases_and_decreases_once_per_window():
+    """Test additive increase on success and a single halving per congested window."""
+    clock = FakeClock()
+    limiter = AIMDLimiter(initial_limit=4, max_limit=8, clock=clock)
+    
+    started = [limiter.acquire() for _ in range(4)]
+    for value in started:
+        limiter.release(value)
+    # Each success adds 1 / limit, so a full window of 4 adds about 1
+    assert 4.9 < limiter.limit < 5.0
+    
+    limit = limiter.limit
+    first, second = limiter.acquire(), limiter.acquire()
+    clock.now = 1.0
+    limiter.release(first, throttled=True)
+    limiter.release(second, throttled=True)
+    assert limiter.limit == pytest.approx(limit / 2)
+    
+    # A call started after the decrease may decrease again
+    third = limiter.acquire()
+    limiter.release(third, ok=False)
+    assert limiter.limit == pytest.approx(limit / 4)
+
+
+def test_aimd_slow_calls_count_as_congestion():
+    """Test that calls over the latency target shrink the limit."""
+    clock = FakeClock()
+    limiter = AIMDLimiter(initial_limit=8, latency_target=0.5, clock=clock)
+    
+    started = limiter.acquire()
+    clock.now = 1.0
+    limiter.release(started)
+    
+    assert limiter.limit == 4
+
+
+def test_aimd_queues_threads_instead_of_failing():
+    """Test that callers over the limit wait for a slot in FIFO order."""
+    limiter = AIMDLimiter(initial_limit=1, max_limit=1)
+    order = []
+    
+    def worker(name):
+        started = limiter.acquire()
+        order.append(name)
+        time.sleep(0.01)
+        limiter.release(started)
+    
+    first = limiter.acquire()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+        while limiter.queued < len(order) + threads.index(thread) + 1:
+            time.sleep(0.001)
+    limiter.release(first)
+    for thread in threads:
+        thread.join()
+    
+    assert order == [0, 1, 2]
+    assert limiter.in_flight == 0
+
+
+def test_aimd_acquire_timeout():
+    """Test that a bounded wait gives up without leaking a slot."""
+    limiter = AIMDLimiter(initial_limit=1)
+    held = limiter.acquire()
+    
+    with pytest.raises(TimeoutError):
+        limiter.acquire(timeout=0.01)
+    
+    limiter.release(held)
+    assert limiter.in_flight == 0
+    assert limiter.queued == 0
+
+
+async def test_aimd_async_waiters():
+    """Test that coroutines queue for slots and cancellation frees them."""
+    limiter = AIMDLimiter(initial_limit=2, max_limit=2)
+    active = peak = 0
+    
+    async def worker():
+        nonlocal active, peak
+        started = await limiter.aacquire()
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        limiter.release(started)
+    
+    await asyncio.gather(*(worker() for _ in range(6)))
+    assert peak == 2
+    
+    held = [await limiter.aacquire(), await limiter.aacquire()]
+    waiter = asyncio.create_task(limiter.aacquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    for value in held:
+        limiter.release(value)
+    assert limiter.in_flight == 0
+    assert limiter.queued == 0
+
+
+def test_vendor_limiter_metrics_and_retry_after():
+    """Test throttle classification, Retry-After handling and metrics."""
+    limiter = VendorRateLimiter("staples", rate=100.0, burst=1)
+    
+    with pytest.raises(ThrottledError):
+        with limiter.slot():
+            raise ThrottledError(retry_after=0.05)
+    with pytest.raises(ValueError):
+        with limiter.slot():
+            raise ValueError("boom")
+    with limiter.slot():
+        pass
+    
+    stats = limiter.stats()
+    assert stats["requests"] == 3
+    assert stats["throttled"] == 1
+    assert stats["errors"] == 1
+    # The slot after the throttle waited out the Retry-After pause
+    assert stats["queue_wait_max"] >= 0.04
+    assert stats["in_flight"] == 0
+
+
+def test_only_vendor_failures_shrink_concurrency():
+    """Test that errors for requests the vendor answered leave the limit alone."""
+    def status_error(status_code):
+        request = httpx.Request("GET", "http://vendor.test/")
+        return httpx.HTTPStatusError(
+            "error", request=request, response=httpx.Response(status_code, request=request)
+        )
+    
+    def limit_after(error):
+        limiter = VendorRateLimiter("staples", concurrency=AIMDLimiter(initial_limit=8))
+        with pytest.raises(type(error)):
+            with limiter.slot():
+                raise error
+        return limiter.concurrency.limit
+    
+    assert limit_after(ValueError("Product 42 not found")) > 8
+    assert limit_after(status_error(404)) > 8
+    assert limit_after(status_error(503)) == 4
+    assert limit_after(ConnectionError("reset")) == 4
+    assert limit_after(TimeoutError("read timed out")) == 4
+    assert limit_after(httpx.ConnectTimeout("connect timed out")) == 4
+
+
+def test_searcher_queues_bursts_within_vendor_limits():
+    """Test that a burst of searches respects the concurrency cap without failing."""
+    vendor = ConcurrencyVendor()
+    rate_limits = RateLimiterRegistry(initial_limit=2, max_limit=2)
+    searcher = ProductSearcher([vendor], max_in_flight=8, rate_limits=rate_limits)
+    
+    results = searcher.search_multiple([SearchQuery(query=f"item {i}") for i in range(10)])
+    searcher.close()
+    
+    assert all(not result.errors and len(result.products) == 1 for result in results)
+    assert vendor.peak == 2
+    stats = rate_limits.stats()["staples"]
+    assert stats["requests"] == 10
+    assert stats["queue_wait_total"] > 0
+
+
+def test_searcher_reports_throttles():
+    """Test that vendor throttles shrink the limit and are counted per vendor."""
+    vendor = ConcurrencyVendor(delay=0.0, throttle_every=3)
+    rate_limits = RateLimiterRegistry(initial_limit=8)
+    searcher = ProductSearcher([vendor], concurrent=False, rate_limits=rate_limits)
+    
+    results = searcher.search_multiple([SearchQuery(query=f"item {i}") for i in range(6)])
+    
+    assert sum(1 for result in results if result.errors) == 2
+    stats = rate_limits.stats()["staples"]
+    assert stats["throttled"] == 2
+    assert stats["concurrency_limit"] < 8
+
+
+async def test_async_searcher_uses_rate_limits():
+    """Test the async search path through the limiter."""
+    vendor = ConcurrencyVendor()
+    rate_limits = RateLimiterRegistry(initial_limit=3, max_limit=3)
+    searcher = ProductSearcher([vendor], max_in_flight=10, rate_limits=rate_limits)
+    
+    results = await searcher.asearch_multiple([SearchQuery(query=f"item {i}") for i in range(9)])
+    
+    assert all(len(result.products) == 1 for result in results)
+    assert vendor.peak <= 3
+    assert rate_limits.stats()["staples"]["requests"] == 9
+
+
+def test_transport_feeds_429_to_limiter():
+    """Test that HTTP 429 responses count as throttles and honour Retry-After."""
+    def handler(request):
+        if request.url.path.endswith("/busy"):
+            return httpx.Response(429, headers={"Retry-After": "0.05"})
+        return httpx.Response(200, json={"ok": True})
+    
+    limiter = VendorRateLimiter("staples", rate=100.0, burst=1)
+    transport = VendorTransport(
+        Vendor.STAPLES,
+        "http://vendor.test",
+        transport=httpx.MockTransport(handler),
+        limiter=limiter,
+        http2=False,
+    )
+    
+    with pytest.raises(httpx.HTTPStatusError):
+        transport.get_json("/busy")
+    assert transport.get_json("/ok") == {"ok": True}
+    transport.close()
+    
+    stats = limiter.stats()
+    assert stats["throttled"] == 1
+    assert stats["queue_wait_max"] >= 0.04
@@ -0,0 +1,199 @@
+"""
+Tests for the shared vendor HTTP transport, against a local stub server.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+import httpx
+import pytest
+from agent.schemas import Vendor
+from integrations.staples import StaplesVendor
+from integrations.transport import (
+    RequestSigner,
+    VendorTransport,
+    _derive_signing_key,
+    aclose_transports,
+    get_transport,
+)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Echoes requests as JSON and records connections and concurrency."""
+    
+    protocol_version = "HTTP/1.1"
+    
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+    
+    def do_GET(self):
+        self._handle(b"")
+    
+    def do_POST(self):
+        self._handle(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+    
+    def _handle(self, body: bytes):
+        server = self.server
+        with server.lock:
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+        time.sleep(server.delay)
+        with server.lock:
+            server.active -= 1
+        
+        url = urlparse(self.path)
+        payload = json.dumps({
+            "method": self.command,
+            "path": url.path,
+            "params": dict(parse_qsl(url.query)),
+            "headers": {k.lower(): v for k, v in self.headers.items()},
+            "body": body.decode(),
+        }).encode()
+        self.send_response(404 if url.path.endswith("/missing") else 200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """Local stub HTTP server with keep-alive."""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    httpd.lock = threading.Lock()
+    httpd.connections = httpd.active = httpd.peak = 0
+    httpd.delay = 0.0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def base_url(server) -> str:
+    """Base URL of the stub server, with an API prefix."""
+    return f"http://127.0.0.1:{server.server_address[1]}/api"
+
+
+def test_requests_reuse_one_keepalive_connection(server):
+    """Test that sequential requests share a pooled connection."""
+    transport = VendorTransport(Vendor.STAPLES, base_url(server), http2=False)
+    try:
+        for i in range(5):
+            echoed = transport.get_json("/search", params={"q": f"pens {i}"})
+            assert echoed["path"] == "/api/search"
+            assert echoed["params"] == {"q": f"pens {i}"}
+    finally:
+        transport.close()
+    
+    assert server.connections == 1
+    assert transport.stats()["requests"] == 5
+
+
+def test_signed_requests_verify(server):
+    """Test that signature headers match the request the server received."""
+    signer = RequestSigner("key-id", "secret", service="staples")
+    transport = VendorTransport(Vendor.STAPLES, base_url(server), signer=signer, http2=False)
+    try:
+        echoed = transport.request(
+            "POST", "/orders", params={"b": "2", "a": "1"}, json={"sku": "mock-1"}
+        ).json()
+    finally:
+        transport.close()
+    
+    headers = echoed["headers"]
+    canonical = RequestSigner.canonical_request(
+        "POST", echoed["path"], echoed["params"], echoed["body"].encode(), headers["x-timestamp"]
+    )
+    expected = hmac.new(
+        signer.signing_key(headers["x-timestamp"][:8]), canonical.encode(), hashlib.sha256
+    ).hexdigest()
+    assert headers["x-api-key"] == "key-id"
+    assert headers["x-signature"] == expected
+
+
+def test_signing_key_is_derived_once_per_credential():
+    """Test that the derived key is cached for a credential set and day."""
+    signer = RequestSigner("key-id", "secret", service="staples", clock=lambda: 1767225600.0)
+    _derive_signing_key.cache_clear()
+    
+    for _ in range(10):
+        signer.sign("GET", "/search", {"q": "pens"})
+    
+    assert _derive_signing_key.cache_info().misses == 1
+    assert _derive_signing_key.cache_info().hits == 9
+
+
+def test_concurrency_cap(server):
+    """Test that no more than max_concurrency requests are in flight."""
+    server.delay = 0.05
+    transport = VendorTransport(
+        Vendor.STAPLES, base_url(server), max_concurrency=2, http2=False
+    )
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda i: transport.get_json("/search", {"q": i}), range(8)))
+    finally:
+        transport.close()
+    
+    assert server.peak == 2
+    assert server.connections == 2
+
+
+def test_error_status_raises(server):
+    """Test that 4xx responses raise."""
+    transport = VendorTransport(Vendor.STAPLES, base_url(server), http2=False)
+    try:
+        with pytest.raises(httpx.HTTPStatusError):
+            transport.get_json("/missing")
+    finally:
+        transport.close()
+
+
+async def test_async_requests_share_pool(server):
+    """Test the async client against the stub server."""
+    transport = VendorTransport(Vendor.STAPLES, base_url(server), max_concurrency=3, http2=False)
+    server.delay = 0.02
+    try:
+        results = await asyncio.gather(
+            *(transport.aget_json("/search", {"q": str(i)}) for i in range(6))
+        )
+    finally:
+        await transport.aclose()
+    
+    assert [r["params"]["q"] for r in results] == [str(i) for i in range(6)]
+    assert server.peak <= 3
+    assert server.connections <= 3
+
+
+def test_vendors_share_transport_per_host():
+    """Test that vendor instances for the same host share one pool but sign separately."""
+    url = "http://vendor.invalid/shared"
+    first = StaplesVendor("key-a", "secret-a", base_url=url)
+    second = StaplesVendor("key-b", "secret-b", base_url=url)
+    
+    assert first.transport is second.transport is get_transport(Vendor.STAPLES, url)
+    assert first.signer.access_key == "key-a"
+    assert second.signer.access_key == "key-b"
+
+
+async def test_aclose_transports_closes_sync_and_async_clients():
+    """Test that shutdown closes both pooled clients of every shared transport."""
+    transport = get_transport(Vendor.COSTCO, "http://vendor.invalid/shutdown")
+    client, aclient = transport.client, transport.aclient
+    
+    await aclose_transports()
+    
+    assert client.is_closed and aclient.is_closed
+    assert get_transport(Vendor.COSTCO, "http://vendor.invalid/shutdown") is not transport
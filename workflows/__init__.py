@@ -2,7 +2,14 @@
 End-to-end business workflows.
 """
 
-from workflows.procure_office_essentials import procure_office_essentials
-
-__all__ = ["procure_office_essentials"]
+from workflows.procure_office_essentials import (
+    procure_office_essentials,
+    procure_office_essentials_async,
+)
+from workflows.procure_streaming import procure_office_essentials_streaming
 
+__all__ = [
+    "procure_office_essentials",
+    "procure_office_essentials_async",
+    "procure_office_essentials_streaming",
+]
@@ -5,7 +5,17 @@ Main procurement workflow for office essentials.
 from agent.schemas import ProcurementRequest, PurchaseResult
 from agent import Planner, ProductSearcher, PriceOptimizer, Purchaser
 from policies import BudgetPolicy, ApprovalPolicy, PreferencesPolicy
-from integrations.base import VendorInterface
+from integrations.base import VendorInterface, AsyncVendorInterface
+
+
+def _has_budget(budget_policy: BudgetPolicy | None) -> bool:
+    """
+    Whether the request set a budget, which switches selection to the basket optimizer.
+    
+    The approval threshold alone does not: it applies to every order by
+    default, and without a budget orders buy the cheapest product per item.
+    """
+    return budget_policy is not None and budget_policy.get_remaining_budget() is not None
 
 
 def procure_office_essentials(
@@ -14,6 +24,8 @@ def procure_office_essentials(
     budget_policy: BudgetPolicy | None = None,
     approval_policy: ApprovalPolicy | None = None,
     preferences_policy: PreferencesPolicy | None = None,
+    searcher: ProductSearcher | None = None,
+    optimizer: PriceOptimizer | None = None,
 ) -> PurchaseResult:
     """
     Main workflow for procuring office essentials.
@@ -24,14 +36,17 @@ def procure_office_essentials(
         budget_policy: Optional budget policy
         approval_policy: Optional approval policy
         preferences_policy: Optional preferences policy
+        searcher: Optional long-lived searcher (e.g. one with a cache) to reuse;
+            when given, its vendors are used instead of ``vendors``
+        optimizer: Optional configured optimizer (e.g. one with price history) to reuse
         
     Returns:
         PurchaseResult indicating success or failure
     """
     # Initialize components
     planner = Planner()
-    searcher = ProductSearcher(vendors)
-    optimizer = PriceOptimizer()
+    searcher = searcher or ProductSearcher(vendors)
+    optimizer = optimizer or PriceOptimizer()
     purchaser = Purchaser(budget_policy=budget_policy, approval_policy=approval_policy)
     
     # Step 1: Plan the procurement
@@ -41,8 +56,14 @@ def procure_office_essentials(
     # Step 2: Search for products
     search_results = searcher.search_multiple(search_queries)
     
-    # Step 3: Optimize product selection
-    optimization_result = optimizer.optimize(search_results)
+    # Step 3: Optimize product selection, as a whole basket under an explicit
+    # budget (capped by approval too); otherwise the cheapest product per item
+    if _has_budget(budget_policy):
+        optimization_result = optimizer.optimize_basket(
+            search_results, purchaser.get_spending_limit(), preferences=preferences_policy
+        )
+    else:
+        optimization_result = optimizer.optimize(search_results)
     
     # Step 4: Create purchase request
     purchase_request = purchaser.create_purchase_request(optimization_result)
@@ -56,3 +77,65 @@ def procure_office_essentials(
     
     return purchase_result
 
+
+async def procure_office_essentials_async(
+    request: ProcurementRequest,
+    vendors: list[VendorInterface | AsyncVendorInterface],
+    budget_policy: BudgetPolicy | None = None,
+    approval_policy: ApprovalPolicy | None = None,
+    preferences_policy: PreferencesPolicy | None = None,
+    searcher: ProductSearcher | None = None,
+    optimizer: PriceOptimizer | None = None,
+) -> PurchaseResult:
+    """
+    Async workflow for procuring office essentials.
+    
+    Same steps as ``procure_office_essentials``, but vendor searches run
+    concurrently without blocking the event loop, so many procurement
+    requests can be in flight on a single worker.
+    
+    Args:
+        request: The procurement request
+        vendors: List of vendor interfaces to use (sync vendors are adapted)
+        budget_policy: Optional budget policy
+        approval_policy: Optional approval policy
+        preferences_policy: Optional preferences policy
+        searcher: Optional long-lived searcher (e.g. one with a cache) to reuse;
+            when given, its vendors are used instead of ``vendors``
+        optimizer: Optional configured optimizer (e.g. one with price history) to reuse
+        
+    Returns:
+        PurchaseResult indicating success or failure
+    """
+    # Initialize components
+    planner = Planner()
+    searcher = searcher or ProductSearcher(vendors)
+    optimizer = optimizer or PriceOptimizer()
+    purchaser = Purchaser(budget_policy=budget_policy, approval_policy=approval_policy)
+    
+    # Step 1: Plan the procurement
+    search_queries = planner.create_search_queries(request)
+    
+    # Step 2: Search for products
+    search_results = await searcher.asearch_multiple(search_queries)
+    
+    # Step 3: Optimize product selection, as a whole basket under an explicit
+    # budget; large optimizations run in the optimizer's process pool, if it has one
+    if _has_budget(budget_policy):
+        optimization_result = await optimizer.aoptimize_basket(
+            search_results, purchaser.get_spending_limit(), preferences=preferences_policy
+        )
+    else:
+        optimization_result = await optimizer.aoptimize(search_results)
+    
+    # Step 4: Create purchase request
+    purchase_request = purchaser.create_purchase_request(optimization_result)
+    
+    # Step 5: Execute purchase
+    purchase_result = purchaser.execute_purchase(purchase_request)
+    
+    # Record purchase in budget if successful
+    if purchase_result.success and budget_policy:
+        budget_policy.record_purchase(purchase_result.total_cost)
+    
+    return purchase_result
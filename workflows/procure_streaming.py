@@ -0,0 +1,235 @@
+"""
+Streaming procurement workflow: each line item moves through the stages on its own.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from agent.schemas import (
+    ItemStatus,
+    ItemUpdate,
+    OptimizationResult,
+    ProcurementRequest,
+    PurchaseRequest,
+    PurchaseResult,
+    SearchQuery,
+)
+from agent import Planner, ProductSearcher, PriceOptimizer, Purchaser
+from policies import BudgetPolicy, ApprovalPolicy, PreferencesPolicy
+from integrations.base import VendorInterface, AsyncVendorInterface
+
+# Marks the end of a stage's input; each worker passes it on to its siblings
+_DONE = object()
+
+UpdateCallback = Callable[[ItemUpdate], Awaitable[None]]
+
+
+async def _stage(
+    inbox: asyncio.Queue,
+    outbox: Optional[asyncio.Queue],
+    handle: Callable[[Any], Awaitable[Any]],
+    workers: int = 1,
+):
+    """
+    Run ``workers`` consumers of ``inbox`` until it is exhausted.
+    
+    Whatever ``handle`` returns, other than None, is passed to ``outbox``; once
+    every worker has finished, the end of input is passed on too.
+    
+    Args:
+        inbox: Queue this stage consumes
+        outbox: Queue of the next stage, or None for the last stage
+        handle: Coroutine function processing one item
+        workers: Items processed at the same time
+    """
+    async def work():
+        while True:
+            entry = await inbox.get()
+            if entry is _DONE:
+                await inbox.put(_DONE)
+                return
+            forwarded = await handle(entry)
+            if forwarded is not None and outbox is not None:
+                await outbox.put(forwarded)
+    
+    await asyncio.gather(*(work() for _ in range(max(workers, 1))))
+    if outbox is not None:
+        await outbox.put(_DONE)
+
+
+def _selection(optimization: OptimizationResult) -> Dict[str, Any]:
+    """ItemUpdate fields describing an item's optimized selection."""
+    return {
+        "products": optimization.selected_products,
+        "quantities": optimization.quantities,
+        "cost": optimization.total_cost,
+    }
+
+
+async def procure_office_essentials_streaming(
+    request: ProcurementRequest,
+    vendors: list[VendorInterface | AsyncVendorInterface],
+    budget_policy: BudgetPolicy | None = None,
+    approval_policy: ApprovalPolicy | None = None,
+    preferences_policy: PreferencesPolicy | None = None,
+    searcher: ProductSearcher | None = None,
+    optimizer: PriceOptimizer | None = None,
+    on_update: UpdateCallback | None = None,
+    search_concurrency: int = 4,
+    queue_size: int = 8,
+) -> PurchaseResult:
+    """
+    Procure office essentials as a pipeline of stages, one line item at a time.
+    
+    Items flow plan -> search -> optimize -> policy check -> purchase through
+    bounded queues, so the first item can be bought while later ones are still
+    being searched. Every change of an item's stage is reported to
+    ``on_update``. An item that fails, finds nothing or is rejected by policy
+    does not stop the others.
+    
+    Budget and approval apply to the running total of admitted items, in the
+    order their optimizations finish; unlike ``procure_office_essentials`` the
+    items are not optimized as one basket under the spending limit.
+    
+    Args:
+        request: The procurement request
+        vendors: List of vendor interfaces to use (sync vendors are adapted)
+        budget_policy: Optional budget policy
+        approval_policy: Optional approval policy
+        preferences_policy: Optional preferences policy; excluded vendors and
+            brands are dropped from each item's search results
+        searcher: Optional long-lived searcher (e.g. one with a cache) to reuse;
+            when given, its vendors are used instead of ``vendors``
+        optimizer: Optional configured optimizer (e.g. one with price history) to reuse
+        on_update: Optional coroutine function called with each ItemUpdate
+        search_concurrency: Items searched at the same time
+        queue_size: Items each queue between two stages holds
+        
+    Returns:
+        PurchaseResult for the whole request; it succeeds only if every item was purchased
+    """
+    # Initialize components
+    planner = Planner()
+    searcher = searcher or ProductSearcher(vendors)
+    optimizer = optimizer or PriceOptimizer()
+    purchaser = Purchaser(budget_policy=budget_policy, approval_policy=approval_policy)
+    
+    updates: Dict[int, ItemUpdate] = {}
+    order_ids: List[str] = []
+    committed = 0.0
+    
+    async def report(index: int, query: SearchQuery, status: ItemStatus, **fields):
+        update = ItemUpdate(index=index, item=query.query, status=status, **fields)
+        updates[index] = update
+        if on_update is not None:
+            await on_update(update)
+    
+    def guarded(handle):
+        """Report an item whose stage raises as failed instead of stopping the pipeline."""
+        async def run(entry):
+            try:
+                return await handle(*entry)
+            except Exception as e:
+                await report(entry[0], entry[1], ItemStatus.FAILED, error=str(e))
+                return None
+        return run
+    
+    async def search(index: int, query: SearchQuery):
+        await report(index, query, ItemStatus.SEARCHING)
+        result = await searcher.asearch(query)
+        if preferences_policy:
+            # Copied: the searcher may share cached results
+            result = result.model_copy(update={"products": [
+                p for p in result.products
+                if not preferences_policy.is_vendor_excluded(p.vendor)
+                and not preferences_policy.is_brand_excluded(p.brand)
+            ]})
+        if not result.products:
+            await report(index, query, ItemStatus.NOT_FOUND, error="No products found")
+            return None
+        return index, query, result
+    
+    async def optimize(index: int, query: SearchQuery, result):
+        await report(index, query, ItemStatus.OPTIMIZING)
+        return index, query, await optimizer.aoptimize([result])
+    
+    async def check(index: int, query: SearchQuery, optimization):
+        nonlocal committed
+        selection = _selection(optimization)
+        await report(index, query, ItemStatus.CHECKING, **selection)
+        allowed, error_message = purchaser.check_item(optimization.total_cost, committed)
+        if not allowed:
+            await report(index, query, ItemStatus.REJECTED, error=error_message, **selection)
+            return None
+        committed += optimization.total_cost
+        return index, query, optimization
+    
+    async def purchase(index: int, query: SearchQuery, optimization):
+        nonlocal committed
+        selection = _selection(optimization)
+        await report(index, query, ItemStatus.PURCHASING, **selection)
+        purchase_result = purchaser.execute_purchase(PurchaseRequest(
+            products=optimization.selected_products,
+            quantities=optimization.quantities,
+            total_amount=optimization.total_cost,
+        ))
+        if not purchase_result.success:
+            committed -= optimization.total_cost
+            await report(
+                index, query, ItemStatus.FAILED, error=purchase_result.error_message, **selection
+            )
+            return None
+        if purchase_result.order_id:
+            order_ids.append(purchase_result.order_id)
+        await report(index, query, ItemStatus.PURCHASED, **selection)
+        return None
+    
+    # Stage 1: Plan the procurement
+    search_queries = planner.create_search_queries(request)
+    for index, query in enumerate(search_queries):
+        await report(index, query, ItemStatus.PENDING)
+    
+    to_search, to_optimize, to_check, to_purchase = (
+        asyncio.Queue(maxsize=max(queue_size, 1)) for _ in range(4)
+    )
+    
+    async def plan():
+        for entry in enumerate(search_queries):
+            await to_search.put(entry)
+        await to_search.put(_DONE)
+    
+    # Stages 2-5: search, optimize, check and purchase, connected by the queues;
+    # a single checker keeps the running total consistent
+    stages = [
+        asyncio.ensure_future(plan()),
+        asyncio.ensure_future(
+            _stage(to_search, to_optimize, guarded(search), search_concurrency)
+        ),
+        asyncio.ensure_future(_stage(to_optimize, to_check, guarded(optimize))),
+        asyncio.ensure_future(_stage(to_check, to_purchase, guarded(check))),
+        asyncio.ensure_future(_stage(to_purchase, None, guarded(purchase))),
+    ]
+    try:
+        await asyncio.gather(*stages)
+    finally:
+        for stage in stages:
+            stage.cancel()
+    
+    item_updates = [updates[index] for index in range(len(search_queries))]
+    purchased = [u for u in item_updates if u.status == ItemStatus.PURCHASED]
+    total_cost = sum(u.cost or 0.0 for u in purchased)
+    
+    # Purchased items are bought even if others were not
+    if purchased and budget_policy:
+        budget_policy.record_purchase(total_cost)
+    
+    errors = [
+        f"{u.item}: {u.error or u.status.value}"
+        for u in item_updates if u.status != ItemStatus.PURCHASED
+    ]
+    return PurchaseResult(
+        success=not errors,
+        order_id=order_ids[0] if order_ids else None,
+        products_purchased=[product for u in purchased for product in u.products],
+        total_cost=total_cost,
+        error_message="; ".join(errors) or None,
+    )